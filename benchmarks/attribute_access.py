@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Compare attribute access through regular and fast properties
+
+Usage: python benchmarks/attribute_access.py [number] [repeat]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import os
+import sys
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from txorm.property import Int, Unicode, Date  # noqa
+from txorm.property import PropertyRegisterMeta  # noqa
+
+
+Base = PropertyRegisterMeta(str('Base'), (object,), {})
+
+
+def make_class(**flags):
+    """A class with an integer, an unicode and a date property
+    """
+
+    attributes = {
+        '__database_table__': 'bench', 'id': Int(primary=True),
+        'name': Unicode(), 'born': Date()
+    }
+    attributes.update(flags)
+    return PropertyRegisterMeta(str('Bench'), (Base,), attributes)
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    modes = (
+        ('regular', {}),
+        ('fast', {'__txorm_fast_properties__': True}),
+        ('columnar', {'__txorm_columnar__': True}),
+        ('fast columnar', {
+            '__txorm_fast_properties__': True, '__txorm_columnar__': True}),
+    )
+    print('{} accesses, best of {}, ns per access'.format(number, repeat))
+    print('{:>14} {:>8} {:>8} {:>8} {:>8}'.format(
+        '', 'get int', 'get str', 'get date', 'set int'))
+    for name, flags in modes:
+        obj = make_class(**flags)()
+        obj.id, obj.name, obj.born = 1, 'name', date(2014, 1, 1)
+        timings = []
+        for statement in ('obj.id', 'obj.name', 'obj.born', 'obj.id = 2'):
+            elapsed = min(timeit.repeat(
+                statement, globals={'obj': obj}, number=number, repeat=repeat
+            ))
+            timings.append(elapsed / number * 1e9)
+        print('{:>14} {:>8.0f} {:>8.0f} {:>8.0f} {:>8.0f}'.format(
+            name, *timings))
+
+
+if __name__ == '__main__':
+    main()
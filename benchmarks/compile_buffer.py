@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Compare the regular compiler against the output buffer mode
+
+Usage: python benchmarks/compile_buffer.py [rows] [repeat]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from txorm.compiler.state import State  # noqa
+from txorm.compiler.tables import Table  # noqa
+from txorm.compiler.fields import Field  # noqa
+from txorm.compiler.base import txorm_compile  # noqa
+from txorm.compiler.comparable import And, Or, Eq  # noqa
+from txorm.compiler.expressions import Insert, Select  # noqa
+from txorm.variable import IntVariable, UnicodeVariable  # noqa
+
+
+def bulk_insert(table, rows):
+    """An INSERT statement with the given number of rows
+    """
+
+    fields = (Field('id', table), Field('name', table), Field('age', table))
+    return Insert(fields, values=[
+        (IntVariable(i), UnicodeVariable('name'), IntVariable(i % 90))
+        for i in range(rows)
+    ])
+
+
+def nested_select(table, rows):
+    """A SELECT statement with nested Or/And groups of predicates
+    """
+
+    field = Field('id', table)
+    return Select(field, Or.of(
+        And(Eq(field, IntVariable(i)), Eq(field, IntVariable(i + 1)))
+        for i in range(rows)
+    ))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    regular = txorm_compile.create_child()
+    buffered = txorm_compile.create_child()
+    buffered.set_buffered()
+
+    table = Table('foo')
+    print('{} rows, best of {}'.format(rows, repeat))
+    for name, builder in (('insert', bulk_insert), ('select', nested_select)):
+        expression = builder(table, rows)
+        for mode, compile in (('regular', regular), ('buffered', buffered)):
+            elapsed = min(timeit.repeat(
+                lambda: compile(expression, State()), number=1, repeat=repeat
+            ))
+            print('{:>6} {:>8}: {:.2f} ms'.format(name, mode, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
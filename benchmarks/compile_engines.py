@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Compare the recursive and the iterative compile engines
+
+Usage: python benchmarks/compile_engines.py [predicates] [repeat]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from txorm.compiler.state import State  # noqa
+from txorm.compiler.tables import Table  # noqa
+from txorm.compiler.fields import Field  # noqa
+from txorm.compiler.base import txorm_compile  # noqa
+from txorm.compiler.comparable import And, Or, Eq  # noqa
+from txorm.variable import IntVariable  # noqa
+
+
+def flat_tree(field, predicates):
+    """A single And node with all the predicates as direct children
+    """
+
+    return And(*[Eq(field, IntVariable(i)) for i in range(predicates)])
+
+
+def deep_tree(field, predicates):
+    """A chain of alternated And/Or nodes, one level per predicate
+    """
+
+    expression = Eq(field, IntVariable(0))
+    for i in range(1, predicates):
+        operator = And if i % 2 else Or
+        expression = operator(expression, Eq(field, IntVariable(i)))
+
+    return expression
+
+
+def run(compile, expression, repeat):
+    def target():
+        compile(expression, State())
+
+    try:
+        return min(timeit.repeat(target, number=1, repeat=repeat))
+    except RuntimeError:  # RecursionError is a subclass in Python 3
+        return None
+
+
+def main():
+    predicates = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    recursive = txorm_compile.create_child()
+    iterative = txorm_compile.create_child()
+    iterative.set_iterative()
+
+    field = Field('id', Table('foo'))
+    print('{} predicates, best of {} (recursion limit {})'.format(
+        predicates, repeat, sys.getrecursionlimit()))
+    for name, builder in (('flat', flat_tree), ('deep', deep_tree)):
+        expression = builder(field, predicates)
+        for engine, compile in (('recursive', recursive),
+                                ('iterative', iterative)):
+            elapsed = run(compile, expression, repeat)
+            if elapsed is None:
+                result = 'maximum recursion depth exceeded'
+            else:
+                result = '{:.2f} ms'.format(elapsed * 1000)
+            print('{:>5} tree, {:>9} engine: {}'.format(name, engine, result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Compare the Twisted adbapi connection against the asyncio one
+
+Both run the same small SELECT expression against a sqlite database, one
+query after another and then all of them at once.
+
+Usage: python benchmarks/database_backends.py [queries] [pool size]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from twisted.internet import defer, task  # noqa
+from twisted.enterprise import adbapi  # noqa
+
+from txorm.compiler.tables import Table  # noqa
+from txorm.compiler.fields import Field  # noqa
+from txorm.database import Database  # noqa
+from txorm.database.aio import AsyncSQLite  # noqa
+from txorm.compiler.expressions import Select  # noqa
+from txorm.variable import IntVariable, UnicodeVariable  # noqa
+
+table = Table('foo')
+id_field = Field('id', table, variable_factory=IntVariable)
+name_field = Field('name', table, variable_factory=UnicodeVariable)
+
+
+def select(i):
+    return Select((id_field, name_field), id_field == i % 100)
+
+
+class SQLite(Database):
+
+    def __init__(self, filename, pool_size):
+        super(SQLite, self).__init__()
+        self.filename = filename
+        self.pool_size = pool_size
+
+    def raw_connect(self):
+        return adbapi.ConnectionPool(
+            'sqlite3', self.filename, check_same_thread=False,
+            cp_min=self.pool_size, cp_max=self.pool_size
+        )
+
+
+def report(backend, mode, queries, elapsed):
+    print('{:>8} {:>10}: {:.2f} ms ({:.0f} queries/s)'.format(
+        backend, mode, elapsed * 1000, queries / elapsed))
+
+
+async def run_asyncio(filename, queries, pool_size):
+    connection = AsyncSQLite(filename, pool_size).connect()
+    start = time.time()
+    for i in range(queries):
+        await connection.execute(select(i))
+    report('asyncio', 'sequential', queries, time.time() - start)
+
+    start = time.time()
+    await asyncio.gather(*[
+        connection.execute(select(i)) for i in range(queries)])
+    report('asyncio', 'concurrent', queries, time.time() - start)
+    await connection.close()
+
+
+@defer.inlineCallbacks
+def run_adbapi(reactor, filename, queries, pool_size):
+    connection = SQLite(filename, pool_size).connect()
+    pool = connection._raw_connection
+    pool.start()
+    start = time.time()
+    for i in range(queries):
+        yield connection.execute(select(i))
+    report('adbapi', 'sequential', queries, time.time() - start)
+
+    start = time.time()
+    yield defer.gatherResults([
+        connection.execute(select(i)) for i in range(queries)])
+    report('adbapi', 'concurrent', queries, time.time() - start)
+    pool.close()
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pool_size = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    filename = os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+    connection = AsyncSQLite(filename).connect()
+
+    async def setup():
+        await connection.execute(
+            'CREATE TABLE foo (id INTEGER PRIMARY KEY, name TEXT)',
+            noresult=True
+        )
+        await connection.execute_many(
+            'INSERT INTO foo VALUES (?, ?)',
+            [(i, 'name {}'.format(i)) for i in range(100)]
+        )
+        await connection.close()
+
+    asyncio.run(setup())
+    print('{} queries, pool of {} connections'.format(queries, pool_size))
+    asyncio.run(run_asyncio(filename, queries, pool_size))
+    task.react(run_adbapi, (filename, queries, pool_size))
+
+
+if __name__ == '__main__':
+    main()
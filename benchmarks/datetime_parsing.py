@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Compare the parsing of date/time strings returned by the database
+
+Usage: python benchmarks/datetime_parsing.py [values] [repeat]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import os
+import sys
+import timeit
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from txorm.variable.timedelta import parse_intervals, _parse_interval  # noqa
+from txorm.variable._datetime import (  # noqa
+    parse_datetimes, parse_dates, _parse_date, _parse_time
+)
+
+
+def split_datetimes(values):
+    """The parser used before datetime.fromisoformat
+    """
+
+    result = []
+    for value in values:
+        _date, _time = value.split(' ')
+        result.append(datetime(*(_parse_date(_date) + _parse_time(_time))))
+
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    timestamps = [
+        '2014-{:02d}-{:02d} {:02d}:{:02d}:{:02d}.{:06d}'.format(
+            i % 12 + 1, i % 28 + 1, i % 24, i % 60, i % 59, i % 999999)
+        for i in range(count)
+    ]
+    dates = [value[:10] for value in timestamps]
+    intervals = ['{} days {:02d}:30:00'.format(i % 30, i % 24)
+                 for i in range(count)]
+
+    print('{} values, best of {}'.format(count, repeat))
+    for name, function, values in (
+            ('timestamps split', split_datetimes, timestamps),
+            ('timestamps', parse_datetimes, timestamps),
+            ('dates split', lambda values: [
+                date(*_parse_date(value)) for value in values], dates),
+            ('dates', parse_dates, dates),
+            ('intervals regex', lambda values: [
+                _parse_interval(value) for value in values], intervals),
+            ('intervals', parse_intervals, intervals)):
+        elapsed = min(timeit.repeat(
+            lambda: function(values), number=1, repeat=repeat))
+        print('{:>16}: {:.0f} ms'.format(name, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Compare building objects row by row against the bulk loader
+
+Usage: python benchmarks/hydration.py [rows] [repeat]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from txorm.object_data import get_cls_data  # noqa
+from txorm.identity_map import build_object, build_objects  # noqa
+from txorm.property import DateTime, Decimal, Float, Int, Unicode  # noqa
+
+
+def make_class(**flags):
+    """A reporting class with the most common kinds of fields
+    """
+
+    attributes = {
+        '__database_table__': 'report', 'id': Int(primary=True),
+        'name': Unicode(), 'amount': Decimal(), 'created': DateTime(),
+        'ratio': Float()
+    }
+    attributes.update(flags)
+    return type(str('Report'), (object,), attributes)
+
+
+def make_rows(rows):
+    """Raw rows as a driver returns them, in the fields order
+    """
+
+    return [
+        ('{}.25'.format(i), '2014-01-02 03:04:{:02d}'.format(i % 60), i,
+         'name', 0.5)
+        for i in range(rows)
+    ]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    raw = make_rows(rows)
+    print('{} rows, best of {}'.format(rows, repeat))
+    for name, flags in (('regular', {}), ('columnar', {
+            '__txorm_columnar__': True})):
+        cls_data = get_cls_data(make_class(**flags))
+        for loader, function in (
+                ('build_object', lambda: [
+                    build_object(cls_data, row) for row in raw]),
+                ('build_objects', lambda: build_objects(cls_data, raw))):
+            elapsed = min(timeit.repeat(function, number=1, repeat=repeat))
+            print('{:>9} {:>14}: {:.0f} ms'.format(
+                name, loader, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Measure the memory used by every loaded row of a class with low
+cardinality columns, with and without interning of the loaded values
+
+Usage: python benchmarks/interning.py [rows]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from txorm.identity_map import build_objects  # noqa
+from txorm.object_data import get_cls_data  # noqa
+from txorm.property import Date, Int, Unicode  # noqa
+
+
+STATUSES = ('pending', 'processing', 'shipped', 'delivered', 'cancelled')
+
+
+def make_class(intern=False):
+    """An orders class with a status, a country and a day column
+    """
+
+    return type(str('Order'), (object,), {
+        '__database_table__': 'orders', '__txorm_columnar__': True,
+        'id': Int(primary=True), 'status': Unicode(intern=intern),
+        'country': Unicode(intern=intern), 'day': Date(intern=intern)
+    })
+
+
+def make_rows(rows):
+    """Raw rows as a driver returns them, every string a new object
+    """
+
+    return [
+        (''.join(['ES', '']), '2014-01-{:02d}'.format(i % 28 + 1), i,
+         ''.join([STATUSES[i % len(STATUSES)], '']))
+        for i in range(rows)
+    ]
+
+
+def measure(cls_data, rows):
+    """Return the bytes retained by every object once the rows are released
+    """
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    raw = make_rows(rows)
+    objects = build_objects(cls_data, raw)
+    del raw
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return float(after - before) / len(objects)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print('{} rows'.format(rows))
+    for intern in (False, True):
+        cls_data = get_cls_data(make_class(intern))
+        print('{:>9}: {:.0f} bytes per row'.format(
+            'interned' if intern else 'regular',
+            measure(cls_data, rows)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Measure the memory used by every loaded row of a 20 fields class, with
+a Variable per field and with columnar object data
+
+Usage: python benchmarks/variable_memory.py [rows]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from txorm.identity_map import build_object  # noqa
+from txorm.object_data import get_cls_data  # noqa
+from txorm.property import Int, Unicode, Float  # noqa
+
+
+FIELDS = 20
+
+
+def make_class(columnar=False):
+    """A class with an integer primary key and 19 more fields
+    """
+
+    attributes = {
+        '__database_table__': 'bench', '__txorm_columnar__': columnar,
+        'id': Int(primary=True)
+    }
+    kinds = (Int, Unicode, Float)
+    for i in range(1, FIELDS):
+        attributes['field{:02d}'.format(i)] = kinds[i % len(kinds)]()
+
+    return type(str('Bench'), (object,), attributes)
+
+
+def make_rows(cls_data, rows):
+    """Raw rows with a value of the right type for every field
+    """
+
+    values = {'int': 0, 'unicode': 'value', 'float': 1.5}
+    kinds = [
+        field.variable_factory().__class__.__name__[:-8].lower()
+        for field in cls_data.fields
+    ]
+    return [
+        tuple(i if kind == 'int' else values[kind] for kind in kinds)
+        for i in range(rows)
+    ]
+
+
+def measure(cls_data, raw):
+    """Return the bytes allocated by every object built from the rows
+    """
+
+    # build one first so the class level caches are not measured
+    build_object(cls_data, raw[0])
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build_object(cls_data, row) for row in raw]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return float(after - before) / len(objects)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print('{} rows of {} fields'.format(rows, FIELDS))
+    for columnar in (False, True):
+        cls_data = get_cls_data(make_class(columnar))
+        raw = make_rows(cls_data, rows)
+        print('{:>9}: {:.0f} bytes per row'.format(
+            'columnar' if columnar else 'variables', measure(cls_data, raw)))
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,9 @@ from .base import Compile, txorm_compile, txorm_compile_python
 from .tables import NaturalJoin, NaturalLeftJoin, NaturalRightJoin
 from .expressions import Select, Insert, Update, Delete, SetExpression
 from .expressions import Expression, PrefixExpression, SuffixExpression
+from .expressions import Param
+from .template import Template, PARAM_LIST_MARKER
+from .iterative import Nested
 from .comparable import Or, And, Eq, Ne, Gt, Ge, Lt, Le, Like, In, Count
 from .comparable import (
     CompoundOperator, NonAssocBinaryOperator, BinaryOperator
@@ -177,6 +180,21 @@ def compile_variables(compile, variable, state):
     return '?'
 
 
+@txorm_compile.when(Param)
+def compile_param(compile, param, state):
+    """Compile a template bind parameter
+
+    The Param itself is stored as parameter so the template can locate the
+    slots later. Sequence params are compiled into a marker that is
+    expanded into as many bind slots as values are given.
+    """
+    state.parameters.append(param)
+    if param.many:
+        return PARAM_LIST_MARKER
+
+    return '?'
+
+
 @txorm_compile_python.when(Variable)
 def compile_python_variable(compile, variable, state):
     """Compile any other type of variable to the right representation
@@ -744,6 +762,420 @@ def compile_sql(compile, expression, state):
     return expression.expression
 
 
+# iterative engine handlers, they must generate exactly the same statements
+# than the recursive handlers above
+@txorm_compile.when_iterative(Func, NamedFunc)
+def step_func(compile, func, state):
+    """Compile a function or named function iteratively
+    """
+
+    state.push('context', EXPR)
+    args = yield Nested(func.args)
+    state.pop()
+    yield '{}({})'.format(func.name, args)
+
+
+@txorm_compile.when_iterative(CompoundOperator)
+def step_compound_operator(compile, expression, state):
+    """Compile common compound operators iteratively
+    """
+
+    yield (yield Nested(expression.expressions, join=expression.operator))
+
+
+@txorm_compile.when_iterative(And, Or)
+def step_and_or(compile, expression, state):
+    """Compile compound operators AND & OR iteratively
+    """
+
+    yield (yield Nested(
+        expression.expressions, join=expression.operator, raw=True))
+
+
+@txorm_compile.when_iterative(NonAssocBinaryOperator)
+def step_non_assoc_binary_operator(compile, expression, state):
+    """Compile non binary associative operators iteratively
+    """
+
+    expression1 = yield Nested(expression.expressions[0])
+    state.precedence += 0.5   # enforce parenthesis
+    expression2 = yield Nested(expression.expressions[1])
+    yield '{}{}{}'.format(expression1, expression.operator, expression2)
+
+
+@txorm_compile.when_iterative(BinaryOperator)
+def step_binary_operator(compile, expression, state):
+    """Compile binary operators iteratively
+    """
+
+    expression1 = yield Nested(expression.expressions[0])
+    expression2 = yield Nested(expression.expressions[1])
+    yield '{}{}{}'.format(expression1, expression.operator, expression2)
+
+
+@txorm_compile.when_iterative(Eq)
+def step_eq(compile, eq, state):
+    """Compile Eq operator iteratively
+    """
+
+    expression1 = yield Nested(eq.expressions[0])
+    if eq.expressions[1] is None:
+        yield '{} IS NULL'.format(expression1)
+    else:
+        expression2 = yield Nested(eq.expressions[1])
+        yield '{} = {}'.format(expression1, expression2)
+
+
+@txorm_compile.when_iterative(Ne)
+def step_ne(compile, ne, state):
+    """Compile Ne operator iteratively
+    """
+
+    expression1 = yield Nested(ne.expressions[0])
+    if ne.expressions[1] is None:
+        yield '{} IS NOT NULL'.format(expression1)
+    else:
+        expression2 = yield Nested(ne.expressions[1])
+        yield '{} != {}'.format(expression1, expression2)
+
+
+@txorm_compile.when_iterative(In)
+def step_in(compile, expression, state):
+    """Compile In operator iteratively
+    """
+
+    expression1 = yield Nested(expression.expressions[0])
+    state.precedence = 0  # enforce parentehsis here
+    expression2 = yield Nested(expression.expressions[1])
+    yield '{} IN ({})'.format(expression1, expression2)
+
+
+@txorm_compile.when_iterative(Like)
+def step_like(compile, like, state):
+    """Compile a LIKE operator iteratively
+    """
+
+    expression1 = yield Nested(like.expressions[0])
+    expression2 = yield Nested(like.expressions[1])
+    statement = '{}{}{}'.format(expression1, like.operator, expression2)
+    if like.escape is not Undef:
+        escape = yield Nested(like.escape)
+        statement = '{} ESCAPE {}'.format(statement, escape)
+
+    yield statement
+
+
+@txorm_compile.when_iterative(PrefixExpression)
+def step_prefix(compile, expression, state):
+    """Compile a prefix expression iteratively
+    """
+
+    statement = yield Nested(expression.expression, raw=True)
+    yield '{} {}'.format(expression.prefix, statement)
+
+
+@txorm_compile.when_iterative(SuffixExpression)
+def step_suffix(compile, expression, state):
+    """Compile a suffix expression iteratively
+    """
+
+    statement = yield Nested(expression.expression, raw=True)
+    yield '{} {}'.format(statement, expression.suffix)
+
+
+@txorm_compile.when_iterative(AutoTables)
+def step_auto_tables(compile, expression, state):
+    """Compile auto tables iteratively
+    """
+
+    if expression.replace is True:
+        state.push('auto_tables', [])
+
+    statement = yield Nested(expression.expression)
+    if expression.replace is True:
+        state.pop()
+
+    state.auto_tables.extend(expression.tables)
+    yield statement
+
+
+@txorm_compile.when_iterative(JoinExpression)
+def step_join(compile, join, state):
+    """Compile a JOIN expression iteratively
+    """
+
+    result = []
+    if join.left is not Undef:
+        statement = yield Nested(join.left, token=True)
+        result.append(statement)
+
+        if state.join_tables is not None:
+            state.join_tables.add(statement)
+
+    result.append(join.operator)
+
+    # joins are left associative so ensure joins in the right hand
+    # argument get parenthesis enforcing it
+    state.precedence += 0.5
+    statement = yield Nested(join.right, token=True)
+    result.append(statement)
+
+    if state.join_tables is not None:
+        state.join_tables.add(statement)
+    if join.on is not Undef:
+        state.push('context', EXPR)
+        result.append('ON')
+        result.append((yield Nested(join.on, raw=True)))
+        state.pop()
+
+    yield ' '.join(result)
+
+
+# output buffer writers, they must generate exactly the same statements
+# than the regular handlers above
+@txorm_compile.when_writer(Select)
+def write_select(compile, select, state):
+    """Write a SELECT statement
+    """
+
+    buffer = state.buffer
+    buffer.append('SELECT ')
+    state.push('auto_tables', [])
+    state.push('context', FIELD)
+
+    if select.distinct:
+        buffer.append('DISTINCT ')
+        if isinstance(select.distinct, (tuple, list)):
+            buffer.append('ON (')
+            compile.write(select.distinct, state, raw=True)
+            buffer.append(') ')
+
+    compile.write(select.fields, state)
+    tables_pos = len(buffer)
+    buffer.append('')  # the FROM clause is written at the end
+    parameters_pos = len(state.parameters)
+    state.context = EXPR
+
+    tlist = ('where', 'group_by', 'having', 'order_by', 'limit', 'offset')
+    for token in tlist:
+        if getattr(select, token, Undef) is not Undef:
+            buffer.append(' {} {}'.format(
+                token.upper().replace('_', ' '),
+                getattr(select, token) if token in ('offset', 'limit') else '')
+            )
+            if token not in ('offset', 'limit'):
+                compile.write(getattr(select, token), state, raw=True)
+
+    if has_tables(state, select):
+        state.context = TABLE
+        state.push('parameters', [])
+        buffer[tables_pos] = ' FROM {}'.format(build_tables(
+            compile, select.tables, select.default_tables, state
+        ))
+        parameters = state.parameters
+        state.pop()
+        state.parameters[parameters_pos:parameters_pos] = parameters
+    state.pop()
+    state.pop()
+
+
+@txorm_compile.when_writer(Insert)
+def write_insert(compile, insert, state):
+    """Write a INSERT statement
+    """
+
+    buffer = state.buffer
+    buffer.append('INSERT INTO ')
+    table_pos = len(buffer)
+    buffer.append('')  # the table is written after the fields
+    buffer.append(' (')
+    state.push('context', FIELD_NAME)
+    compile.write(tuple(insert.map), state, token=True)
+    buffer.append(') ')
+    state.context = TABLE
+    buffer[table_pos] = build_tables(
+        compile, insert.table, insert.default_table, state)
+    state.context = EXPR
+    values = insert.values
+    if values is Undef:
+        values = [tuple(itervalues(insert.map))]
+
+    if isinstance(values, Expression):
+        compile.write(values, state)
+    else:
+        buffer.append('VALUES (')
+        first = True
+        for value in values:
+            if first is True:
+                first = False
+            else:
+                buffer.append('), (')
+            compile.write(value, state)
+        buffer.append(')')
+    state.pop()
+
+
+@txorm_compile.when_writer(Update)
+def write_update(compile, update, state):
+    """Write a UPDATE statement
+    """
+
+    buffer = state.buffer
+    buffer.append('UPDATE ')
+    table_pos = len(buffer)
+    buffer.append('')  # the table is written after the fields
+    buffer.append(' SET ')
+    _map = update.map
+    state.push('context', FIELD_NAME)
+    first = True
+    for field in _map:
+        if first is True:
+            first = False
+        else:
+            buffer.append(', ')
+        compile.write(field, state, token=True)
+        buffer.append('=')
+        compile.write(_map[field], state)
+
+    state.context = TABLE
+    buffer[table_pos] = build_tables(
+        compile, update.table, update.default_table, state)
+
+    if update.where is not Undef:
+        state.context = EXPR
+        buffer.append(' WHERE ')
+        compile.write(update.where, state, raw=True)
+
+    state.pop()
+
+
+@txorm_compile.when_writer(Delete)
+def write_delete(compile, delete, state):
+    """Write a DELETE statement
+    """
+
+    buffer = state.buffer
+    buffer.append('DELETE FROM ')
+    table_pos = len(buffer)
+    buffer.append('')  # compile later for auto_tables support
+    state.push('context', EXPR)
+    if delete.where is not Undef:
+        buffer.append(' WHERE ')
+        compile.write(delete.where, state, raw=True)
+
+    state.context = TABLE
+    buffer[table_pos] = build_tables(
+        compile, delete.table, delete.default_table, state)
+
+    state.pop()
+
+
+@txorm_compile.when_writer(Func, NamedFunc)
+def write_func(compile, func, state):
+    """Write a function or named function
+    """
+
+    state.buffer.append('{}('.format(func.name))
+    state.push('context', EXPR)
+    compile.write(func.args, state)
+    state.pop()
+    state.buffer.append(')')
+
+
+@txorm_compile.when_writer(CompoundOperator)
+def write_compound_operator(compile, expression, state):
+    """Write common compound operators
+    """
+
+    compile.write(expression.expressions, state, join=expression.operator)
+
+
+@txorm_compile.when_writer(And, Or)
+def write_and_or(compile, expression, state):
+    """Write compound operators AND & OR
+    """
+
+    compile.write(
+        expression.expressions, state, join=expression.operator, raw=True)
+
+
+@txorm_compile.when_writer(NonAssocBinaryOperator)
+def write_non_assoc_binary_operator(compile, expression, state):
+    """Write non binary associative operators
+    """
+
+    compile.write(expression.expressions[0], state)
+    state.precedence += 0.5   # enforce parenthesis
+    state.buffer.append(expression.operator)
+    compile.write(expression.expressions[1], state)
+
+
+@txorm_compile.when_writer(BinaryOperator)
+def write_binary_operator(compile, expression, state):
+    """Write binary operators
+    """
+
+    compile.write(expression.expressions[0], state)
+    state.buffer.append(expression.operator)
+    compile.write(expression.expressions[1], state)
+
+
+@txorm_compile.when_writer(Eq)
+def write_eq(compile, eq, state):
+    """Write Eq operator
+    """
+
+    compile.write(eq.expressions[0], state)
+    if eq.expressions[1] is None:
+        state.buffer.append(' IS NULL')
+    else:
+        state.buffer.append(' = ')
+        compile.write(eq.expressions[1], state)
+
+
+@txorm_compile.when_writer(Ne)
+def write_ne(compile, ne, state):
+    """Write Ne operator
+    """
+
+    compile.write(ne.expressions[0], state)
+    if ne.expressions[1] is None:
+        state.buffer.append(' IS NOT NULL')
+    else:
+        state.buffer.append(' != ')
+        compile.write(ne.expressions[1], state)
+
+
+@txorm_compile.when_writer(In)
+def write_in(compile, expression, state):
+    """Write In operator
+    """
+
+    compile.write(expression.expressions[0], state)
+    state.precedence = 0  # enforce parentehsis here
+    state.buffer.append(' IN (')
+    compile.write(expression.expressions[1], state)
+    state.buffer.append(')')
+
+
+@txorm_compile.when_writer(PrefixExpression)
+def write_prefix(compile, expression, state):
+    """Write a prefix expression
+    """
+
+    state.buffer.append('{} '.format(expression.prefix))
+    compile.write(expression.expression, state, raw=True)
+
+
+@txorm_compile.when_writer(SuffixExpression)
+def write_suffix(compile, expression, state):
+    """Write a suffix expression
+    """
+
+    compile.write(expression.expression, state, raw=True)
+    state.buffer.append(' {}'.format(expression.suffix))
+
+
 # statement expressions
 def has_tables(state, expression):
     """Determine if a given expression has tables
@@ -766,7 +1198,7 @@ def build_tables(compile, tables, default_tables, state):
 
     # single element
     if type(tables) not in (list, tuple) or len(tables) == 1:
-        return txorm_compile(tables, state, token=True)
+        return compile(tables, state, token=True)
 
     # coumpound element
     return _compile_coumpound(compile, tables, state)
@@ -912,5 +1344,5 @@ __all__ = [
     'NaturalLeftJoin', 'NaturalRightJoin', 'Union', 'Except', 'Intersect',
     'Or', 'And', 'Eq', 'Ne', 'Gt', 'Ge', 'Lt', 'Le', 'Like', 'In', 'Mul',
     'Div', 'Mod', 'Add', 'Sum', 'Sub', 'NoTableError', 'Field', 'Alias',
-    'Asc', 'Desc', 'Min', 'Max', 'Avg', 'SQLRaw'
+    'Asc', 'Desc', 'Min', 'Max', 'Avg', 'SQLRaw', 'Param', 'Template'
 ]
@@ -7,10 +7,12 @@ from __future__ import unicode_literals
 from weakref import WeakKeyDictionary
 
 from txorm.exceptions import CompileError
-from txorm.compat import binary_type, text_type
+from txorm.compat import binary_type, text_type, _PY3
 
 from .state import State
 from .plain_sql import SQLRaw, SQLToken
+from .iterative import compile_iterative
+from .cache import StatementCache, is_pristine
 
 MAX_PRECEDENCE = 1000
 
@@ -33,6 +35,23 @@ def _when(self, types):
     def wrapper(func):
         for t in types:
             self._local_dispatch_table[t] = func
+            # a new handler always shadows older iterative/writer ones
+            self._local_iterative_table.pop(t, None)
+            self._local_writer_table.pop(t, None)
+        self._update_cache()
+
+        return func
+
+    return wrapper
+
+
+def _when_alternative(self, local_table, types):
+    """Register an alternative (iterative or writer) handler for types
+    """
+
+    def wrapper(func):
+        for t in types:
+            local_table[t] = func
         self._update_cache()
 
         return func
@@ -59,13 +78,23 @@ class Compile(object):
 
     def __init__(self, parent=None):
         self._local_dispatch_table = {}
+        self._local_iterative_table = {}
+        self._local_writer_table = {}
         self._local_precedence = {}
         self._local_reserved_words = {}
         self._dispatch_table = {}
+        self._iterative_table = {}
+        self._writer_table = {}
         self._precedence = {}
         self._reserved_words = {}
+        self._resolved = {}
+        self._resolved_iterative = {}
+        self._resolved_writer = {}
         self._children = WeakKeyDictionary()
         self._parents = []
+        self.statement_cache = None
+        self.iterative = False
+        self.buffered = False
 
         if parent is not None:
             self._parents.extend(parent._parents)
@@ -87,6 +116,25 @@ class Compile(object):
                       considerd as a SQLToken, and quoted properly
         """
 
+        if self.statement_cache is not None:
+            if state is None:
+                state = State()
+            if is_pristine(state):
+                return self.statement_cache.compile(
+                    self, expression, state, join, raw, token
+                )
+
+        return self._compile(expression, state, join, raw, token)
+
+    def _compile(self, expression, state, join, raw, token):
+        """Compile the given expression bypassing the statement cache
+        """
+
+        if self.iterative is True:
+            return compile_iterative(
+                self, expression, state, join, raw, token
+            )
+
         expression_type = type(expression)
 
         if (expression_type is SQLRaw or raw
@@ -99,6 +147,15 @@ class Compile(object):
         if state is None:
             state = State()
 
+        if self.buffered is True and (
+                expression_type in (tuple, list)
+                or self._resolve_writer(expression.__class__)[1] is not None):
+            state.push('buffer', [])
+            self.write(expression, state, join, raw, token)
+            statement = _join_buffer(state.buffer)
+            state.pop()
+            return statement
+
         outer_precedence = state.precedence
         if expression_type in (tuple, list):
             compiled = []
@@ -147,6 +204,56 @@ class Compile(object):
 
         return _when(self, types)
 
+    def when_iterative(self, *types):
+        """Decorator to include an iterative type handler in this compiler
+
+        Iterative handlers are used instead of the regular ones when the
+        `iterative` attribute of the compiler is True. They are generators
+        that yield :class:`~txorm.compiler.iterative.Nested` requests to
+        compile their subexpressions and finally yield the SQL statement.
+        A regular handler registered later for the same type (in this
+        compiler or in a child) shadows the iterative one.
+
+        :param types: the types to compile
+
+        Example of usage:
+
+        .. sourcecode:: python
+
+            @compile.when_iterative(TypeA)
+            def step_type_a(compile, expr, state):
+                statement = yield Nested(expr.expression)
+                yield 'THE COMPILED {} STATEMENT'.format(statement)
+        """
+
+        return _when_alternative(self, self._local_iterative_table, types)
+
+    def when_writer(self, *types):
+        """Decorator to include a writer type handler in this compiler
+
+        Writer handlers are used instead of the regular ones when the
+        `buffered` attribute of the compiler is True. Instead of returning
+        the SQL statement they append fragments of it to `state.buffer`
+        and compile subexpressions into it with :meth:`write`. A regular
+        handler registered later for the same type (in this compiler or in
+        a child) shadows the writer, regular handlers results are just
+        appended to the buffer.
+
+        :param types: the types to compile
+
+        Example of usage:
+
+        .. sourcecode:: python
+
+            @compile.when_writer(TypeA)
+            def write_type_a(compile, expr, state):
+                state.buffer.append('THE COMPILED ')
+                compile.write(expr.expression, state)
+                state.buffer.append(' STATEMENT')
+        """
+
+        return _when_alternative(self, self._local_writer_table, types)
+
     def add_reserved_words(self, words):
         """Include words to be considered reserved and thus scaped.
 
@@ -209,54 +316,285 @@ class Compile(object):
 
         self._update_cache()
 
+    def set_statement_cache(self, size=1000):
+        """Cache the compiled statements by the shape of the expressions
+
+        Compiling an expression that has the same structure than a previously
+        compiled one (only the bound values change) reuses the SQL text and
+        just collects the new parameters. The cache is only used when the
+        compilation starts with a brand new :class:`State`, it is cleared
+        every time this compiler or any of its parents is customized.
+
+        :param size: maximum number of cached statements, None disables it
+        """
+
+        if size is None:
+            self.statement_cache = None
+        else:
+            self.statement_cache = StatementCache(size)
+
+    def set_iterative(self, iterative=True):
+        """Select the compile engine used by this compiler instance
+
+        The iterative engine walks the expression tree with an explicit
+        work stack so it doesn't hit the recursion limit with very deep
+        trees. It produces exactly the same statements than the recursive
+        one but it is a bit slower for shallow trees.
+
+        :param iterative: if True use the iterative engine
+        """
+
+        self.iterative = iterative
+
+    def set_buffered(self, buffered=True):
+        """Select the output buffer mode for this compiler instance
+
+        In output buffer mode writer handlers append the fragments of the
+        statement to a buffer shared by the whole compilation and the text
+        is materialized just once, instead of copying it in every level of
+        the expression tree. Types without a writer handler are compiled
+        with the regular ones. The iterative engine, if enabled, takes
+        precedence over this mode.
+
+        :param buffered: if True use the output buffer mode
+        """
+
+        self.buffered = buffered
+
+    def write(self, expression, state, join=', ', raw=False, token=False):
+        """Compile the given expression appending the result to state.buffer
+
+        The arguments have the same meaning than in :meth:`__call__`, this
+        is meant to be used by writer handlers only.
+        """
+
+        buffer = state.buffer
+        expression_type = type(expression)
+
+        if (expression_type is SQLRaw or raw
+                and (expression_type in (binary_type, text_type))):
+            buffer.append(expression)
+            return
+
+        if token and (expression_type in (binary_type, text_type)):
+            expression = SQLToken(expression)
+
+        outer_precedence = state.precedence
+        if expression_type in (tuple, list):
+            first = True
+            for subexpression in expression:
+                if first is True:
+                    first = False
+                else:
+                    buffer.append(join)
+
+                subexpression_type = type(subexpression)
+                if subexpression_type is SQLRaw or raw and (
+                        subexpression_type in (binary_type, text_type)):
+                    buffer.append(subexpression)
+                elif subexpression_type in (tuple, list):
+                    state.precedence = outer_precedence
+                    self.write(subexpression, state, join, raw, token)
+                else:
+                    if token and (
+                            subexpression_type in (binary_type, text_type)):
+                        subexpression = SQLToken(subexpression)
+
+                    self._write_single(
+                        subexpression, state, outer_precedence
+                    )
+        else:
+            self._write_single(expression, state, outer_precedence)
+
+        state.precedence = outer_precedence
+
     def _compile_single(self, expression, state, outer_precedence):
         """Compile a single expression
         """
 
         cls = expression.__class__
-        dispatch_table = self._dispatch_table
-        if cls in dispatch_table:
-            handler = dispatch_table[cls]
+        resolved = self._resolved.get(cls)
+        if resolved is None:
+            resolved = self._resolve(cls)
+
+        handler, inner_precedence = resolved
+        if handler is None:
+            raise CompileError(
+                'Don\'t know how to compile type {!r} of {!r}'.format(
+                    expression.__class__, expression
+                )
+            )
+
+        state.precedence = inner_precedence
+        recorder = state.recorder
+        if recorder is None:
+            statement = handler(self, expression, state)
         else:
-            for mro in cls.__mro__:
-                # first interaction always fails because we've already tested
-                # that the class itself isn't in the dispatch table
-                if mro in dispatch_table:
-                    handler = dispatch_table[mro]
-                    break
-            else:
-                raise CompileError(
-                    'Don\'t know how to compile type {!r} of {!r}'.format(
-                        expression.__class__, expression
-                    )
+            position = len(state.parameters)
+            statement = handler(self, expression, state)
+            recorder.record(expression, state.parameters, position)
+
+        if inner_precedence < outer_precedence:
+            return '({})'.format(statement)
+
+        return statement
+
+    def _write_single(self, expression, state, outer_precedence):
+        """Compile a single expression into the output buffer
+        """
+
+        cls = expression.__class__
+        handler, writer = self._resolve_writer(cls)
+        if handler is None and writer is None:
+            raise CompileError(
+                'Don\'t know how to compile type {!r} of {!r}'.format(
+                    expression.__class__, expression
                 )
+            )
 
+        buffer = state.buffer
         inner_precedence = state.precedence = self._precedence.get(
             cls, MAX_PRECEDENCE
         )
-        statement = handler(self, expression, state)
-        if inner_precedence < outer_precedence:
-            return '({})'.format(statement)
+        recorder = state.recorder
+        position = len(state.parameters)
+        if writer is None:
+            statement = handler(self, expression, state)
+            if inner_precedence < outer_precedence:
+                statement = '({})'.format(statement)
+            buffer.append(statement)
+        elif inner_precedence < outer_precedence:
+            buffer.append('(')
+            writer(self, expression, state)
+            buffer.append(')')
+        else:
+            writer(self, expression, state)
 
-        return statement
+        if recorder is not None:
+            recorder.record(expression, state.parameters, position)
+
+    def _resolve(self, cls):
+        """Resolve and memoize the handler and precedence of the given type
+
+        The handler is the one of the nearest type in the MRO that is in the
+        dispatch table, None if there is no one (negative results are also
+        memoized). The memo is discarded in every `_update_cache` call.
+        """
+
+        dispatch_table = self._dispatch_table
+        for mro in cls.__mro__:
+            if mro in dispatch_table:
+                handler = dispatch_table[mro]
+                break
+        else:
+            handler = None
+
+        resolved = self._resolved[cls] = (
+            handler, self._precedence.get(cls, MAX_PRECEDENCE)
+        )
+        return resolved
+
+    def _resolve_iterative(self, cls):
+        """Return the handler or the iterative handler for the given type
+
+        The nearest handler in the type MRO is used, only one of the two
+        is not None unless the type can not be compiled at all. Results
+        are memoized as in `_resolve`
+        """
+
+        resolved = self._resolved_iterative.get(cls)
+        if resolved is None:
+            resolved = self._resolve_alternative(
+                cls, self._iterative_table, self._resolved_iterative
+            )
+
+        return resolved
+
+    def _resolve_writer(self, cls):
+        """Return the handler or the writer handler for the given type
+
+        Works exactly like `_resolve_iterative` but for writer handlers
+        """
+
+        resolved = self._resolved_writer.get(cls)
+        if resolved is None:
+            resolved = self._resolve_alternative(
+                cls, self._writer_table, self._resolved_writer
+            )
+
+        return resolved
+
+    def _resolve_alternative(self, cls, alternative_table, resolved_table):
+        """Resolve and memoize the regular or alternative handler of cls
+        """
+
+        resolved = (None, None)
+        dispatch_table = self._dispatch_table
+        for mro in cls.__mro__:
+            if mro in alternative_table:
+                resolved = (None, alternative_table[mro])
+                break
+            if mro in dispatch_table:
+                resolved = (dispatch_table[mro], None)
+                break
+
+        resolved_table[cls] = resolved
+        return resolved
 
     def _update_cache(self):
         """Update internal compile cache
         """
 
-        for parent in self._parents:
-            self._dispatch_table.update(parent._local_dispatch_table)
-            self._precedence.update(parent._local_precedence)
-            self._reserved_words.update(parent._local_reserved_words)
-
-        self._dispatch_table.update(self._local_dispatch_table)
-        self._precedence.update(self._local_precedence)
-        self._reserved_words.update(self._local_reserved_words)
+        iterative_table = self._iterative_table
+        writer_table = self._writer_table
+        iterative_table.clear()
+        writer_table.clear()
+        for compiler in self._parents + [self]:
+            self._dispatch_table.update(compiler._local_dispatch_table)
+            self._precedence.update(compiler._local_precedence)
+            self._reserved_words.update(compiler._local_reserved_words)
+            _merge_alternative(
+                iterative_table, compiler, compiler._local_iterative_table)
+            _merge_alternative(
+                writer_table, compiler, compiler._local_writer_table)
+
+        self._resolved.clear()
+        self._resolved_iterative.clear()
+        self._resolved_writer.clear()
+        if self.statement_cache is not None:
+            self.statement_cache.clear()
 
         for child in self._children:
             child._update_cache()
 
 
+def _merge_alternative(alternative_table, compiler, local_table):
+    """Merge the local iterative or writer handlers of the given compiler
+
+    Regular handlers defined in the compiler shadow the inherited
+    alternative ones so customizations made with `when` are never bypassed.
+    """
+
+    for t in compiler._local_dispatch_table:
+        if t not in local_table:
+            alternative_table.pop(t, None)
+
+    alternative_table.update(local_table)
+
+
+def _join_buffer(buffer):
+    """Materialize the statement of the given output buffer
+    """
+
+    try:
+        return ''.join(buffer)
+    except TypeError:
+        return ''.join(
+            fragment.decode() if _PY3 and type(fragment) is binary_type
+            else text_type(fragment) for fragment in buffer
+        )
+
+
 class CompilePython(Compile):
 
     def get_matcher(self, expr):
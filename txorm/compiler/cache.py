@@ -0,0 +1,363 @@
+# -*- test-case-name: txorm.test.test_statement_cache -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Compiled statement cache
+
+Applications tend to issue the same few hundred statement shapes over and
+over with only the bound values changing. The :class:`StatementCache` keys
+the compiled SQL text by a structural fingerprint of the expression tree
+so the compiler recursion can be skipped entirely on a hit, only the new
+parameters are collected into `State.parameters`.
+"""
+
+from __future__ import unicode_literals
+
+from decimal import Decimal
+from collections import OrderedDict
+from datetime import datetime, date, time, timedelta
+
+from txorm.variable import Variable
+from txorm.compat import integer_types, text_type, binary_type
+
+from .expressions import Expression, SetExpression
+
+# literal types that are always compiled as bind parameters when they are
+# found inside a sequence or a mapping of the expression tree
+_PLACEHOLDER_TYPES = frozenset(
+    integer_types + (bool, float, Decimal, datetime, date, time, timedelta)
+)
+
+# literal types that end either as bind parameters or as SQL text depending
+# on the handler that compiles them
+_STRING_TYPES = frozenset((text_type, binary_type))
+
+# slots that never have any effect in the generated SQL text
+_IGNORED_SLOTS = frozenset(
+    ('compile_cache', 'compile_id', 'variable_factory', 'primary', '_parts')
+)
+
+# set expressions create auto named aliases and modify their subexpressions
+_UNCACHEABLE_TYPES = (SetExpression,)
+
+_MISSING = object()
+_slots_cache = {}
+
+
+class Uncacheable(Exception):
+    """Raised when an expression tree can not be safely cached
+    """
+
+
+class StatementCache(object):
+    """Bounded LRU cache of compiled statements
+
+    :param size: the maximum number of statements to keep in the cache
+
+    :var hits: number of compilations served from the cache
+    :var misses: number of compilations that had to run the compiler
+    :var evictions: number of entries discarded to honor `size`
+    """
+
+    def __init__(self, size=1000):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sql_strings = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Discard all the cached statements
+        """
+
+        self._entries.clear()
+        self._sql_strings.clear()
+
+    def compile(self, compile, expression, state, join, raw, token):
+        """Compile the given expression using the cache if possible
+
+        :param compile: the :class:`Compile` instance that owns this cache
+        :param expression: the expression to compile
+        :param state: a pristine :class:`State` instance
+        """
+
+        try:
+            shape, leaves, placeholders, strings = fingerprint(
+                expression, join, raw, token)
+        except Uncacheable:
+            return self._compile(compile, expression, state, join, raw, token)
+
+        key = self._key(shape, leaves)
+        entry = self._entries.pop(key, _MISSING)
+        if entry is not _MISSING:
+            self._entries[key] = entry
+            if entry is None:
+                return self._compile(
+                    compile, expression, state, join, raw, token)
+
+            self.hits += 1
+            statement, slots = entry
+            state.parameters.extend(
+                leaves[index] if factory is None else factory(leaves[index])
+                for index, factory in slots
+            )
+            return statement
+
+        self.misses += 1
+        recorder = _Recorder(leaves)
+        state.recorder = recorder
+        try:
+            statement = compile._compile(expression, state, join, raw, token)
+        finally:
+            state.recorder = None
+
+        slots = recorder.slots(state.parameters, placeholders)
+        sql_strings = recorder.unused(strings)
+        if sql_strings:
+            self._sql_strings[shape] = sql_strings
+            self._evict(self._sql_strings)
+        else:
+            self._sql_strings.pop(shape, None)
+
+        self._store(
+            self._key(shape, leaves),
+            None if slots is None else (statement, slots)
+        )
+        return statement
+
+    def _key(self, shape, leaves):
+        """Return the key of the entry for the given shape
+
+        Strings are part of the shape only by their type, the values of
+        the ones that ended as SQL text the last time the shape was
+        compiled are added to the key
+        """
+
+        sql_strings = self._sql_strings.get(shape)
+        if sql_strings is None:
+            return shape
+
+        return shape, tuple(leaves[index] for index in sql_strings)
+
+    def _compile(self, compile, expression, state, join, raw, token):
+        """Compile without caching, nested calls must not use the cache
+        """
+
+        state.recorder = _passthrough
+        try:
+            return compile._compile(expression, state, join, raw, token)
+        finally:
+            state.recorder = None
+
+    def _store(self, key, entry):
+        """Store a new entry evicting the least recently used if needed
+        """
+
+        self._entries[key] = entry
+        self.evictions += self._evict(self._entries)
+
+    def _evict(self, entries):
+        """Discard the oldest entries beyond `size` returning how many
+        """
+
+        evicted = 0
+        while len(entries) > self.size:
+            entries.popitem(last=False)
+            evicted += 1
+
+        return evicted
+
+
+class _Recorder(object):
+    """Track which tree leaf produced every compiled parameter
+    """
+
+    __slots__ = ('leaf_index', 'wrapped')
+
+    def __init__(self, leaves):
+        self.leaf_index = dict((id(leaf), i) for i, leaf in enumerate(leaves))
+        self.wrapped = {}
+
+    def record(self, expression, parameters, position):
+        """Record the parameters a leaf handler has just appended
+        """
+
+        index = self.leaf_index.get(id(expression))
+        if index is None:
+            return
+
+        for parameter in parameters[position:]:
+            if parameter is not expression:
+                self.wrapped[id(parameter)] = index
+
+    def slots(self, parameters, placeholders):
+        """Return the slots to rebuild the parameters, None if impossible
+        """
+
+        slots = []
+        consumed = set()
+        for parameter in parameters:
+            index = self.wrapped.get(id(parameter))
+            if index is not None:
+                if not isinstance(parameter, Variable):
+                    return None
+                slots.append((index, type(parameter)))
+            else:
+                index = self.leaf_index.get(id(parameter))
+                if index is None:
+                    return None
+                slots.append((index, None))
+
+            consumed.add(index)
+
+        if not consumed.issuperset(placeholders):
+            # some literal was rendered into the statement text
+            return None
+
+        return tuple(slots)
+
+    def unused(self, leaves):
+        """Return the given leaves indexes that were not bound as parameters
+        """
+
+        used = set(self.wrapped.values())
+        return tuple(index for index in leaves if index not in used)
+
+
+class _Passthrough(object):
+    """Recorder used while compiling trees that are not cached
+    """
+
+    __slots__ = ()
+
+    def record(self, expression, parameters, position):
+        pass
+
+_passthrough = _Passthrough()
+
+
+def is_pristine(state):
+    """Determine if the given state has not been used to compile anything
+    """
+
+    return (
+        state.recorder is None and not state._stack and not state.parameters
+        and state.precedence == 0 and not state.auto_tables
+        and state.context is None and state.aliases is None
+        and state.join_tables is None and state.buffer is None
+    )
+
+
+def fingerprint(expression, join=', ', raw=False, token=False):
+    """Compute the structural fingerprint of an expression tree
+
+    Node types, table and field names, operators and any other attribute
+    that ends in the statement text are part of the key while literal
+    values and :class:`Variable` instances are replaced by placeholders.
+    Leaves found more than once are encoded as references so two trees
+    with the same key have exactly the same aliasing.
+
+    Strings are replaced by placeholders too as most of them are bound
+    values, the cache adds the value of the ones that end as SQL text to
+    the key (see :meth:`StatementCache._key`). A string object found more
+    than once is always part of the key by value.
+
+    :return: a tuple with the hashable key, the list of leaves, the
+        indexes of the literal leaves that must end as bind parameters and
+        the indexes of the string leaves
+    """
+
+    key = [join, raw, token]
+    leaves = []
+    placeholders = []
+    strings = {}
+    seen = {}
+    stack = [(expression, True)]
+    while stack:
+        value, contained = stack.pop()
+        cls = type(value)
+        if cls is tuple or cls is list:
+            key.append((cls, len(value)))
+            stack.extend((item, True) for item in reversed(value))
+            continue
+
+        if cls is dict:
+            key.append((cls, len(value)))
+            for item in reversed(list(value.items())):
+                stack.append((item[1], True))
+                stack.append((item[0], True))
+            continue
+
+        if isinstance(value, Expression):
+            if isinstance(value, _UNCACHEABLE_TYPES):
+                raise Uncacheable(cls)
+
+            key.append(cls)
+            stack.extend(
+                (getattr(value, slot, _MISSING), False)
+                for slot in reversed(_get_slots(cls))
+            )
+            continue
+
+        if isinstance(value, type):
+            key.append(value)
+            continue
+
+        if cls in _STRING_TYPES:
+            position = strings.get(id(value), (None,))[0]
+            if position is not None:
+                key[position] = (cls, value)
+                key.append((cls, value))
+            else:
+                strings[id(value)] = (len(key), len(leaves))
+                key.append(('?', cls))
+            leaves.append(value)
+            continue
+
+        index = seen.get(id(value))
+        if index is not None:
+            key.append(('ref', index))
+            continue
+
+        index = seen[id(value)] = len(leaves)
+        leaves.append(value)
+        if isinstance(value, Variable):
+            key.append(('?', cls))
+        elif contained and cls in _PLACEHOLDER_TYPES:
+            key.append(('?', cls))
+            placeholders.append(index)
+        else:
+            try:
+                hash(value)
+            except TypeError:
+                raise Uncacheable(cls)
+            key.append((cls, value))
+
+    return tuple(key), leaves, placeholders, tuple(sorted(
+        index for position, index in strings.values()
+        if key[position][0] == '?'
+    ))
+
+
+def _get_slots(cls):
+    """Return all the relevant slots names of the given expression class
+    """
+
+    slots = _slots_cache.get(cls)
+    if slots is None:
+        slots = []
+        for klass in reversed(cls.__mro__):
+            names = klass.__dict__.get('__slots__', ())
+            if isinstance(names, (text_type, binary_type)):
+                names = (names,)
+            slots.extend(
+                name for name in names
+                if name not in _IGNORED_SLOTS and name not in slots
+            )
+        slots = _slots_cache[cls] = tuple(slots)
+
+    return slots
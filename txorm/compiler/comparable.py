@@ -10,7 +10,24 @@ from txorm import Undef
 from .prefixes import Neg
 from txorm.variable import Variable
 from txorm.compat import u, text_type
-from .expressions import ExpressionError, Expression
+from .expressions import ExpressionError, Expression, Param
+
+
+def bind_param(comparable, param, many=False):
+    """Bind the variable factory of the given comparable to a Param
+
+    Returns a new :class:`Param` so the same one can be used with
+    different fields in the same expression.
+    """
+
+    if param.variable_factory is not Undef and (param.many or not many):
+        return param
+
+    variable_factory = param.variable_factory
+    if variable_factory is Undef:
+        variable_factory = getattr(comparable, 'variable_factory', Variable)
+
+    return Param(param.name, variable_factory, many or param.many)
 
 
 def extract_variable(func):
@@ -19,6 +36,8 @@ def extract_variable(func):
     def wrapper(self, other, *args, **kwargs):
         if not isinstance(other, (Expression, Variable)):
             other = getattr(self, 'variable_factory', Variable)(value=other)
+        elif type(other) is Param:
+            other = bind_param(self, other)
 
         return func(self, other, *args, **kwargs)
 
@@ -39,11 +58,15 @@ class Comparable(object):
     def __eq__(self, other):
         if other is not None and not isinstance(other, (Expression, Variable)):
             other = getattr(self, 'variable_factory', Variable)(value=other)
+        elif type(other) is Param:
+            other = bind_param(self, other)
         return Eq(self, other)
 
     def __ne__(self, other):
         if other is not None and not isinstance(other, (Expression, Variable)):
             other = getattr(self, 'variable_factory', Variable)(value=other)
+        elif type(other) is Param:
+            other = bind_param(self, other)
         return Ne(self, other)
 
     @extract_variable
@@ -107,6 +130,8 @@ class Comparable(object):
         return Neg(self)
 
     def is_in(self, others):
+        if type(others) is Param:
+            return In(self, bind_param(self, others, many=True))
         if not isinstance(others, Expression):
             others = list(others)
             if not others:
@@ -199,10 +224,77 @@ class NonAssocBinaryOperator(BinaryOperator):
 
 class CompoundOperator(CompoundExpression):
     """Compound operator
+
+    Subexpressions of exactly the same type are merged into a flat
+    `expressions` tuple so `a & b & c` is `And(a, b, c)` and not
+    `And(And(a, b), c)`, the compiled statement is the same. They are
+    merged the first time `expressions` is accessed
     """
-    __slots__ = ()
+    __slots__ = ('_parts',)
     operator = ' (unknown) '
 
+    def __init__(self, *expressions):
+        self._parts = expressions
+
+    @property
+    def expressions(self):
+        parts = self._parts
+        if parts is not None:
+            _expressions_slot.__set__(self, _flatten(self.__class__, parts))
+            self._parts = None
+
+        return _expressions_slot.__get__(self, CompoundExpression)
+
+    @expressions.setter
+    def expressions(self, expressions):
+        self._parts = tuple(expressions)
+
+    @classmethod
+    def of(cls, expressions):
+        """Build an operator with all the expressions in the given iterable
+
+        :param expressions: an iterable of expressions
+        """
+
+        operator = cls.__new__(cls)
+        operator._parts = tuple(expressions)
+        return operator
+
+
+# the slot that stores the merged expressions of compound operators
+_expressions_slot = CompoundExpression.__dict__['expressions']
+
+
+def _flatten(cls, expressions):
+    """Merge the subexpressions of the given type into its parent tuple
+
+    Subexpressions not merged yet are walked instead of merged on their
+    own, so a left deep chain like `reduce(operator.and_, conditions)`
+    is merged in linear time
+    """
+
+    for expression in expressions:
+        if type(expression) is cls:
+            break
+    else:
+        return expressions
+
+    flat = []
+    stack = [iter(expressions)]
+    while stack:
+        for expression in stack[-1]:
+            if type(expression) is not cls:
+                flat.append(expression)
+            elif expression._parts is None:
+                flat.extend(expression.expressions)
+            else:
+                stack.append(iter(expression._parts))
+                break
+        else:
+            stack.pop()
+
+    return tuple(flat)
+
 
 class Eq(BinaryOperator):
     """Equality operator
@@ -233,3 +233,25 @@ class Sequence(Expression):
 
     def __init__(self, name):
         self.name = name
+
+
+class Param(Expression):
+    """Expression representing a named bind parameter of a query template
+
+    Params are compiled into bind slots that are filled later with the
+    values given to :meth:`compiler.template.Template.bind`.
+
+    :param name: the name of the parameter
+    :param variable_factory: factory producing the
+        :class:`txorm.variable.Variable` used to convert the bound values,
+        it is taken from the compared field if not given
+    :param many: if True the parameter expects a sequence of values that
+        is expanded into a list of bind slots (used by IN clauses)
+    """
+
+    __slots__ = ('name', 'variable_factory', 'many')
+
+    def __init__(self, name, variable_factory=Undef, many=False):
+        self.name = name
+        self.variable_factory = variable_factory
+        self.many = many
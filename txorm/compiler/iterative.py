@@ -0,0 +1,183 @@
+# -*- test-case-name: txorm.test.test_iterative -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Iterative (non recursive) compile engine
+
+The default engine recurses for every nested expression, very deep trees
+like long chains of `And`/`Or` or `Join` expressions cost many Python stack
+frames and can hit the recursion limit. This engine walks the expression
+tree with an explicit work stack instead.
+
+Handlers registered with :meth:`Compile.when_iterative` are generator
+functions that yield :class:`Nested` requests to compile subexpressions,
+the compiled statement is sent back to them, and finally yield their own
+statement. Example of usage:
+
+.. sourcecode:: python
+
+    @compile.when_iterative(Eq)
+    def step_eq(compile, eq, state):
+        expression1 = yield Nested(eq.expressions[0])
+        expression2 = yield Nested(eq.expressions[1])
+        yield '{} = {}'.format(expression1, expression2)
+
+Types without an iterative handler are compiled with the regular ones.
+"""
+
+from __future__ import unicode_literals
+
+from types import GeneratorType
+
+from txorm.exceptions import CompileError
+from txorm.compat import binary_type, text_type
+
+from .state import State
+from .plain_sql import SQLRaw, SQLToken
+
+# types that are not compiled by a single handler call
+_NOT_SINGLE = frozenset((SQLRaw, binary_type, text_type, tuple, list))
+
+
+class Nested(object):
+    """Request the compilation of a subexpression from an iterative handler
+
+    The arguments have the same meaning than in :meth:`Compile.__call__`
+    """
+
+    __slots__ = ('expression', 'join', 'raw', 'token')
+
+    def __init__(self, expression, join=', ', raw=False, token=False):
+        self.expression = expression
+        self.join = join
+        self.raw = raw
+        self.token = token
+
+
+def compile_iterative(compile, expression, state, join, raw, token):
+    """Compile the given expression using an explicit work stack
+
+    Every frame in the stack is a generator that yields either a new frame
+    (a generator or a :class:`Nested` request) or its compiled statement.
+    Expressions without iterative handler are compiled right away with the
+    regular `_compile_single` instead of pushing new frames for them.
+    """
+
+    if state is None:
+        state = State()
+
+    stack = [_compile_frame(compile, expression, state, join, raw, token)]
+    value = None
+    while True:
+        item = stack[-1].send(value)
+        item_type = type(item)
+        if item_type is GeneratorType:
+            stack.append(item)
+            value = None
+        elif item_type is Nested:
+            expression = item.expression
+            expression_type = type(expression)
+            if expression_type not in _NOT_SINGLE:
+                handler, step = compile._resolve_iterative(expression_type)
+                if step is None:
+                    # leaf fast path, see _compile_frame
+                    outer_precedence = state.precedence
+                    value = compile._compile_single(
+                        expression, state, outer_precedence)
+                    state.precedence = outer_precedence
+                    continue
+
+            stack.append(_compile_frame(
+                compile, expression, state, item.join, item.raw, item.token
+            ))
+            value = None
+        else:
+            stack.pop()
+            if not stack:
+                return item
+            value = item
+
+
+def _compile_frame(compile, expression, state, join, raw, token):
+    """Iterative counterpart of :meth:`Compile._compile`
+    """
+
+    expression_type = type(expression)
+
+    if (expression_type is SQLRaw or raw
+            and (expression_type in (binary_type, text_type))):
+        yield expression
+        return
+
+    if token and (expression_type in (binary_type, text_type)):
+        expression = SQLToken(expression)
+
+    outer_precedence = state.precedence
+    if expression_type in (tuple, list):
+        compiled = []
+        for subexpression in expression:
+            subexpression_type = type(subexpression)
+            if subexpression_type is SQLRaw or raw and (
+                    subexpression_type in (binary_type, text_type)):
+                statement = subexpression
+            elif subexpression_type in (tuple, list):
+                state.precedence = outer_precedence
+                statement = yield _compile_frame(
+                    compile, subexpression, state, join, raw, token
+                )
+            else:
+                if token and (
+                        subexpression_type in (binary_type, text_type)):
+                    subexpression = SQLToken(subexpression)
+
+                handler, step = compile._resolve_iterative(
+                    subexpression.__class__)
+                if step is None:
+                    statement = compile._compile_single(
+                        subexpression, state, outer_precedence
+                    )
+                else:
+                    statement = yield _single_frame(
+                        compile, subexpression, state, outer_precedence
+                    )
+
+            compiled.append(statement)
+
+        statement = join.join((text_type(v) for v in compiled))
+    else:
+        statement = yield _single_frame(
+            compile, expression, state, outer_precedence
+        )
+
+    state.precedence = outer_precedence
+    yield statement
+
+
+def _single_frame(compile, expression, state, outer_precedence):
+    """Iterative counterpart of :meth:`Compile._compile_single`
+    """
+
+    cls = expression.__class__
+    handler, step = compile._resolve_iterative(cls)
+    if handler is None and step is None:
+        raise CompileError(
+            'Don\'t know how to compile type {!r} of {!r}'.format(
+                expression.__class__, expression
+            )
+        )
+
+    inner_precedence = state.precedence = compile.get_precedence(cls)
+    recorder = state.recorder
+    position = len(state.parameters)
+    if step is not None:
+        statement = yield step(compile, expression, state)
+    else:
+        statement = handler(compile, expression, state)
+
+    if recorder is not None:
+        recorder.record(expression, state.parameters, position)
+
+    if inner_precedence < outer_precedence:
+        statement = '({})'.format(statement)
+
+    yield statement
@@ -42,6 +42,10 @@ class State(object):
     :param context: an instance of :class:`Context`, specifying the context of
         the expression currently being compiled
     :param precedence: current precedence
+    :param recorder: used by :class:`compiler.cache.StatementCache` to track
+        the origin of the parameters while compiling, None otherwise
+    :param buffer: the list of statement fragments written by the compiler
+        writer handlers in output buffer mode, None otherwise
     """
 
     def __init__(self):
@@ -52,6 +56,8 @@ class State(object):
         self.join_tables = None
         self.context = None
         self.aliases = None
+        self.recorder = None
+        self.buffer = None
 
     def push(self, attr, new_value=Undef):
         """Set an attribite in a way that can later be reverted with `pop`
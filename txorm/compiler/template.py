@@ -0,0 +1,215 @@
+# -*- test-case-name: txorm.test.test_template -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Prepared query templates
+
+A :class:`Template` compiles an expression containing :class:`Param` bind
+slots only once, binding new values to it later does not allocate any
+expression object and does not run the compiler at all.
+"""
+
+from __future__ import unicode_literals
+
+from copy import copy
+
+from txorm import Undef
+from txorm.variable import Variable
+from txorm.compat import iteritems
+
+from .state import State
+from .base import txorm_compile
+from .comparable import bind_param
+from .expressions import Expression, Insert, Update, Param
+
+# placeholder for sequence template params, never present in valid SQL text
+PARAM_LIST_MARKER = '\x00'
+
+
+class Template(object):
+    """A statement compiled once that can be executed with different values
+
+    Example of usage:
+
+    .. sourcecode:: python
+
+        template = Template(
+            Select(Foo.id, Foo.name == Param('name'), order_by=Foo.id))
+        statement, params = template.bind(name='foo')
+        connection.execute(statement, params)
+
+    Params compared with fields take the field variable factory so the
+    bound values are converted exactly as any other value of that field.
+    Use `Foo.id.is_in(Param('ids'))` to bind sequences of variable length.
+
+    :param expression: the expression to compile
+    :param compile: the compiler to use, `txorm_compile` by default
+    """
+
+    def __init__(self, expression, compile=txorm_compile):
+        self.expression = expression
+        if isinstance(expression, (Insert, Update)):
+            expression = _bind_map_params(expression)
+
+        state = State()
+        self.statement = compile(expression, state)
+        if PARAM_LIST_MARKER in self.statement:
+            self._fragments = self.statement.split(PARAM_LIST_MARKER)
+        else:
+            self._fragments = None
+
+        slots = []
+        names = set()
+        for parameter in state.parameters:
+            if isinstance(parameter, Param):
+                factory = parameter.variable_factory
+                if factory is Undef:
+                    factory = Variable
+                slots.append((parameter.name, factory, parameter.many))
+                names.add(parameter.name)
+            else:
+                slots.append((None, parameter, False))
+
+        self.slots = tuple(slots)
+        self.names = frozenset(names)
+
+    def bind(self, **values):
+        """Bind the given values to the template params
+
+        :return: a tuple with the statement and the sequence of variables
+            ready to be passed to :meth:`Connection.execute`
+        """
+
+        if len(values) != len(self.names):
+            self._check_names(values)
+
+        params = []
+        lengths = []
+        for name, factory, many in self.slots:
+            if name is None:
+                params.append(factory)
+                continue
+
+            try:
+                value = values[name]
+            except KeyError:
+                self._check_names(values)
+
+            if many is True:
+                params.extend(factory(value=item) for item in value)
+                lengths.append(len(value))
+            else:
+                params.append(factory(value=value))
+
+        if self._fragments is None:
+            return self.statement, tuple(params)
+
+        return self._expand(lengths), tuple(params)
+
+    def bind_many(self, rows):
+        """Convert many sets of values into rows of database values
+
+        Unlike :meth:`bind` every value is converted straight into its
+        database representation using one prototype variable per slot so
+        the result is ready to be passed to DB-API `executemany`. The
+        statement to use is always `self.statement`.
+
+        :param rows: iterable of dictionaries with the values to bind
+        :return: a generator of tuples of database values
+        """
+
+        if self._fragments is not None:
+            raise ValueError(
+                'Templates with sequence params generate a different '
+                'statement for every set of values'
+            )
+
+        converters = []
+        for name, factory, many in self.slots:
+            if name is not None:
+                factory = factory()
+            elif isinstance(factory, Variable):
+                factory = factory.get(to_db=True)
+            converters.append((name, factory))
+
+        for values in rows:
+            if len(values) != len(self.names):
+                self._check_names(values)
+
+            row = []
+            for name, converter in converters:
+                if name is None:
+                    row.append(converter)
+                    continue
+
+                try:
+                    converter.set(values[name])
+                except KeyError:
+                    self._check_names(values)
+                row.append(converter.get(to_db=True))
+
+            yield tuple(row)
+
+    def _expand(self, lengths):
+        """Expand sequence params markers into as many slots as values
+        """
+
+        fragments = self._fragments
+        tokens = [fragments[0]]
+        for length, fragment in zip(lengths, fragments[1:]):
+            tokens.append(', '.join(['?'] * length) if length else 'NULL')
+            tokens.append(fragment)
+
+        return ''.join(tokens)
+
+    def _check_names(self, values):
+        """Raise a TypeError describing missing or unexpected params
+        """
+
+        missing = self.names.difference(values)
+        if missing:
+            raise TypeError('Missing values for params: {}'.format(
+                ', '.join(sorted(missing))
+            ))
+
+        unexpected = set(values).difference(self.names)
+        if unexpected:
+            raise TypeError('Unexpected params: {}'.format(
+                ', '.join(sorted(unexpected))
+            ))
+
+
+def _bind_map_params(expression):
+    """Bind the fields variable factories to the params of an INSERT/UPDATE
+    """
+
+    fields = tuple(expression.map)
+    _map = expression.map
+    if isinstance(_map, dict):
+        _map = dict(
+            (field, _bind(field, value)) for field, value in iteritems(_map)
+        )
+
+    values = getattr(expression, 'values', Undef)
+    if values is not Undef and not isinstance(values, Expression):
+        values = [
+            tuple(_bind(field, value) for field, value in zip(fields, row))
+            for row in values
+        ]
+
+    expression = copy(expression)
+    expression.map = _map
+    if values is not Undef:
+        expression.values = values
+
+    return expression
+
+
+def _bind(field, value):
+    if type(value) is Param:
+        return bind_param(field, value)
+
+    return value
+
+
+__all__ = ['Template', 'Param']
@@ -2,12 +2,26 @@
 # Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
 # See LICENSE for details
 
+import sys
 from contextlib import contextmanager
 
-from .database import Database
+from .database import Database, _database_schemes
 from .connection import Connection
 
 
+def _create_aiosqlite(uri):
+    """Create an asyncio SQLite database, the :mod:`txorm.database.aio`
+    module uses native coroutines so it is only imported when needed
+    """
+
+    from .aio import create_from_uri
+    return create_from_uri(uri)
+
+
+if sys.version_info >= (3, 7):
+    _database_schemes['aiosqlite'] = _create_aiosqlite
+
+
 @contextmanager
 def transaction(pool):
     """Context that creates a new transaction context
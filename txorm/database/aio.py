@@ -0,0 +1,399 @@
+# -*- test-case-name: txorm.test.test_aio -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Native asyncio database backend (Python 3 only)
+
+:class:`AsyncConnection` compiles statements with the same compiler and
+returns the same :class:`Result` objects than the Twisted adbapi
+:class:`Connection` but it talks to non-blocking drivers from the asyncio
+event loop so queries don't have to hop into a thread pool.
+
+Drivers are plugged in overriding :meth:`AsyncDatabase.raw_connect`, it
+must return a connection with these coroutine methods (the interface of
+aiosqlite connections):
+
+* `execute(statement, params)` and `executemany(statement, rows)` return
+  a cursor with the `rowcount` attribute and the `fetchall()` and
+  `fetchmany(size)` coroutines
+* `commit()`, `rollback()` and `close()`
+
+Drivers can also provide an `execute_fetchall(statement, params)`
+coroutine that executes and fetches the rows in a single step.
+
+A sqlite3 driver running every connection in its own thread is included,
+it is available in :func:`create_database` with the `aiosqlite` scheme.
+"""
+
+import sqlite3
+import asyncio
+import functools
+from itertools import chain, islice
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from txorm.compiler import txorm_compile
+from txorm.object_data import get_cls_data
+from txorm.compiler.template import Template
+from txorm.compiler.expressions import Expression
+from txorm.database.bulk import BulkInsert
+from txorm.database.result import Result
+from txorm.database.database import Database
+from txorm.database.connection import Connection, prepare_statement
+
+
+class AsyncPool(object):
+    """The driver connections of an :class:`AsyncDatabase`
+
+    Up to `database.pool_size` driver connections are opened on demand
+    and reused afterwards by all the connections of the database.
+
+    :param database: the database to open the driver connections to
+    """
+
+    def __init__(self, database):
+        self._database = database
+        self.pool_size = database.pool_size
+        self._idle = []
+        self._slots = None
+
+    async def acquire(self):
+        """Return an idle driver connection or a new one if there is room
+        """
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+
+        await self._slots.acquire()
+        if self._idle:
+            return self._idle.pop()
+
+        try:
+            return await self._database.raw_connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection):
+        """Give back a healthy driver connection to be reused
+        """
+
+        self._idle.append(connection)
+        self._slots.release()
+
+    async def discard(self, connection):
+        """Give back a broken driver connection closing it
+        """
+
+        self._slots.release()
+        try:
+            await connection.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        """Close all the idle driver connections
+        """
+
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await connection.close()
+
+
+class AsyncConnection(object):
+    """A connection to a database driven by the asyncio event loop
+
+    Every public method is a coroutine, the driver connections come from
+    the pool shared by all the connections of the database (see
+    :meth:`AsyncDatabase.get_pool`).
+    """
+
+    result_factory = Result
+    compile = txorm_compile
+    to_database = staticmethod(Connection.to_database)
+
+    def __init__(self, database):
+        self._database = database
+        self._pool = database.get_pool()
+        self.pool_size = self._pool.pool_size
+
+    async def execute(self, statement, params=None, noresult=False):
+        """Execute a statement and return its :class:`Result`
+
+        The statement is committed as in :meth:`Connection.execute`
+
+        :param statement: the statement, expression or template to execute
+        :param params: the params to fill the statement query with, for
+            templates a dictionary with the values to bind
+        :param noresult: if True the rows are not fetched and None is
+            returned
+        """
+
+        statement, params, fields = prepare_statement(
+            self.compile, statement, params)
+        params = tuple(self.to_database(params or ()))
+        async with self.transaction() as connection:
+            if noresult is True:
+                await connection.execute(statement, params)
+                return None
+
+            execute_fetchall = getattr(connection, 'execute_fetchall', None)
+            if execute_fetchall is not None:
+                rows = await execute_fetchall(statement, params)
+            else:
+                cursor = await connection.execute(statement, params)
+                rows = await cursor.fetchall()
+
+        return self.result_factory(rows, fields)
+
+    async def execute_transact(self, transact_chain, *args, **kwargs):
+        """Run a coroutine function inside of a transaction
+
+        :param transact_chain: a coroutine function whose first argument is
+            the driver connection
+        :return: the return value of `transact_chain`
+        """
+
+        async with self.transaction() as connection:
+            return await transact_chain(connection, *args, **kwargs)
+
+    async def execute_many(self, statement, param_rows, chunk_size=1000):
+        """Execute the same statement once for every set of parameters
+
+        Works as :meth:`Connection.execute_many`, every chunk of
+        `chunk_size` parameter sets is committed on its own.
+
+        :return: a list with the rowcount of every chunk
+        """
+
+        if isinstance(statement, Expression):
+            statement = Template(statement, self.compile)
+
+        if isinstance(statement, Template):
+            rows = statement.bind_many(param_rows)
+            statement = statement.statement
+        else:
+            rows = (tuple(self.to_database(row)) for row in param_rows)
+
+        rowcounts = []
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            async with self.transaction() as connection:
+                cursor = await connection.executemany(statement, chunk)
+                rowcounts.append(cursor.rowcount)
+
+        return rowcounts
+
+    async def bulk_insert(self, rows, fields=None, max_rows=1000,
+                          max_params=None, max_bytes=None, concurrency=2):
+        """Insert a lot of rows using multi-row INSERT statements
+
+        Works as :meth:`Connection.bulk_insert`
+
+        :return: the number of inserted rows
+        """
+
+        rows = iter(rows)
+        if fields is None:
+            for first in rows:
+                break
+            else:
+                return 0
+
+            fields = get_cls_data(type(first)).fields
+            rows = chain((first,), rows)
+
+        bulk = BulkInsert(
+            self.compile, fields, max_rows, max_params, max_bytes)
+        chunks = bulk.chunks(rows)
+
+        async def work():
+            count = 0
+            for statement, params, rows_count in chunks:
+                async with self.transaction() as connection:
+                    cursor = await connection.execute(statement, params)
+                    rowcount = cursor.rowcount
+                if rowcount is None or rowcount < 0:
+                    rowcount = rows_count
+                count += rowcount
+
+            return count
+
+        counts = await asyncio.gather(*[work() for _ in range(concurrency)])
+        return sum(counts)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Context that holds a driver connection inside of a transaction
+
+        The transaction is committed at the end or rolled back if there is
+        some failure.
+        """
+
+        pool = self._pool
+        connection = await pool.acquire()
+        try:
+            yield connection
+        except BaseException:
+            try:
+                await connection.rollback()
+            except Exception:
+                await pool.discard(connection)
+            else:
+                pool.release(connection)
+            raise
+        else:
+            try:
+                await connection.commit()
+            except BaseException:
+                await pool.discard(connection)
+                raise
+            pool.release(connection)
+
+    async def close(self):
+        """Close all the idle driver connections of the database pool
+        """
+
+        await self._pool.close()
+
+
+class AsyncDatabase(Database):
+    """A database that can be connected to from the asyncio event loop
+
+    :param pool_size: maximum number of driver connections
+    """
+
+    connection_factory = AsyncConnection
+
+    def __init__(self, pool_size=10):
+        super(AsyncDatabase, self).__init__()
+        self.pool_size = pool_size
+
+    async def raw_connect(self):
+        """Create a raw driver connection
+
+        It must be overriden in subclasses
+        """
+
+        raise NotImplementedError
+
+    def get_pool(self):
+        """Return the :class:`AsyncPool` shared by all the connections
+        """
+
+        if self._pool is None:
+            self._pool = AsyncPool(self)
+
+        return self._pool
+
+
+class SQLiteConnection(object):
+    """A sqlite3 connection that runs in its own thread
+
+    :param connection: the sqlite3 connection
+    :param executor: the single thread executor the connection runs in
+    """
+
+    def __init__(self, connection, executor):
+        self._connection = connection
+        self._executor = executor
+
+    @classmethod
+    async def connect(cls, database, **kwargs):
+        """Open a new connection to the given sqlite database file
+        """
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        connection = await asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(sqlite3.connect, database, **kwargs)
+        )
+        return cls(connection, executor)
+
+    async def execute(self, statement, params=()):
+        cursor = await self._run(self._connection.execute, statement, params)
+        return SQLiteCursor(self, cursor)
+
+    async def execute_fetchall(self, statement, params=()):
+        return await self._run(self._execute_fetchall, statement, params)
+
+    async def executemany(self, statement, rows):
+        cursor = await self._run(
+            self._connection.executemany, statement, rows)
+        return SQLiteCursor(self, cursor)
+
+    async def commit(self):
+        if self._connection.in_transaction:
+            await self._run(self._connection.commit)
+
+    async def rollback(self):
+        if self._connection.in_transaction:
+            await self._run(self._connection.rollback)
+
+    async def close(self):
+        await self._run(self._connection.close)
+        self._executor.shutdown(wait=False)
+
+    def _execute_fetchall(self, statement, params):
+        return self._connection.execute(statement, params).fetchall()
+
+    def _run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args)
+
+
+class SQLiteCursor(object):
+    """The cursor of a :class:`SQLiteConnection`
+    """
+
+    def __init__(self, connection, cursor):
+        self._connection = connection
+        self._cursor = cursor
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    async def fetchall(self):
+        return await self._connection._run(self._cursor.fetchall)
+
+    async def fetchmany(self, size):
+        return await self._connection._run(self._cursor.fetchmany, size)
+
+
+class AsyncSQLite(AsyncDatabase):
+    """A sqlite database accessed with :class:`SQLiteConnection`
+
+    Every connection to `:memory:` opens a different database so use a
+    pool of size one with it.
+
+    :param filename: the database file
+    :param pool_size: maximum number of connections
+    :param kwargs: extra arguments for `sqlite3.connect`
+    """
+
+    def __init__(self, filename, pool_size=1, **kwargs):
+        super(AsyncSQLite, self).__init__(pool_size)
+        self.filename = filename
+        self.kwargs = kwargs
+
+    async def raw_connect(self):
+        return await SQLiteConnection.connect(self.filename, **self.kwargs)
+
+
+def create_from_uri(uri):
+    """Create an :class:`AsyncSQLite` from an `aiosqlite:` URI
+
+    The `pool_size` and `timeout` options are supported, when there is no
+    filename an in memory database is used
+    """
+
+    return AsyncSQLite(
+        uri.database or ':memory:', int(uri.options.get('pool_size', 1)),
+        timeout=float(uri.options.get('timeout', 5))
+    )
+
+
+__all__ = ['AsyncConnection', 'AsyncDatabase', 'AsyncPool', 'AsyncSQLite']
@@ -0,0 +1,157 @@
+# -*- test-case-name: txorm.test.test_database -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Pipelining of independent statements
+
+Every :meth:`Connection.execute` call waits for a free pool thread and
+makes its own round trip to the database. A :class:`Batch` collects many
+statements and executes all of them in a single interaction, so fan-out
+code that fires many small queries pays for just one thread handoff.
+"""
+
+from __future__ import unicode_literals
+
+from twisted.internet import defer
+
+
+class Batch(object):
+    """A group of statements executed together in one interaction
+
+    Example of usage:
+
+    .. sourcecode:: python
+
+        with connection.batch() as batch:
+            users = batch.execute(Select(User.name))
+            groups = batch.execute(Select(Group.name))
+
+        users = yield users
+        groups = yield groups
+
+    Statements are executed in order when the `with` block ends (or when
+    :meth:`run` is called) in a single transaction. If one of them fails
+    the transaction is rolled back and all the Deferreds fail with the
+    same error, the Deferred returned by :meth:`run` too when it is
+    called directly.
+
+    :param connection: the :class:`Connection` to execute the batch in
+    :param multi_statement: send all the statements in a single round trip
+        joined with semicolons, the driver must support it and have
+        `nextset` in its cursors (False by default)
+    """
+
+    def __init__(self, connection, multi_statement=False):
+        self.connection = connection
+        self.multi_statement = multi_statement
+        self._statements = []
+        self._deferreds = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            # failures are delivered to the Deferred of every statement
+            self.run().addErrback(lambda _: None)
+        else:
+            self.cancel()
+
+    def __len__(self):
+        return len(self._statements)
+
+    def execute(self, statement, params=None):
+        """Add a statement to the batch
+
+        :param statement: the statement, expression or template to execute
+        :param params: the params to fill the statement query with, for
+            templates a dictionary with the values to bind
+        :return: a Deferred that fires with the :class:`Result` of the
+            statement when the batch is executed
+        """
+
+        statement, params, fields = self.connection.prepare(statement, params)
+        self._statements.append((statement, params, fields))
+        d = defer.Deferred()
+        self._deferreds.append(d)
+        return d
+
+    def run(self):
+        """Execute all the statements added to the batch
+
+        :return: a Deferred that fires with the list of results
+        """
+
+        statements, self._statements = self._statements, []
+        deferreds, self._deferreds = self._deferreds, []
+        if not statements:
+            return defer.succeed([])
+
+        d = self.connection.execute_transact(
+            _run_batch, [statement[:2] for statement in statements],
+            self.multi_statement
+        )
+
+        def deliver(rows):
+            factory = self.connection.result_factory
+            results = [
+                factory(result, statement[2])
+                for result, statement in zip(rows, statements)
+            ]
+            for d, result in zip(deferreds, results):
+                d.callback(result)
+            return results
+
+        def fail(failure):
+            for d in deferreds:
+                d.errback(failure)
+            return failure
+
+        return d.addCallbacks(deliver, fail)
+
+    def cancel(self):
+        """Discard the statements of the batch cancelling their Deferreds
+        """
+
+        self._statements = []
+        deferreds, self._deferreds = self._deferreds, []
+        for d in deferreds:
+            d.cancel()
+
+
+def _run_batch(transaction, statements, multi_statement):
+    """Execute the statements returning a list with the rows of each one
+    """
+
+    if multi_statement and len(statements) > 1:
+        params = []
+        for _, statement_params in statements:
+            params.extend(statement_params)
+        transaction.execute(
+            '; '.join(statement for statement, _ in statements),
+            tuple(params)
+        )
+
+        results = [_fetch(transaction)]
+        while len(results) < len(statements):
+            transaction.nextset()
+            results.append(_fetch(transaction))
+
+        return results
+
+    results = []
+    for statement, params in statements:
+        if params:
+            transaction.execute(statement, params)
+        else:
+            transaction.execute(statement)
+        results.append(_fetch(transaction))
+
+    return results
+
+
+def _fetch(cursor):
+    if cursor.description is None:
+        return []
+
+    return cursor.fetchall()
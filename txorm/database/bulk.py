@@ -0,0 +1,300 @@
+# -*- test-case-name: txorm.test.test_database -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Bulk multi-row INSERT statements
+
+Loading a lot of rows one INSERT at a time is slow, while putting all of
+them in a single statement hits the server packet and parameters limits.
+:class:`BulkInsert` splits any iterable of rows into multi-row INSERT
+statements that honor those limits, the column list is compiled just once
+and the cells are converted to their database values a column at a time
+using one prototype variable per column, no expression nor variable is
+created per cell.
+"""
+
+from __future__ import unicode_literals
+
+from itertools import islice
+
+from twisted.internet import defer, task
+
+from txorm.variable import Variable
+from txorm.variable.base import raise_none_error
+from txorm.compiler.state import State
+from txorm.object_data import get_obj_data
+from txorm.compiler.plain_sql import SQL
+from txorm.compiler.expressions import Insert
+from txorm.compat import binary_type, text_type
+
+# estimated size of non string values in the wire
+_VALUE_SIZE = 8
+# rows converted at once when there is no `max_rows` limit
+_BATCH_ROWS = 1000
+
+
+class BulkInsert(object):
+    """Split rows into multi-row INSERT statements
+
+    :param compile: the compiler to compile the column list with
+    :param fields: the fields (columns) to insert
+    :param max_rows: maximum number of rows per statement
+    :param max_params: maximum number of parameters per statement or None
+    :param max_bytes: maximum estimated size of every statement and its
+        parameters in bytes or None
+    """
+
+    def __init__(self, compile, fields, max_rows=1000,
+                 max_params=None, max_bytes=None):
+        self.fields = tuple(fields)
+        if not self.fields:
+            raise ValueError('At least one field is required')
+
+        width = len(self.fields)
+        if max_params is not None and max_params < width:
+            raise ValueError(
+                'max_params ({}) is lower than the number of fields '
+                '({})'.format(max_params, width)
+            )
+
+        self.max_rows = max_rows
+        self.max_params = max_params
+        self.max_bytes = max_bytes
+        state = State()
+        self.header = compile(Insert(self.fields, values=SQL('VALUES')), state)
+        self.row_sql = '({})'.format(', '.join(['?'] * width))
+        self._prototypes = tuple(
+            field.variable_factory(field=field) for field in self.fields)
+        self._statements = {}
+
+    def statement(self, rows):
+        """Return the statement to insert the given number of rows
+
+        :param rows: number of rows in the statement
+        """
+
+        statement = self._statements.get(rows)
+        if statement is None:
+            statement = self._statements[rows] = '{} {}'.format(
+                self.header, ', '.join([self.row_sql] * rows))
+
+        return statement
+
+    def convert(self, row):
+        """Convert a row into the list of its database values
+
+        :param row: a tuple with a value or variable for every field or an
+            instance of a TxORM class with those fields
+        """
+
+        if not isinstance(row, (tuple, list)):
+            obj_data = get_obj_data(row)
+            return [
+                obj_data.get_value(field, to_db=True) for field in self.fields]
+
+        if len(row) != len(self.fields):
+            raise ValueError('Expected {} values per row, got {!r}'.format(
+                len(self.fields), row
+            ))
+
+        return [
+            _convert_value(prototype, value)
+            for prototype, value in zip(self._prototypes, row)
+        ]
+
+    def convert_many(self, rows):
+        """Convert many rows into lists of their database values
+
+        Rows of values are converted a column at a time using the
+        `parse_set_many` and `parse_get_many` methods of the prototype
+        variables, see :meth:`convert`
+
+        :param rows: a sequence of rows as accepted by :meth:`convert`
+        """
+
+        width = len(self.fields)
+        converted = [None] * len(rows)
+        positions = []
+        for position, row in enumerate(rows):
+            if not isinstance(row, (tuple, list)):
+                converted[position] = self.convert(row)
+            elif len(row) != width:
+                raise ValueError('Expected {} values per row, got {!r}'.format(
+                    width, row
+                ))
+            else:
+                positions.append(position)
+
+        if positions:
+            columns = [
+                _convert_column(prototype, [
+                    rows[position][index] for position in positions])
+                for index, prototype in enumerate(self._prototypes)
+            ]
+            for position, values in zip(positions, zip(*columns)):
+                converted[position] = list(values)
+
+        return converted
+
+    def chunks(self, rows):
+        """Generate (statement, params, rows count) tuples for the rows
+
+        Rows are consumed lazily, `max_rows` rows at a time, so any
+        iterator or generator can be used
+        """
+
+        width = len(self.fields)
+        max_rows, max_bytes = self.max_rows, self.max_bytes
+        max_params = self.max_params
+        row_size = len(self.row_sql) + 2
+        params = []
+        count = 0
+        size = len(self.header)
+        for values in self._converted(rows):
+            if max_bytes is not None:
+                values_size = row_size + sum(_size(v) for v in values)
+            else:
+                values_size = 0
+
+            if count and (
+                    count == max_rows
+                    or max_params is not None
+                    and len(params) + width > max_params
+                    or max_bytes is not None
+                    and size + values_size > max_bytes):
+                yield self.statement(count), tuple(params), count
+                params = []
+                count = 0
+                size = len(self.header)
+
+            params.extend(values)
+            count += 1
+            size += values_size
+
+        if count:
+            yield self.statement(count), tuple(params), count
+
+    def _converted(self, rows):
+        """Generate the database values of the rows converting them in
+        batches, see :meth:`convert_many`
+        """
+
+        rows = iter(rows)
+        batch_rows = self.max_rows or _BATCH_ROWS
+        while True:
+            batch = list(islice(rows, batch_rows))
+            if not batch:
+                return
+
+            for values in self.convert_many(batch):
+                yield values
+
+    def run(self, pool, rows, concurrency=2):
+        """Insert the given rows using the given adbapi connection pool
+
+        Every statement is executed in its own interaction and up to
+        `concurrency` of them run at the same time, rows are consumed from
+        the iterable only when there is room for a new statement.
+
+        :return: a Deferred that fires with the total number of inserted
+            rows or fails with the first error found, no more statements
+            are started after a failure and the Deferred doesn't fail
+            until the running ones finish, the number of rows inserted by
+            them is set as `inserted_rows` in the error
+        """
+
+        total = [0]
+        failed = []
+
+        def count(rowcount):
+            total[0] += rowcount
+
+        def fail(failure):
+            failed.append(failure)
+            return failure
+
+        def work():
+            for statement, params, rows_count in self.chunks(rows):
+                if failed:
+                    return
+
+                yield pool.runInteraction(
+                    _execute_chunk, statement, params, rows_count
+                ).addCallbacks(count, fail)
+
+        def finish(_):
+            if not failed:
+                return total[0]
+
+            failure = failed[0]
+            failure.value.inserted_rows = total[0]
+            return failure
+
+        chunks = work()
+        workers = [
+            task.coiterate(chunks).addErrback(fail)
+            for _ in range(concurrency)
+        ]
+        d = defer.DeferredList(workers, consumeErrors=True)
+        d.addCallback(finish)
+        return d
+
+
+def _convert_value(prototype, value):
+    """Convert a value or variable into its database value
+    """
+
+    if isinstance(value, Variable):
+        return value.get(to_db=True)
+    elif value is None:
+        if prototype._allow_none is False:
+            raise raise_none_error(prototype.field)
+        return None
+
+    prototype.set(value)
+    return prototype.get(to_db=True)
+
+
+def _convert_column(prototype, values):
+    """Convert a column of values or variables into their database values
+
+    Columns with variables or whose field has a validator are converted
+    value by value
+    """
+
+    if prototype._validator is not None or any(
+            isinstance(value, Variable) for value in values):
+        return [_convert_value(prototype, value) for value in values]
+
+    if prototype._allow_none is False:
+        for value in values:
+            if value is None:
+                raise raise_none_error(prototype.field)
+
+    return prototype.parse_get_many(
+        prototype.parse_set_many(values, False), True)
+
+
+def _execute_chunk(transaction, statement, params, rows_count):
+    """Execute a bulk INSERT statement returning the affected rows count
+
+    Drivers that don't know the affected rows report -1, the number of
+    rows in the statement is returned in that case
+    """
+
+    transaction.execute(statement, params)
+    rowcount = transaction.rowcount
+    if rowcount is None or rowcount < 0:
+        return rows_count
+
+    return rowcount
+
+
+def _size(value):
+    """Estimate the size of the given value in bytes
+    """
+
+    if isinstance(value, (binary_type, text_type)):
+        return len(value)
+
+    return _VALUE_SIZE
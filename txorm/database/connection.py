@@ -4,14 +4,22 @@
 
 from __future__ import unicode_literals
 
+from itertools import chain, islice
+
 from twisted.python import log
 from twisted.internet import defer, threads
 
+from txorm.variable import Variable
 from txorm.compiler.state import State
 from txorm.signal import signal, Signal
+from txorm.object_data import get_cls_data
+from txorm.database.bulk import BulkInsert
+from txorm.database.batch import Batch
+from txorm.database.stream import ResultStream, STREAM_TIMEOUT
 from txorm.database.result import Result
 from txorm.compiler import txorm_compile
-from txorm.compiler.expressions import Expression
+from txorm.compiler.template import Template
+from txorm.compiler.expressions import Expression, Select
 
 
 class Connection(object):
@@ -23,7 +31,7 @@ class Connection(object):
 
     def __init__(self, database):
         self._database = database
-        self._raw_connection = self._database._raw_connect()
+        self._raw_connection = self._database.get_pool()
         self.register_transaction = Signal(self)
 
     @defer.inlineCallbacks
@@ -38,27 +46,24 @@ class Connection(object):
             you need transactional behavior, in that case, use
             :method:`Connection.execute_transact`
 
-        :param statement: the statement or expression to execute
-        :type statement: :class:`Expression` or string
-        :param params: the params to fill the satement query with
-        :type params: list
+        :param statement: the statement, expression or template to execute
+        :type statement: :class:`Expression`, :class:`Template` or string
+        :param params: the params to fill the satement query with, for
+            templates a dictionary with the values to bind
+        :type params: list or dict
         :param noresult: if True, just for and forget
         :type noresult: boolean
         """
 
-        if isinstance(statement, Expression):
-            if params is not None:
-                raise ValueError('Can\'t pass parameters with expressions')
-            state = State()
-            statement = self.compile(statement, state)
-            if noresult is False:
-                result = yield self._execute(statement, *params, **kwargs)
-                defer.returnValue(self.result_factory(result))
-            else:
-                self._raw_connection.runOperation(
-                    *self._execution_args(params, statement), **kwargs)
+        statement, params, fields = prepare_statement(
+            self.compile, statement, params)
+        if noresult is False:
+            result = yield self._execute(statement, *(params or ()), **kwargs)
+            defer.returnValue(self.result_factory(result, fields))
+        else:
+            self._raw_connection.runOperation(
+                *self._execution_args(params, statement), **kwargs)
 
-    @defer.inlineCallbacks
     def execute_transact(self, transact_chain, *args, **kwargs):
         """
         Execute a transaction calling the transact_chain that defines
@@ -87,10 +92,153 @@ class Connection(object):
             Failure
         """
 
-        return self._raw_connection.rinInteraction(
+        return self._raw_connection.runInteraction(
             transact_chain, *args, **kwargs
         )
 
+    def batch(self, multi_statement=False):
+        """
+        Create a batch to execute many independent statements at once
+
+        Statements added to the batch are executed together in a single
+        interaction, see :class:`txorm.database.batch.Batch`
+
+        :param multi_statement: send all the statements in a single round
+            trip, only for drivers that support it
+        :return: a :class:`txorm.database.batch.Batch` that can be used as
+            a context manager
+        """
+
+        return Batch(self, multi_statement)
+
+    def stream(self, statement, params=None, batch_size=1000,
+               timeout=STREAM_TIMEOUT):
+        """
+        Execute a statement streaming its rows instead of fetching all them
+
+        The statement is executed when the returned stream is started and
+        its rows are fetched with `fetchmany` in batches of `batch_size`
+        rows, only one batch is held in memory at any time.
+
+        :param statement: the statement, expression or template to execute
+        :type statement: :class:`Expression`, :class:`Template` or string
+        :param params: the params to fill the statement query with, for
+            templates a dictionary with the values to bind
+        :param batch_size: the number of rows to fetch at once
+        :param timeout: seconds to wait for the consumer to make room for
+            the next batch before the stream is cancelled, None to wait
+            forever
+        :return: a :class:`txorm.database.stream.ResultStream`
+        """
+
+        statement, params, _ = self.prepare(statement, params)
+        return ResultStream(
+            self._raw_connection, statement, params, batch_size,
+            self._stream_cursor, timeout
+        )
+
+    def _stream_cursor(self, transaction):
+        """Return the cursor used to stream results in the transaction
+
+        Backends supporting server side cursors should override this, by
+        default the regular transaction cursor is used
+        """
+
+        return transaction
+
+    @defer.inlineCallbacks
+    def execute_many(self, statement, param_rows, chunk_size=1000):
+        """
+        Execute the same statement once for every set of parameters
+
+        All the parameter sets are converted into database values in one
+        pass and passed to DB-API `executemany` in chunks of `chunk_size`
+        rows, every chunk is executed (and committed) in its own
+        interaction so no pool thread is blocked for too long.
+
+        :param statement: the statement, expression or template to execute,
+            expressions are compiled just once as a :class:`Template`
+        :type statement: :class:`Expression`, :class:`Template` or string
+        :param param_rows: iterable of dictionaries with the values to bind
+            for expressions and templates or iterable of parameter
+            sequences for string statements
+        :param chunk_size: maximum number of parameter sets per interaction
+        :return: a Deferred which will fire a list with the rowcount of
+            every chunk
+        """
+
+        if isinstance(statement, Expression):
+            statement = Template(statement, self.compile)
+
+        if isinstance(statement, Template):
+            rows = statement.bind_many(param_rows)
+            statement = statement.statement
+        else:
+            rows = (tuple(self.to_database(row)) for row in param_rows)
+
+        rowcounts = []
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            rowcount = yield self._raw_connection.runInteraction(
+                _execute_many, statement, chunk
+            )
+            rowcounts.append(rowcount)
+
+        defer.returnValue(rowcounts)
+
+    def bulk_insert(self, rows, fields=None, max_rows=1000, max_params=None,
+                    max_bytes=None, concurrency=2):
+        """
+        Insert a lot of rows using multi-row INSERT statements
+
+        Rows are split into as many statements as needed to honor the given
+        limits and executed through the connection pool with up to
+        `concurrency` of them running at the same time. Every statement is
+        committed on its own so if one of them fails the rows inserted by
+        the previous ones are not rolled back.
+
+        :param rows: iterable or generator of row tuples (values or
+            variables in the same order than `fields`) or instances of a
+            TxORM class
+        :param fields: the fields to insert, if None all the fields of
+            the class of the first row are used
+        :param max_rows: maximum number of rows per statement
+        :param max_params: maximum number of parameters per statement
+        :param max_bytes: maximum estimated size of every statement
+        :param concurrency: maximum number of statements running at once
+        :return: a Deferred which will fire the number of inserted rows
+        """
+
+        rows = iter(rows)
+        if fields is None:
+            for first in rows:
+                break
+            else:
+                return defer.succeed(0)
+
+            fields = get_cls_data(type(first)).fields
+            rows = chain((first,), rows)
+
+        bulk = BulkInsert(
+            self.compile, fields, max_rows, max_params, max_bytes)
+        return bulk.run(self._raw_connection, rows, concurrency)
+
+    def prepare(self, statement, params=None):
+        """Compile or bind a statement converting its params to database
+        values, see :func:`prepare_statement`
+
+        :return: a tuple with the statement string, a tuple with the
+            database values of its params and the fields of the result
+            columns (None if they are unknown)
+        """
+
+        statement, params, fields = prepare_statement(
+            self.compile, statement, params)
+        return statement, tuple(self.to_database(params or ())), fields
+
     def _execute(self, statement, *params, **kwargs):
         """Execute raw statement using twisted adbapi
         """
@@ -98,6 +246,18 @@ class Connection(object):
         args = self._execution_args(params, statement)
         return self._raw_connection.runQuery(*args, **kwargs)
 
+    @staticmethod
+    def to_database(params):
+        """Convert the given parameters into values for the database
+
+        :param params: sequence of :class:`Variable` instances or raw values
+        """
+
+        for param in params:
+            if isinstance(param, Variable):
+                param = param.get(to_db=True)
+            yield param
+
     def _execution_args(self, params, statement):
         """Get the appropiate statement execution arguments
         """
@@ -108,3 +268,57 @@ class Connection(object):
             args = (statement, )
 
         return args
+
+
+def prepare_statement(compile, statement, params=None):
+    """Compile or bind the given statement when needed
+
+    :param compile: the compiler to compile expressions with
+    :param statement: the statement, expression or template to execute
+    :param params: the statement params, for templates a dictionary with
+        the values to bind, expressions can't have params
+    :return: a tuple with the statement string, its params and the fields
+        of the result columns (None if they are unknown)
+    """
+
+    fields = None
+    if isinstance(statement, Expression):
+        if params is not None:
+            raise ValueError('Can\'t pass parameters with expressions')
+        fields = _result_fields(statement)
+        state = State()
+        statement = compile(statement, state)
+        params = state.parameters
+    elif isinstance(statement, Template):
+        statement, params = statement.bind(**(params or {}))
+
+    return statement, params, fields
+
+
+def _execute_many(transaction, statement, rows):
+    """Execute the statement for every row returning the affected rows
+    """
+
+    transaction.executemany(statement, rows)
+    return transaction.rowcount
+
+
+def _result_fields(expression):
+    """Return the fields of the result columns of a SELECT expression
+
+    None is returned if they can't be known beforehand
+    """
+
+    if not isinstance(expression, Select):
+        return None
+
+    fields = expression.fields
+    if not isinstance(fields, (tuple, list)):
+        fields = (fields,)
+
+    for field in fields:
+        if isinstance(field, type):
+            # classes are expanded to all their fields when compiled
+            return None
+
+    return fields
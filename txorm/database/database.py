@@ -20,6 +20,7 @@ class Database(object):
 
     def __init__(self):
         self.connected = Signal(self)
+        self._pool = None
 
     @signal('connected')
     def connect(self):
@@ -33,21 +34,40 @@ class Database(object):
 
         This is used by :class:`txorm.database.connection.Connection`
         objects to connect to the database. It should be overriden in
-        subclasses to do any database-specific setup
+        subclasses to do any database-specific setup and return an adbapi
+        or :class:`txorm.database.pool.ConnectionPool` pool
         """
         raise NotImplementedError
 
+    def get_pool(self):
+        """Return the connection pool shared by all the connections
+
+        It is created with :meth:`raw_connect` the first time
+        """
+
+        if self._pool is None:
+            self._pool = self.raw_connect()
+
+        return self._pool
+
 
 _database_schemes = {}
 
 
-def create_database(uri):
+def create_database(uri, replicas=None, **kwargs):
     """Create a database instance.
 
     :param uri: the uri to get connection parameters from
     :type uri: string
+    :param replicas: sequence of URIs of read replicas of the database, if
+        given a :class:`txorm.database.routing.RoutingDatabase` is created
+        with them and the rest of keyword arguments
     """
 
+    if replicas is not None:
+        from txorm.database.routing import RoutingDatabase
+        return RoutingDatabase(uri, replicas, **kwargs)
+
     if is_basestring(uri):
         uri = URI(uri)
 
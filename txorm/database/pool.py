@@ -0,0 +1,544 @@
+# -*- test-case-name: txorm.test.test_pool -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Managed DB-API connection pool
+
+:class:`ConnectionPool` can be returned by :meth:`Database.raw_connect`
+instead of the Twisted adbapi pool. It has the same `runQuery`,
+`runOperation` and `runInteraction` interface but connections are checked
+out from the reactor thread so the pool can enforce its size, recycle
+stale connections, check them before use and keep metrics.
+
+Example of usage:
+
+.. sourcecode:: python
+
+    class MyDatabase(Database):
+
+        def raw_connect(self):
+            return ConnectionPool(
+                'psycopg2', database='foo', pool_min=4, pool_max=16,
+                pool_idle_timeout=300, pool_ping=True, pool_wait_timeout=5
+            )
+"""
+
+from __future__ import unicode_literals
+
+import threading
+from bisect import bisect_left
+
+from twisted.python import log, reflect
+from twisted.python.failure import Failure
+from twisted.python.threadpool import ThreadPool
+from twisted.enterprise.adbapi import Transaction
+from twisted.internet import defer, task, threads
+
+from txorm.exceptions import PoolClosedError, PoolTimeoutError
+
+# upper bounds (in milliseconds) of the checkout latency histogram buckets
+LATENCY_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics(object):
+    """Counters and checkout latency histogram of a :class:`ConnectionPool`
+
+    :param buckets: upper bounds in milliseconds of the latency buckets,
+        an extra bucket counts the checkouts slower than the last one
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.latency = [0] * (len(self.buckets) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.created = 0
+        self.destroyed = 0
+        self.in_use = 0
+        self.waiting = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """Record the latency of a checkout
+        """
+
+        self.latency[bisect_left(self.buckets, seconds * 1000)] += 1
+        self.checkouts += 1
+
+    def increment(self, name):
+        """Increment a counter, it is safe to call it from any thread
+        """
+
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        """Return a dictionary with the current metrics values
+
+        The histogram is a list of (upper bound, count) tuples where the
+        upper bound of the last bucket is None
+        """
+
+        bounds = self.buckets + (None,)
+        return {
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'created': self.created,
+            'destroyed': self.destroyed,
+            'in_use': self.in_use,
+            'waiting': self.waiting,
+            'latency': list(zip(bounds, self.latency))
+        }
+
+
+class PooledConnection(object):
+    """A DB-API connection owned by a :class:`ConnectionPool`
+    """
+
+    __slots__ = ('raw', 'created', 'last_used', 'broken')
+
+    def __init__(self, raw, created):
+        self.raw = raw
+        self.created = created
+        self.last_used = created
+        self.broken = False
+
+
+class ConnectionPool(object):
+    """A pool of DB-API connections with health checks and metrics
+
+    Any positional or keyword argument except the ones documented here is
+    passed to the DB-API `connect` function.
+
+    :param dbapi_name: import string of the DB-API module
+    :keyword pool_min: connections opened at start and kept open (1)
+    :keyword pool_max: maximum number of open connections (10)
+    :keyword pool_idle_timeout: seconds after which connections above
+        `pool_min` that have not been used are closed (None)
+    :keyword pool_max_lifetime: seconds after which connections are closed
+        and replaced no matter if they are used or not (None)
+    :keyword pool_ping: check connections running `pool_ping_sql` before
+        every use replacing them if they fail (False)
+    :keyword pool_ping_sql: the statement used to check the connections
+    :keyword pool_wait_timeout: seconds to wait for a connection when all
+        of them are in use before failing with :class:`PoolTimeoutError`,
+        None to wait forever (None)
+    :keyword pool_openfun: callable invoked with every new DB-API
+        connection to setup it (None)
+    :keyword pool_reactor: the reactor to use
+    """
+
+    POOL_ARGS = (
+        'min', 'max', 'idle_timeout', 'max_lifetime', 'ping', 'ping_sql',
+        'wait_timeout', 'openfun'
+    )
+
+    min = 1
+    max = 10
+    idle_timeout = None
+    max_lifetime = None
+    ping = False
+    ping_sql = 'SELECT 1'
+    wait_timeout = None
+    openfun = None
+
+    # used by twisted.enterprise.adbapi.Transaction
+    reconnect = False
+    noisy = False
+
+    def __init__(self, dbapi_name, *connargs, **connkw):
+        self.dbapi_name = dbapi_name
+        self.dbapi = reflect.namedModule(dbapi_name)
+
+        reactor = connkw.pop('pool_reactor', None)
+        if reactor is None:
+            from twisted.internet import reactor
+        self._reactor = reactor
+
+        for arg in self.POOL_ARGS:
+            key = 'pool_{}'.format(arg)
+            if key in connkw:
+                setattr(self, arg, connkw.pop(key))
+
+        if self.min > self.max:
+            raise ValueError(
+                'pool_min ({}) is greater than pool_max ({})'.format(
+                    self.min, self.max)
+            )
+
+        self.connargs = connargs
+        self.connkw = connkw
+        self.metrics = PoolMetrics()
+        self.threadpool = ThreadPool(self.min, self.max, 'txorm.pool')
+        self._size = 0
+        self._idle = []
+        self._waiters = []
+        self._opening = 0
+        self._warm = False
+        self._warm_waiters = []
+        self._started = False
+        self._closed = False
+        self._reaper = None
+        self._shutdown_id = None
+        self._start_id = self._reactor.callWhenRunning(self.start)
+
+    @property
+    def size(self):
+        """Number of open (or opening) connections
+        """
+
+        return self._size
+
+    def start(self):
+        """Start the pool warming up `pool_min` connections
+
+        It is called automatically when the reactor starts
+
+        :return: a Deferred that fires when the connections are open
+        """
+
+        d = defer.Deferred()
+        if self._warm:
+            d.callback(None)
+            return d
+
+        self._warm_waiters.append(d)
+        if self._started:
+            return d
+
+        self._started = True
+        self.threadpool.start()
+        self._shutdown_id = self._reactor.addSystemEventTrigger(
+            'during', 'shutdown', self._final_close)
+
+        intervals = [
+            timeout / 2.0 for timeout in (self.idle_timeout, self.max_lifetime)
+            if timeout is not None
+        ]
+        if intervals:
+            self._reaper = task.LoopingCall(self._reap)
+            self._reaper.clock = self._reactor
+            self._reaper.start(min(intervals), now=False)
+
+        warmup = [self._open_idle() for _ in range(self.min - self._size)]
+        defer.DeferredList(warmup).addCallback(self._warmed_up)
+        return d
+
+    def checkout(self):
+        """Take a connection out of the pool
+
+        Idle connections are reused, new ones are opened if there is room
+        for them and otherwise the caller waits in a FIFO queue.
+
+        :return: a Deferred that fires with a :class:`PooledConnection`
+            that must be given back with :meth:`checkin`
+        """
+
+        if self._closed:
+            return defer.fail(PoolClosedError('The pool is closed'))
+
+        if not self._started:
+            self.start()
+
+        start = self._reactor.seconds()
+        connection = self._take_idle()
+        if connection is not None:
+            return defer.succeed(self._checked_out(connection, start))
+
+        # connections being opened to be idle are handed to the waiters
+        if self._size < self.max and len(self._waiters) >= self._opening:
+            return self._open().addCallback(self._checked_out, start)
+
+        d = defer.Deferred(self._cancel_waiter)
+        timeout = None
+        if self.wait_timeout is not None:
+            timeout = self._reactor.callLater(
+                self.wait_timeout, self._timeout, d)
+        self._waiters.append((d, start, timeout))
+        self.metrics.waiting += 1
+        return d
+
+    def checkin(self, connection):
+        """Give back a connection obtained with :meth:`checkout`
+        """
+
+        self.metrics.in_use -= 1
+        self._release(connection)
+
+    def runInteraction(self, interaction, *args, **kw):
+        """Run `interaction(transaction, *args, **kw)` in a pool thread
+
+        It works exactly as the adbapi method of the same name
+        """
+
+        d = self.checkout()
+        d.addCallback(self._interact, interaction, args, kw)
+        return d
+
+    def runQuery(self, *args, **kw):
+        """Execute a statement and return the result of `fetchall`
+        """
+
+        return self.runInteraction(_run_query, *args, **kw)
+
+    def runOperation(self, *args, **kw):
+        """Execute a statement and return None
+        """
+
+        return self.runInteraction(_run_operation, *args, **kw)
+
+    def close(self):
+        """Close the pool and all its idle connections
+
+        Connections in use are closed when they are given back
+        """
+
+        if self._closed:
+            return
+
+        self._closed = True
+        if self._start_id is not None:
+            try:
+                self._reactor.removeSystemEventTrigger(self._start_id)
+            except (KeyError, ValueError):
+                pass
+            self._start_id = None
+
+        if self._shutdown_id is not None:
+            self._reactor.removeSystemEventTrigger(self._shutdown_id)
+            self._shutdown_id = None
+
+        if self._reaper is not None and self._reaper.running:
+            self._reaper.stop()
+
+        waiters, self._waiters = self._waiters, []
+        for d, _, timeout in waiters:
+            if timeout is not None and timeout.active():
+                timeout.cancel()
+            self.metrics.waiting -= 1
+            d.errback(PoolClosedError('The pool is closed'))
+
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            self._destroy(connection)
+
+        if self.threadpool.started:
+            self.threadpool.stop()
+
+    def _final_close(self):
+        self._shutdown_id = None
+        self.close()
+
+    def _warmed_up(self, _):
+        self._warm = True
+        waiters, self._warm_waiters = self._warm_waiters, []
+        for d in waiters:
+            d.callback(None)
+
+    def _open(self):
+        """Open a new connection in a pool thread
+        """
+
+        self._size += 1
+        d = threads.deferToThreadPool(
+            self._reactor, self.threadpool, self._connect)
+
+        def failed(failure):
+            self._size -= 1
+            return failure
+
+        return d.addErrback(failed)
+
+    def _open_idle(self):
+        """Open a new connection to be put in the idle list
+        """
+
+        self._opening += 1
+        return self._open().addBoth(self._opened_idle)
+
+    def _opened_idle(self, result):
+        self._opening -= 1
+        if not isinstance(result, Failure):
+            self._release(result)
+            return
+
+        log.err(result, 'Opening a pooled connection failed')
+        if self._waiters and not self._closed and self._size < self.max:
+            d, start, _ = self._pop_waiter()
+            self._open().addCallback(self._checked_out, start).chainDeferred(d)
+
+    def _connect(self):
+        raw = self.dbapi.connect(*self.connargs, **self.connkw)
+        if self.openfun is not None:
+            self.openfun(raw)
+
+        self.metrics.increment('created')
+        return PooledConnection(raw, self._reactor.seconds())
+
+    def _destroy(self, connection):
+        self._size -= 1
+        self.metrics.increment('destroyed')
+        if self.threadpool.started:
+            self.threadpool.callInThread(_close, connection.raw)
+        else:
+            _close(connection.raw)
+
+    def _expired(self, connection, now):
+        return (
+            self.max_lifetime is not None
+            and now - connection.created >= self.max_lifetime
+        )
+
+    def _take_idle(self):
+        now = self._reactor.seconds()
+        while self._idle:
+            connection = self._idle.pop()
+            if not self._expired(connection, now):
+                return connection
+
+            self._destroy(connection)
+
+        return None
+
+    def _checked_out(self, connection, start):
+        self.metrics.in_use += 1
+        self.metrics.observe(self._reactor.seconds() - start)
+        return connection
+
+    def _release(self, connection):
+        """Hand the connection to the next waiter or put it back as idle
+        """
+
+        now = self._reactor.seconds()
+        if self._closed or connection.broken or self._expired(
+                connection, now):
+            self._destroy(connection)
+            if self._waiters and not self._closed and self._size < self.max:
+                d, start, _ = self._pop_waiter()
+                self._open().addCallback(
+                    self._checked_out, start).chainDeferred(d)
+            return
+
+        connection.last_used = now
+        if self._waiters:
+            d, start, _ = self._pop_waiter()
+            d.callback(self._checked_out(connection, start))
+        else:
+            self._idle.append(connection)
+
+    def _pop_waiter(self):
+        d, start, timeout = self._waiters.pop(0)
+        if timeout is not None and timeout.active():
+            timeout.cancel()
+        self.metrics.waiting -= 1
+        return d, start, timeout
+
+    def _remove_waiter(self, d):
+        for i, (waiter, _, timeout) in enumerate(self._waiters):
+            if waiter is d:
+                del self._waiters[i]
+                if timeout is not None and timeout.active():
+                    timeout.cancel()
+                self.metrics.waiting -= 1
+                return True
+
+        return False
+
+    def _timeout(self, d):
+        if self._remove_waiter(d):
+            self.metrics.timeouts += 1
+            d.errback(PoolTimeoutError(
+                'No connection available after {} seconds'.format(
+                    self.wait_timeout)
+            ))
+
+    def _cancel_waiter(self, d):
+        self._remove_waiter(d)
+
+    def _reap(self):
+        """Close expired and idle connections and reopen up to `pool_min`
+        """
+
+        now = self._reactor.seconds()
+        idle_timeout = self.idle_timeout
+        idle = []
+        # the idle list is a stack, the least recently used come first
+        for connection in self._idle:
+            if self._expired(connection, now) or (
+                    idle_timeout is not None
+                    and self._size > self.min
+                    and now - connection.last_used >= idle_timeout):
+                self._destroy(connection)
+            else:
+                idle.append(connection)
+
+        self._idle = idle
+        while self._size < self.min and not self._closed:
+            self._open_idle()
+
+    def _interact(self, connection, interaction, args, kw):
+        d = threads.deferToThreadPool(
+            self._reactor, self.threadpool, self._run_interaction,
+            connection, interaction, args, kw
+        )
+
+        def checkin(result):
+            self.checkin(connection)
+            return result
+
+        return d.addBoth(checkin)
+
+    def _run_interaction(self, connection, interaction, args, kw):
+        """Run the interaction in a transaction, called in a pool thread
+        """
+
+        if self.ping:
+            self._ping(connection)
+
+        raw = connection.raw
+        transaction = Transaction(self, raw)
+        try:
+            result = interaction(transaction, *args, **kw)
+            transaction.close()
+            raw.commit()
+            return result
+        except BaseException:
+            try:
+                raw.rollback()
+            except BaseException:
+                connection.broken = True
+                log.err(None, 'Rollback failed')
+            raise
+
+    def _ping(self, connection):
+        """Replace the connection if it doesn't work, called in a thread
+        """
+
+        try:
+            cursor = connection.raw.cursor()
+            try:
+                cursor.execute(self.ping_sql)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception:
+            _close(connection.raw)
+            self.metrics.increment('destroyed')
+            new = self._connect()
+            connection.raw, connection.created = new.raw, new.created
+
+
+def _run_query(transaction, *args, **kw):
+    transaction.execute(*args, **kw)
+    return transaction.fetchall()
+
+
+def _run_operation(transaction, *args, **kw):
+    transaction.execute(*args, **kw)
+
+
+def _close(raw):
+    try:
+        raw.close()
+    except Exception:
+        log.err(None, 'Closing a pooled connection failed')
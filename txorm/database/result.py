@@ -0,0 +1,249 @@
+# -*- test-case-name: txorm.test.test_database -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Lazy column oriented result sets
+
+The rows are kept as the raw DB-API tuples, database values are converted
+into Python values through the fields variables only when (and only for
+the columns that) they are accessed.
+"""
+
+from __future__ import unicode_literals
+
+from array import array
+
+from txorm import Undef
+from txorm.variable import Variable
+from txorm.exceptions import NotOneError
+
+
+class Result(object):
+    """The result of the execution of a statement
+
+    :param rows: the raw rows returned by the database driver
+    :param fields: the selected fields (or expressions) in the same order
+        than the row columns, their variable factories are used to convert
+        the values and their names to access columns by name, if None
+        values are not converted at all
+    """
+
+    __slots__ = ('rows', 'fields', '_names', '_converters', '_columns')
+
+    def __init__(self, rows, fields=None):
+        self.rows = rows if rows is not None else []
+        self.fields = tuple(fields) if fields is not None else None
+        self._names = None
+        self._converters = None
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        result = self
+        for row in self.rows:
+            yield Row(result, row)
+
+    def __getitem__(self, index):
+        return Row(self, self.rows[index])
+
+    def count(self):
+        """Return the number of rows in this result
+        """
+
+        return len(self.rows)
+
+    def first(self):
+        """Return the first row or None if the result is empty
+        """
+
+        if not self.rows:
+            return None
+
+        return Row(self, self.rows[0])
+
+    def one(self):
+        """Return the only row or None if the result is empty
+
+        :raises NotOneError: if there is more than one row
+        """
+
+        if len(self.rows) > 1:
+            raise NotOneError('One row was expected but got {}'.format(
+                len(self.rows)
+            ))
+
+        return self.first()
+
+    def column(self, key, typecode=None):
+        """Return all the values of a column converted at once
+
+        Converted columns are cached so asking for them again is free.
+
+        :param key: the column index, name or field
+        :param typecode: if given an :class:`array.array` of this type code
+            is returned instead of a list
+        """
+
+        index = self.index(key)
+        values = self._columns.get(index)
+        if values is None:
+            convert = self.converter(index)
+            if convert is None:
+                values = [row[index] for row in self.rows]
+            else:
+                values = convert.many([row[index] for row in self.rows])
+            self._columns[index] = values
+
+        if typecode is not None:
+            return array(typecode, values)
+
+        return list(values)
+
+    def index(self, key):
+        """Return the index of the given column index, name or field
+        """
+
+        if type(key) is int:
+            return key
+
+        names = self._names
+        if names is None:
+            names = self._names = {}
+            for i, field in enumerate(self.fields or ()):
+                names[id(field)] = i
+                name = getattr(field, 'name', Undef)
+                if name is not Undef:
+                    names.setdefault(name, i)
+
+        index = names.get(key)
+        if index is None:
+            index = names.get(id(key))
+            if index is None:
+                raise KeyError(key)
+
+        return index
+
+    def converter(self, index):
+        """Return the callable that converts the values of a column
+
+        None is returned if the values don't need any conversion
+        """
+
+        converters = self._converters
+        if converters is None:
+            converters = self._converters = [Undef] * len(self.fields or ())
+
+        if index >= len(converters):
+            return None
+
+        convert = converters[index]
+        if convert is Undef:
+            convert = converters[index] = _make_converter(self.fields[index])
+
+        return convert
+
+
+class Row(object):
+    """Read only view of a row of a :class:`Result`
+
+    Values can be accessed by index, column name or field and as attributes
+    by column name, they are converted every time they are accessed.
+    """
+
+    __slots__ = ('_result', 'raw')
+
+    def __init__(self, result, raw):
+        self._result = result
+        self.raw = raw
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __iter__(self):
+        for index in range(len(self.raw)):
+            yield self[index]
+
+    def __getitem__(self, key):
+        result = self._result
+        index = result.index(key)
+        convert = result.converter(index)
+        if convert is None:
+            return self.raw[index]
+
+        return convert(self.raw[index])
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return tuple(self) == tuple(other)
+
+        return tuple(self) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<Row {!r}>'.format(tuple(self))
+
+
+def _make_converter(field):
+    """Create the database to Python conversion function of the given field
+    """
+
+    factory = getattr(field, 'variable_factory', None)
+    if factory is None or factory is Variable:
+        return None
+
+    prototype = factory()
+    if type(prototype) is Variable:
+        return None
+
+    return _Converter(prototype)
+
+
+class _Converter(object):
+    """Convert database values into Python values through a prototype
+    variable, one at a time or a whole column at once
+    """
+
+    __slots__ = ('prototype',)
+
+    def __init__(self, prototype):
+        self.prototype = prototype
+
+    def __call__(self, value):
+        if value is None:
+            return None
+
+        prototype = self.prototype
+        prototype.set(value, from_db=True)
+        return prototype.get()
+
+    def many(self, values):
+        """Convert a column of database values
+
+        :param values: a list with the database values of many rows
+        :return: a list with the Python values
+        """
+
+        prototype = self.prototype
+        if prototype._cache is not None:
+            lookup = prototype._cache.lookup
+            parse = prototype._parse_from_db
+            values = [
+                None if value is None else lookup(value, parse)
+                for value in values
+            ]
+        else:
+            values = prototype.parse_set_many(values, True)
+
+        return prototype.parse_get_many(values, False)
@@ -0,0 +1,299 @@
+# -*- test-case-name: txorm.test.test_routing -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Read/write splitting between a primary database and its replicas
+
+:class:`RoutingDatabase` connects to a primary database and any number of
+replicas. Its connections send `Select` (and `Union`, `Except` and
+`Intersect`) expressions and templates to the replicas and everything else
+to the primary, the decision is taken from the expression type so plain
+SQL strings always go to the primary.
+
+Example of usage:
+
+.. sourcecode:: python
+
+    database = create_database(
+        'postgres://primary/foo',
+        replicas=['postgres://replica1/foo', 'postgres://replica2/foo'],
+        balancer=LeastOutstandingBalancer(), sticky_for=5
+    )
+    connection = database.connect()
+    yield connection.execute(Update({Foo.name: 'bar'}), session=user_id)
+    # the primary is read for 5 seconds after a write in the same session
+    yield connection.execute(Select(Foo.name), session=user_id)
+"""
+
+from __future__ import unicode_literals
+
+import random
+from itertools import count
+
+from txorm.compat import is_basestring
+from txorm.compiler.template import Template
+from txorm.compiler.expressions import Select, SetExpression
+from txorm.database.stream import STREAM_TIMEOUT
+from txorm.database.database import Database, create_database
+
+# read only expressions that can be sent to the replicas
+READ_EXPRESSIONS = (Select, SetExpression)
+
+
+class Replica(object):
+    """A replica connection with its load and latency statistics
+
+    :param connection: the replica connection
+    :param smoothing: weight of every new latency sample in the moving
+        average of the latency
+    """
+
+    def __init__(self, connection, smoothing=0.2):
+        self.connection = connection
+        self.smoothing = smoothing
+        self.outstanding = 0
+        self.latency = None
+
+    def track(self, d, clock):
+        """Track the outstanding statement in the Deferred `d`
+        """
+
+        self.outstanding += 1
+        start = clock.seconds()
+
+        def done(result):
+            self.outstanding -= 1
+            elapsed = clock.seconds() - start
+            if self.latency is None:
+                self.latency = elapsed
+            else:
+                self.latency += self.smoothing * (elapsed - self.latency)
+            return result
+
+        return d.addBoth(done)
+
+    def track_stream(self, stream, clock):
+        """Track a started stream until it is over, closed or fails
+        """
+
+        # errors are reported by the stream itself
+        self.track(stream.when_done(), clock).addErrback(lambda _: None)
+
+
+class RoundRobinBalancer(object):
+    """Use every replica in turn
+    """
+
+    def __init__(self):
+        self._counter = count()
+
+    def choose(self, replicas):
+        return replicas[next(self._counter) % len(replicas)]
+
+
+class LeastOutstandingBalancer(RoundRobinBalancer):
+    """Use the replica with less statements running, in turn if many
+    """
+
+    def choose(self, replicas):
+        offset = next(self._counter) % len(replicas)
+        rotated = replicas[offset:] + replicas[:offset]
+        return min(rotated, key=lambda replica: replica.outstanding)
+
+
+class LatencyWeightedBalancer(object):
+    """Choose replicas randomly weighted by the inverse of their latency
+
+    Replicas without latency samples yet are always used first
+
+    :param random: the random number generator to use
+    """
+
+    def __init__(self, random=random):
+        self.random = random
+
+    def choose(self, replicas):
+        weights = []
+        for replica in replicas:
+            if replica.latency is None:
+                return replica
+            weights.append(1.0 / max(replica.latency, 1e-6))
+
+        point = self.random.random() * sum(weights)
+        for replica, weight in zip(replicas, weights):
+            point -= weight
+            if point < 0:
+                return replica
+
+        return replicas[-1]
+
+
+class RoutingConnection(object):
+    """Send reads to the replicas and writes to the primary
+
+    It has the interface of :class:`Connection`, every statement execution
+    method accepts an extra `session` keyword argument identifying the
+    logical session (user, request...) for read-your-writes stickiness.
+    The sessions writes are tracked by the database so they are honored by
+    all of its connections.
+    """
+
+    def __init__(self, database):
+        self._database = database
+        self.balancer = database.balancer
+        self.sticky_for = database.sticky_for
+        self.primary = database.primary.connect()
+        self.replicas = [
+            Replica(replica.connect()) for replica in database.replicas]
+        self._writes = database._writes
+        self._clock = database.clock
+
+    def route(self, statement, session=None):
+        """Return the connection the given statement should be executed in
+        """
+
+        if not _is_read(statement):
+            self._record_write(session)
+            return self.primary
+
+        if not self.replicas:
+            return self.primary
+
+        if session is not None and session in self._writes:
+            if self._clock.seconds() < self._writes[session]:
+                return self.primary
+            del self._writes[session]
+
+        return self.balancer.choose(self.replicas)
+
+    def execute(self, statement, params=None, noresult=False,
+                session=None, **kwargs):
+        """Execute a statement in the primary or in a replica
+
+        See :meth:`Connection.execute`
+        """
+
+        target = self.route(statement, session)
+        if target is self.primary:
+            return target.execute(statement, params, noresult, **kwargs)
+
+        d = target.connection.execute(statement, params, noresult, **kwargs)
+        return target.track(d, self._clock)
+
+    def batch(self, multi_statement=False, session=None):
+        """Create a batch of statements executed in the primary
+
+        See :meth:`Connection.batch`
+        """
+
+        self._record_write(session)
+        return self.primary.batch(multi_statement)
+
+    def stream(self, statement, params=None, batch_size=1000, session=None,
+               timeout=STREAM_TIMEOUT):
+        """Stream the rows of a statement from the primary or a replica
+
+        See :meth:`Connection.stream`
+        """
+
+        target = self.route(statement, session)
+        if target is self.primary:
+            return target.stream(statement, params, batch_size, timeout)
+
+        stream = target.connection.stream(
+            statement, params, batch_size, timeout)
+        stream.when_started().addCallback(target.track_stream, self._clock)
+        return stream
+
+    def execute_transact(self, transact_chain, *args, **kwargs):
+        """Execute a transaction in the primary
+
+        See :meth:`Connection.execute_transact`
+        """
+
+        self._record_write(kwargs.pop('session', None))
+        return self.primary.execute_transact(transact_chain, *args, **kwargs)
+
+    def execute_many(self, statement, param_rows, chunk_size=1000,
+                     session=None):
+        """Execute a statement many times in the primary
+
+        See :meth:`Connection.execute_many`
+        """
+
+        self._record_write(session)
+        return self.primary.execute_many(statement, param_rows, chunk_size)
+
+    def bulk_insert(self, rows, fields=None, session=None, **kwargs):
+        """Insert a lot of rows in the primary
+
+        See :meth:`Connection.bulk_insert`
+        """
+
+        self._record_write(session)
+        return self.primary.bulk_insert(rows, fields, **kwargs)
+
+    def _record_write(self, session):
+        if session is None or not self.sticky_for:
+            return
+
+        now = self._clock.seconds()
+        writes = self._writes
+        if len(writes) >= 1024 and session not in writes:
+            for key, until in list(writes.items()):
+                if until <= now:
+                    del writes[key]
+
+        writes[session] = now + self.sticky_for
+
+
+class RoutingDatabase(Database):
+    """A primary database and its read replicas
+
+    :param primary: the primary :class:`Database` or its URI
+    :param replicas: sequence of replica databases or URIs
+    :param balancer: the replica balancer, round robin by default
+    :param sticky_for: seconds that reads of a session go to the primary
+        after it writes, 0 or None to disable stickiness
+    :param clock: the clock used to measure time, the reactor by default
+    """
+
+    connection_factory = RoutingConnection
+
+    def __init__(self, primary, replicas=(), balancer=None, sticky_for=None,
+                 clock=None):
+        super(RoutingDatabase, self).__init__()
+
+        def database(value):
+            if isinstance(value, Database):
+                return value
+            return create_database(value)
+
+        self.primary = database(primary)
+        self.replicas = [database(replica) for replica in replicas]
+        self.balancer = balancer or RoundRobinBalancer()
+        self.sticky_for = sticky_for
+        if clock is None:
+            from twisted.internet import reactor as clock
+        self.clock = clock
+        # the time until every session reads from the primary
+        self._writes = {}
+
+
+def _is_read(statement):
+    """Return True if the statement is known to be read only
+    """
+
+    if is_basestring(statement):
+        return False
+
+    if isinstance(statement, Template):
+        statement = statement.expression
+
+    return isinstance(statement, READ_EXPRESSIONS)
+
+
+__all__ = [
+    'RoutingDatabase', 'RoutingConnection', 'RoundRobinBalancer',
+    'LeastOutstandingBalancer', 'LatencyWeightedBalancer'
+]
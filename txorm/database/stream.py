@@ -0,0 +1,333 @@
+# -*- test-case-name: txorm.test.test_database -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Streaming of big result sets
+
+:class:`ResultStream` fetches the rows of a query with `fetchmany` inside a
+dedicated interaction of the connection pool and hands them to the reactor
+thread one batch at a time. The pool thread waits until the consumer has
+room for the next batch so no more than one batch is held in memory, the
+stream is cancelled if the consumer does not make room in `timeout`
+seconds so an abandoned stream doesn't keep its connection forever.
+"""
+
+from __future__ import unicode_literals
+
+from zope.interface import implementer
+from twisted.python.failure import Failure
+from twisted.internet import defer, threads
+from twisted.internet.interfaces import IPushProducer
+
+# seconds the pool thread waits for room for the next batch by default
+STREAM_TIMEOUT = 60
+
+try:
+    StopAsyncIteration = StopAsyncIteration
+except NameError:  # Python 2 has no asynchronous iteration
+    StopAsyncIteration = StopIteration
+
+
+@implementer(IPushProducer)
+class ResultStream(object):
+    """A stream of the rows of a statement
+
+    Rows can be consumed in three different ways:
+
+    * pushed to a consumer with :meth:`start`, the consumer can apply
+      backpressure calling :meth:`pauseProducing` and
+      :meth:`resumeProducing` (this is a Twisted `IPushProducer`)
+    * pulled one batch at a time with :meth:`fetch`
+    * with `async for batch in stream` in Python 3, use `async with
+      stream` (or await :meth:`aclose`) to release the connection when
+      the loop is left before the end
+
+    :meth:`stopProducing` cancels the stream, the connection is released
+    as soon as the pool thread sees it, as when all the rows are consumed.
+
+    :param pool: the adbapi connection pool
+    :param statement: the statement to execute
+    :param params: the database values of the statement parameters
+    :param batch_size: the number of rows to fetch at once
+    :param cursor: callable that returns the cursor to use for the given
+        transaction, backends that support server side cursors should
+        return one of them
+    :param timeout: seconds to wait for the consumer to make room for the
+        next batch before the stream is cancelled failing with
+        :class:`twisted.internet.defer.TimeoutError`, None to wait forever
+    :param clock: the `IReactorTime` used for the timeout
+    """
+
+    def __init__(self, pool, statement, params=(), batch_size=1000,
+                 cursor=None, timeout=STREAM_TIMEOUT, clock=None):
+        if clock is None:
+            from twisted.internet import reactor as clock
+
+        self.pool = pool
+        self.statement = statement
+        self.params = params
+        self.batch_size = batch_size
+        self.cursor = cursor
+        self.timeout = timeout
+        self.clock = clock
+        self.count = 0
+        self._waiters = []
+        self._starters = []
+        self._result = None
+        self._consumer = None
+        self._fetches = []
+        self._pending = None
+        self._paused = False
+        self._room = None
+        self._room_timeout = None
+        self._timed_out = False
+        self._started = False
+        self._running = False
+        self._stopped = False
+        self._finished = False
+
+    def start(self, consumer):
+        """Push the batches of rows to the consumer `write` method
+
+        :param consumer: an object with a `write(rows)` method, if it has
+            got a `registerProducer` method this stream is registered as
+            its streaming producer
+        :return: a Deferred as in :meth:`when_done`
+        """
+
+        self._consumer = consumer
+        if hasattr(consumer, 'registerProducer'):
+            consumer.registerProducer(self, True)
+        if not self._started:
+            self._start()
+        return self.when_done()
+
+    def when_done(self):
+        """Return a Deferred that fires when the stream is over
+
+        It fires with the number of rows produced when the stream is
+        exhausted or stopped or fails with the error found executing the
+        statement
+        """
+
+        d = defer.Deferred()
+        if self._result is None:
+            self._waiters.append(d)
+        elif self._finished and not isinstance(self._result, Failure):
+            d.callback(self._result)
+        else:
+            d.errback(self._result)
+
+        return d
+
+    def when_started(self):
+        """Return a Deferred that fires with this stream when its statement
+        starts running
+
+        It never fires for streams stopped before they start
+        """
+
+        d = defer.Deferred()
+        if self._running:
+            d.callback(self)
+        else:
+            self._starters.append(d)
+
+        return d
+
+    def fetch(self):
+        """Fetch the next batch of rows
+
+        :return: a Deferred that fires with a list of rows or with None
+            when there is no more rows
+        """
+
+        d = defer.Deferred()
+        if self._pending is not None:
+            rows, self._pending = self._pending, None
+            d.callback(rows)
+            return d
+
+        if self._finished:
+            if isinstance(self._result, Failure):
+                d.errback(self._result)
+            else:
+                d.callback(None)
+            return d
+
+        self._fetches.append(d)
+        if not self._started:
+            self._start()
+        else:
+            self.resumeProducing()
+
+        return d
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return self.fetch().addCallback(_stop_at_end)
+
+    def __aenter__(self):
+        return defer.succeed(self)
+
+    def __aexit__(self, exc_type, exc_value, traceback):
+        return self.aclose()
+
+    def aclose(self):
+        """Cancel the stream if it is not over yet
+
+        :return: a Deferred that fires with None once the connection is
+            released, errors are reported by :meth:`fetch` and
+            :meth:`when_done`
+        """
+
+        self.stopProducing()
+        return self.when_done().addBoth(lambda _: None)
+
+    def pauseProducing(self):
+        """Stop fetching rows until :meth:`resumeProducing` is called
+        """
+
+        self._paused = True
+
+    def resumeProducing(self):
+        """Fetch rows again
+        """
+
+        self._paused = False
+        self._make_room(True)
+
+    def stopProducing(self):
+        """Cancel the stream releasing its connection
+        """
+
+        self._stopped = True
+        if not self._started:
+            # there is no interaction to tell, the stream is over now
+            self._started = True
+            self._starters = []
+            self._finish(None)
+        else:
+            self._make_room(False)
+
+    def _start(self):
+        self._started = self._running = True
+        d = self.pool.runInteraction(_stream, self)
+        starters, self._starters = self._starters, []
+        for starter in starters:
+            starter.callback(self)
+        d.addCallbacks(self._finish, self._fail)
+
+    def _deliver(self, rows):
+        """Deliver a batch of rows to the consumer, called by the pool thread
+
+        :return: True if the pool thread should fetch more rows, False if
+            it should stop or a Deferred firing one of them when there is
+            room for a new batch
+        """
+
+        if self._stopped:
+            return False
+
+        self.count += len(rows)
+        if self._consumer is not None:
+            self._consumer.write(rows)
+        elif self._fetches:
+            self._fetches.pop(0).callback(rows)
+            if not self._fetches:
+                self._paused = True
+        else:
+            self._pending = rows
+            self._paused = True
+
+        if self._stopped:
+            return False
+
+        if not self._paused:
+            return True
+
+        self._room = defer.Deferred()
+        if self.timeout is not None:
+            self._room_timeout = self.clock.callLater(
+                self.timeout, self._expire)
+        return self._room
+
+    def _make_room(self, more):
+        room, self._room = self._room, None
+        if room is not None:
+            timeout, self._room_timeout = self._room_timeout, None
+            if timeout is not None and timeout.active():
+                timeout.cancel()
+            room.callback(more)
+
+    def _expire(self):
+        """Cancel the stream, the consumer did not make room in time
+        """
+
+        self._room_timeout = None
+        self._timed_out = True
+        self.stopProducing()
+
+    def _finish(self, _):
+        if self._timed_out:
+            return self._fail(Failure(defer.TimeoutError(
+                'The stream consumer made no room for {} seconds'.format(
+                    self.timeout))))
+
+        self._finished = True
+        self._result = self.count
+        self._unregister()
+        fetches, self._fetches = self._fetches, []
+        for d in fetches:
+            d.callback(None)
+        waiters, self._waiters = self._waiters, []
+        for d in waiters:
+            d.callback(self.count)
+
+    def _fail(self, failure):
+        self._finished = True
+        self._result = failure
+        self._unregister()
+        fetches, self._fetches = self._fetches, []
+        for d in fetches + self._waiters:
+            d.errback(failure)
+        self._waiters = []
+
+    def _unregister(self):
+        if self._consumer is not None and hasattr(
+                self._consumer, 'unregisterProducer'):
+            self._consumer.unregisterProducer()
+
+
+def _stream(transaction, stream):
+    """Execute the stream statement and deliver its rows, in a pool thread
+    """
+
+    from twisted.internet import reactor
+
+    cursor = transaction
+    if stream.cursor is not None:
+        cursor = stream.cursor(transaction)
+
+    if stream.params:
+        cursor.execute(stream.statement, stream.params)
+    else:
+        cursor.execute(stream.statement)
+
+    while True:
+        rows = cursor.fetchmany(stream.batch_size)
+        if not rows:
+            break
+
+        more = threads.blockingCallFromThread(reactor, stream._deliver, rows)
+        if not more:
+            break
+
+
+def _stop_at_end(rows):
+    if rows is None:
+        raise StopAsyncIteration()
+
+    return rows
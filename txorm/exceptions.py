@@ -43,3 +43,18 @@ class PropertyPathError(TxormError):
 class URIError(TxormError):
     """Raised when errors on URI parsing are found
     """
+
+
+class NotOneError(TxormError):
+    """Raised when a result expected to have at most one row has more
+    """
+
+
+class PoolTimeoutError(TxormError):
+    """Raised when no pooled connection becomes available in time
+    """
+
+
+class PoolClosedError(TxormError):
+    """Raised when a connection is requested from a closed pool
+    """
@@ -0,0 +1,266 @@
+# -*- test-case-name: txorm.test.test_identity_map -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Identity map of loaded TxORM objects
+
+An :class:`IdentityMap` makes sure that a row is represented by a single
+object, loading the same row again returns the object already in memory
+without converting its columns again.
+"""
+
+from __future__ import unicode_literals
+
+import time
+from collections import OrderedDict
+from weakref import WeakValueDictionary
+
+from txorm.object_data import get_cls_data, get_obj_data
+
+
+class IdentityMap(object):
+    """Map of (class data, primary key values) to objects
+
+    Objects are referenced weakly by default so they are forgotten as soon
+    as nobody else uses them. A strong LRU layer can keep alive the most
+    recently used ones, bounded both in size and time.
+
+    :param size: number of objects kept alive by the LRU layer, 0 disables
+        it
+    :param ttl: seconds that objects are kept alive by the LRU layer since
+        their last use, None to keep them until they are evicted
+    :param clock: callable that returns the current time in seconds
+    """
+
+    def __init__(self, size=0, ttl=None, clock=time.time):
+        self.size = size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._objects = WeakValueDictionary()
+        self._strong = OrderedDict()
+        self._primary_converters = {}
+
+    def __len__(self):
+        self.expire()
+        return len(self._objects)
+
+    def __iter__(self):
+        return iter(list(self._objects.values()))
+
+    def __contains__(self, obj):
+        return self._objects.get(self.key(obj)) is obj
+
+    @staticmethod
+    def key(obj):
+        """Return the identity map key of the given object
+        """
+
+        obj_data = get_obj_data(obj)
+        cls_data = obj_data.cls_data
+        return cls_data, tuple(
+            obj_data.get_value(field) for field in cls_data.primary_key)
+
+    def get(self, cls, primary_values):
+        """Return the object of the class with the given primary key
+
+        :param cls: the class (or its class data) of the object
+        :param primary_values: tuple with the primary key values
+        :return: the object or None if it isn't in the map
+        """
+
+        self.expire()
+        cls_data = _cls_data(cls)
+        key = (cls_data, tuple(primary_values))
+        obj = self._objects.get(key)
+        if obj is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._touch(key, obj)
+
+        return obj
+
+    def add(self, obj):
+        """Add an object to the map
+
+        :return: the object already in the map for the same row if any,
+            the given object otherwise
+        """
+
+        self.expire()
+        key = self.key(obj)
+        current = self._objects.get(key)
+        if current is None:
+            self._objects[key] = current = obj
+
+        self._touch(key, current)
+        return current
+
+    def remove(self, obj, primary_values=None):
+        """Remove an object from the map
+
+        :param primary_values: the primary key values the object was added
+            with, its current values are used if not given
+        """
+
+        if primary_values is None:
+            key = self.key(obj)
+        else:
+            key = (get_obj_data(obj).cls_data, tuple(primary_values))
+        if self._objects.get(key) is obj:
+            del self._objects[key]
+            self._strong.pop(key, None)
+
+    def clear(self):
+        """Forget all the objects
+        """
+
+        self._objects.clear()
+        self._strong.clear()
+
+    def expire(self):
+        """Stop keeping alive the objects not used for `ttl` seconds
+
+        It is called by the methods that look objects up, so expired
+        objects are never kept alive by the LRU layer after a lookup.
+        """
+
+        if self.ttl is None or not self._strong:
+            return
+
+        now = self.clock()
+        strong = self._strong
+        # entries are sorted by last use so the expired ones come first
+        while strong:
+            _, expires = next(iter(strong.values()))
+            if expires > now:
+                break
+            strong.popitem(last=False)
+
+    def load(self, cls, row, build=None):
+        """Return the object of the given raw database row
+
+        If the row is already in the map its object is returned straight
+        away, otherwise the object is built and added to the map. Only the
+        primary key columns are converted to look the row up.
+
+        :param cls: the class (or its class data) of the object
+        :param row: the raw row, with a value for every field of the class
+            in the order of `ClassData.fields`
+        :param build: callable that builds the object from the class data
+            and the row, :func:`build_object` by default
+        """
+
+        cls_data = _cls_data(cls)
+        converters = self._primary_converters.get(cls_data)
+        if converters is None:
+            converters = self._primary_converters[cls_data] = tuple(
+                (position, cls_data.fields[position].variable_factory())
+                for position in cls_data.primary_key_pos
+            )
+
+        values = []
+        for position, variable in converters:
+            variable.set(row[position], from_db=True)
+            values.append(variable.get())
+
+        self.expire()
+        key = (cls_data, tuple(values))
+        obj = self._objects.get(key)
+        if obj is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            obj = (build or build_object)(cls_data, row)
+            self._objects[key] = obj
+
+        self._touch(key, obj)
+        return obj
+
+    def _touch(self, key, obj):
+        """Keep the object alive in the LRU layer
+        """
+
+        if not self.size:
+            return
+
+        strong = self._strong
+        strong.pop(key, None)
+        strong[key] = (
+            obj, None if self.ttl is None else self.clock() + self.ttl)
+        while len(strong) > self.size:
+            strong.popitem(last=False)
+
+
+def build_object(cls_data, row):
+    """Build an object of the class from a raw row without calling __init__
+
+    :param cls_data: the class data of the object class
+    :param row: the raw row, with a value for every field of the class in
+        the order of `ClassData.fields`
+    """
+
+    if len(row) != len(cls_data.fields):
+        raise ValueError(
+            'Expected {} values per row'.format(len(cls_data.fields)))
+
+    values = [
+        converter.parse_set(value, from_db=True)
+        for converter, value in zip(cls_data.converters, row)
+    ]
+
+    cls = cls_data.cls
+    obj = cls.__new__(cls)
+    obj.__dict__['__object_data__'] = cls_data.object_data_class(obj, values)
+    return obj
+
+
+def build_objects(cls, rows):
+    """Build the objects of many raw rows without calling __init__
+
+    Every column is converted across all the rows in a single pass with
+    the converter of its field (see :meth:`FieldConverter.parse_column`),
+    then the objects are built with their already converted values.
+
+    :param cls: the class (or its class data) of the objects
+    :param rows: a sequence of raw rows, with a value for every field of
+        the class in the order of `ClassData.fields`
+    :return: a list with the objects in the order of the rows
+    """
+
+    cls_data = _cls_data(cls)
+    if not rows:
+        return []
+
+    width = len(cls_data.fields)
+    columns = list(zip(*rows))
+    if len(columns) != width or any(len(row) != width for row in rows):
+        raise ValueError('Expected {} values per row'.format(width))
+
+    columns = [
+        converter.parse_column(column)
+        for converter, column in zip(cls_data.converters, columns)
+    ]
+
+    cls = cls_data.cls
+    new = cls.__new__
+    object_data_class = cls_data.object_data_class
+    objects = []
+    for values in zip(*columns):
+        obj = new(cls)
+        obj.__dict__['__object_data__'] = object_data_class(obj, values)
+        objects.append(obj)
+
+    return objects
+
+
+def _cls_data(cls):
+    if isinstance(cls, type):
+        return get_cls_data(cls)
+
+    return cls
+
+
+__all__ = ['IdentityMap', 'build_object', 'build_objects']
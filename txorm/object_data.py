@@ -5,11 +5,20 @@
 from __future__ import unicode_literals
 
 from weakref import ref
+from functools import partial
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
 
 from txorm import Undef
 from txorm.compat import binary_type, text_type, _PY3, b
 from txorm.exceptions import ObjectDataError, ClassDataError
 from txorm.compiler import Field, Desc, Table, TABLE, txorm_compile
+from txorm.compiler.comparable import And, Eq
+from txorm.compiler.expressions import Update
+from txorm.variable.base import raise_none_error
 
 
 def get_obj_data(obj):
@@ -21,7 +30,7 @@ def get_obj_data(obj):
 
     # instantiate ObjectData first so that it breaks gracefully in case
     # that the object is not a TxORM object
-    obj_data = ObjectData(obj)
+    obj_data = get_cls_data(type(obj)).object_data_class(obj)
     return obj.__dict__.setdefault('__object_data__', obj_data)
 
 
@@ -50,11 +59,19 @@ class ClassData(dict):
     :param cls: class which should be used to build objects
     :param fields: tuple of field properties found in the class
     :param primary_key_pos: position of `primary_key` items in the fileds tuple
+    :param object_data_class: :class:`ColumnarObjectData` if the class sets
+        `__txorm_columnar__` to True, :class:`ObjectData` otherwise
+    :param lazy_variables: True if the class sets `__txorm_lazy_variables__`
+        to True, the variables of its objects are created on first access
+    :param fast_properties: True if the class sets
+        `__txorm_fast_properties__` to True, see :class:`FastProperty`
     """
 
     def __init__(self, cls):
         self.__pairs = None
         self.__primary_key = None
+        self.__converters = None
+        self.__constructors = None
 
         # look for __database_table__, fi not found check storm compatibility
         self.table = getattr(
@@ -78,6 +95,16 @@ class ClassData(dict):
             (id(f), i) for i, f in enumerate(self.fields))
         self.primary_key_pos = tuple(
             id_positions[id(f)] for f in self.primary_key)
+        self.field_positions = id_positions
+
+        if getattr(cls, '__txorm_columnar__', False) is True:
+            self.object_data_class = ColumnarObjectData
+        else:
+            self.object_data_class = ObjectData
+        self.lazy_variables = getattr(
+            cls, '__txorm_lazy_variables__', False) is True
+        self.fast_properties = getattr(
+            cls, '__txorm_fast_properties__', False) is True
 
         __order__ = getattr(cls, '__txorm_order__', None)
         if __order__ is None:
@@ -103,6 +130,8 @@ class ClassData(dict):
                 prop = Desc(getattr(cls, item)) if desc is True else item
                 self.default_order.append(prop)
 
+    __hash__ = object.__hash__
+
     def __eq__(self, other):
         return self is other
 
@@ -127,6 +156,40 @@ class ClassData(dict):
         self.__pairs = pairs
         return self.pairs
 
+    @property
+    def converters(self):
+        """Calculate the :class:`FieldConverter` of every field (if needed)
+        and return it back
+        """
+
+        if self.__converters is None:
+            self.__converters = tuple(
+                FieldConverter(field) for field in self.fields)
+
+        return self.__converters
+
+    @property
+    def make_variables(self):
+        """Generate the constructor of the variables of the objects of the
+        class (if needed) and return it back, see :func:`make_constructors`
+        """
+
+        if self.__constructors is None:
+            self.__constructors = make_constructors(self.fields)
+
+        return self.__constructors[0]
+
+    @property
+    def variable_constructors(self):
+        """Generate the constructors of every field variable (if needed) and
+        return them back in a dict indexed by the id of the field
+        """
+
+        if self.__constructors is None:
+            self.__constructors = make_constructors(self.fields)
+
+        return self.__constructors[1]
+
     @property
     def primary_key(self):
         """Calculate class primary key (if needed) and return it back
@@ -179,6 +242,9 @@ class ObjectData(dict):
     """Store useful information about objects that define TxORM Properties
 
     :param obj: the object to store data from
+    :param values: the internal values of all the fields, already
+        converted from the database and in the order of `ClassData.fields`,
+        see :meth:`FieldConverter.parse_column`
     """
 
     __hash__ = object.__hash__
@@ -186,22 +252,33 @@ class ObjectData(dict):
     # for get_obj_data, a FiedsData is its own obj_data
     __object_data__ = property(lambda self: self)
 
-    def __init__(self, obj):
+    def __init__(self, obj, values=None):
         # first thing, try to create a ClassInfo for the object's class.
         # this ensures that obj is the kind of object we expect.
         self.cls_data = get_cls_data(type(obj))
 
         self.set_object(obj)
-        self.variables = variables = {}
-
-        for field in self.cls_data.fields:
-            variables[field] = field.variable_factory(
-                field=field, validator_factory=self.get_object
-            )
+        if self.cls_data.lazy_variables is True:
+            # the variables are created from these on first lookup
+            self._values = values
+            self.variables = variables = LazyVariables(self)
+        else:
+            variables, positional = self.cls_data.make_variables(
+                self.get_object)
+            self.variables = variables
+            if self.cls_data.fast_properties is True:
+                # variables in the order of the fields for FastProperty
+                self.positional = positional
+
+            if values is not None:
+                # what Variable.set(value, from_db=True) does after parse_set
+                for variable, value in zip(positional, values):
+                    variable._value = variable._checkpoint_state = value
 
         self.primary_vars = tuple(
             variables[field] for field in self.cls_data.primary_key
         )
+        self.dirty = set()
 
     def __eq__(self, other):
         return self is other
@@ -212,10 +289,467 @@ class ObjectData(dict):
     def get_object(self):
         return self._ref()
 
+    def get_value(self, field, to_db=False):
+        """Return the value of the given field, see :meth:`Variable.get`
+        """
+
+        return self.variables[field].get(None, to_db)
+
+    def set_value(self, field, value, from_db=False):
+        """Set the value of the given field, see :meth:`Variable.set`
+
+        Values that don't come from the database mark the field as dirty.
+        """
+
+        self.variables[field].set(value, from_db)
+        if from_db is False:
+            self.dirty.add(field)
+
+    def delete_value(self, field):
+        """Delete the value of the given field marking it as dirty
+        """
+
+        self.variables[field].delete()
+        self.dirty.add(field)
+
+    def checkpoint(self):
+        """Checkpoint all the variables, they are not changed anymore
+        """
+
+        for variable in self.variables.values():
+            variable.checkpoint()
+
+        self.dirty.clear()
+
+    def get_changes(self):
+        """Return the fields that changed since the last checkpoint
+
+        Only the fields in the `dirty` set (set or deleted through the
+        object properties) are checked.
+
+        :return: a tuple with the changed fields in the `ClassData.fields`
+            order
+        """
+
+        dirty = self.dirty
+        if not dirty:
+            return ()
+
+        variables = self.variables
+        return tuple(
+            field for field in self.cls_data.fields
+            if field in dirty and variables[field].has_changed()
+        )
+
+    def get_update(self):
+        """Return the UPDATE expression that saves the changed fields
+
+        The row is looked up by the primary key values at the last
+        checkpoint so changes of the primary key are saved too.
+
+        :return: an :class:`Update` expression or None if nothing changed
+        """
+
+        changes = self.get_changes()
+        if not changes:
+            return None
+
+        cls_data = self.cls_data
+        variables = self.variables
+        where = [
+            Eq(field, variable) for field, variable in zip(
+                cls_data.primary_key, self.get_primary_checkpoint())
+        ]
+
+        return Update(
+            dict((field, variables[field]) for field in changes),
+            And(*where) if len(where) > 1 else where[0],
+            table=cls_data.table, primary_fields=cls_data.primary_key
+        )
+
+    def get_primary_checkpoint(self):
+        """Return the variables of the primary key at the last checkpoint
+
+        The row of the object in the database is found with them, fields
+        of the primary key changed since then get a new variable with the
+        value at the checkpoint.
+        """
+
+        result = []
+        for field, variable in zip(
+                self.cls_data.primary_key, self.primary_vars):
+            if (variable.has_changed()
+                    and variable._checkpoint_state is not Undef):
+                old = field.variable_factory()
+                old.set(variable.get_checkpoint(to_db=True), from_db=True)
+                variable = old
+            result.append(variable)
+
+        return tuple(result)
+
     def set_object(self, obj):
         self._ref = ref(obj, None)
 
 
+class LazyVariables(dict):
+    """Dict of the variables of an object that creates them on first lookup
+
+    Variables not looked up yet are not in the dict, so they are not
+    listed by iteration, `in` or `get`. When the object was loaded with
+    `values` the variables are created holding (and checkpointed at)
+    their loaded value.
+
+    :param obj_data: the :class:`ObjectData` of the object
+    """
+
+    __slots__ = ('_obj_data',)
+
+    def __init__(self, obj_data):
+        super(LazyVariables, self).__init__()
+        self._obj_data = obj_data
+
+    def __missing__(self, field):
+        obj_data = self._obj_data
+        constructor = obj_data.cls_data.variable_constructors.get(id(field))
+        if constructor is None:
+            raise KeyError(field)
+
+        variable = self[field] = constructor(obj_data.get_object)
+        if obj_data._values is not None:
+            position = obj_data.cls_data.field_positions[id(field)]
+            value = obj_data._values[position]
+            variable._value = variable._checkpoint_state = value
+
+        return variable
+
+
+class ColumnarObjectData(ObjectData):
+    """ObjectData that stores the values of all the fields in a flat list
+
+    Instead of a :class:`Variable` per field, the internal values are kept
+    in `values` in the order of `ClassData.fields` and converted by the
+    :class:`FieldConverter` objects shared by all the objects of the class.
+    Two bitmaps keep the state of every position: `checkpointed` (the
+    value was checkpointed, see :meth:`Variable.checkpoint`) and `dirty`
+    (the value was set or deleted through the object properties).
+
+    A full :class:`Variable` is only created for a field when it is looked
+    up in `variables`, from then on it holds the value of that field.
+
+    Classes use it setting `__txorm_columnar__` to True.
+
+    :param obj: the object to store data from
+    :param values: the internal values of all the fields, see
+        :class:`ObjectData`
+    """
+
+    def __init__(self, obj, values=None):
+        self.cls_data = cls_data = get_cls_data(type(obj))
+        self.set_object(obj)
+
+        self.converters = cls_data.converters
+        if values is None:
+            self.values = [c.default() for c in self.converters]
+            self.checkpointed = 0
+        else:
+            self.values = list(values)
+            self.checkpointed = (1 << len(self.values)) - 1
+        self.dirty = 0
+        # values at the last checkpoint of the positions changed since then
+        self._checkpoints = None
+        self._variables = None
+
+    @property
+    def variables(self):
+        return VariablesView(self)
+
+    @property
+    def primary_vars(self):
+        return tuple(
+            self.get_variable(field) for field in self.cls_data.primary_key)
+
+    def get_variable(self, field):
+        """Return the :class:`Variable` of the given field creating it if
+        it doesn't exist yet
+        """
+
+        position = self.cls_data.field_positions[id(field)]
+        if self._variables is None:
+            self._variables = {}
+        elif position in self._variables:
+            return self._variables[position]
+
+        variable = field.variable_factory(
+            field=field, validator_factory=self.get_object,
+            value=Undef, value_factory=Undef
+        )
+        variable._value = self.values[position]
+        variable._checkpoint_state = self._get_checkpoint(position)
+        self._variables[position] = variable
+        return variable
+
+    def get_value(self, field, to_db=False):
+        position = self.cls_data.field_positions[id(field)]
+        if self._variables is not None and position in self._variables:
+            return self._variables[position].get(None, to_db)
+
+        return self.converters[position].parse_get(
+            self.values[position], None, to_db)
+
+    def set_value(self, field, value, from_db=False):
+        position = self.cls_data.field_positions[id(field)]
+        if self._variables is not None and position in self._variables:
+            self._variables[position].set(value, from_db)
+        else:
+            value = self.converters[position].parse_set(
+                value, from_db, None if from_db else self.get_object())
+            if from_db is True:
+                self.checkpointed |= 1 << position
+                if self._checkpoints is not None:
+                    self._checkpoints.pop(position, None)
+            else:
+                self._save_checkpoint(position)
+            self.values[position] = value
+
+        if from_db is False:
+            self.dirty |= 1 << position
+
+    def delete_value(self, field):
+        position = self.cls_data.field_positions[id(field)]
+        if self._variables is not None and position in self._variables:
+            self._variables[position].delete()
+        else:
+            self._save_checkpoint(position)
+            self.values[position] = Undef
+
+        self.dirty |= 1 << position
+
+    def checkpoint(self):
+        if self._variables is not None:
+            for variable in self._variables.values():
+                variable.checkpoint()
+
+        self.checkpointed = (1 << len(self.values)) - 1
+        self._checkpoints = None
+        self.dirty = 0
+
+    def get_changes(self):
+        dirty = self.dirty
+        if not dirty:
+            return ()
+
+        return tuple(
+            field for position, field in enumerate(self.cls_data.fields)
+            if dirty >> position & 1 and self._has_changed(position)
+        )
+
+    def _has_changed(self, position):
+        if self._variables is not None and position in self._variables:
+            return self._variables[position].has_changed()
+
+        value = self.values[position]
+        state = self._get_checkpoint(position)
+        return value is not state and (
+            value is Undef or state is Undef or value != state)
+
+    def _get_checkpoint(self, position):
+        if not self.checkpointed >> position & 1:
+            return Undef
+
+        if self._checkpoints is not None and position in self._checkpoints:
+            return self._checkpoints[position]
+
+        return self.values[position]
+
+    def _save_checkpoint(self, position):
+        """Remember the checkpointed value of a position before changing it
+        """
+
+        if self.checkpointed >> position & 1:
+            if self._checkpoints is None:
+                self._checkpoints = {}
+            if position not in self._checkpoints:
+                self._checkpoints[position] = self.values[position]
+
+
+class VariablesView(Mapping):
+    """Read only mapping of fields to the variables of a
+    :class:`ColumnarObjectData`, variables are created on demand
+    """
+
+    __slots__ = ('_obj_data',)
+
+    def __init__(self, obj_data):
+        self._obj_data = obj_data
+
+    def __getitem__(self, field):
+        return self._obj_data.get_variable(field)
+
+    def __iter__(self):
+        return iter(self._obj_data.cls_data.fields)
+
+    def __len__(self):
+        return len(self._obj_data.cls_data.fields)
+
+
+def make_constructors(fields):
+    """Generate the functions that create the variables of the given fields
+
+    The arguments pre-bound in the `functools.partial` variable factories
+    of the fields are bound to names of the generated code, so the
+    variables are created with direct calls and no partial involved.
+
+    :return: a tuple with a function that creates the variables of all the
+        fields, returning them both in a dict indexed by field and in a
+        tuple in the order of the fields, and a dict of functions that
+        create the variable of a single field indexed by the id of the
+        field, all of them take the `get_object` method of the object data
+        as argument
+    """
+
+    namespace = {}
+    calls = []
+    for i, field in enumerate(fields):
+        factory = field.variable_factory
+        if isinstance(factory, partial):
+            func, args = factory.func, factory.args
+            keywords = dict(factory.keywords or {})
+        else:
+            func, args, keywords = factory, (), {}
+        keywords['field'] = field
+        keywords.pop('validator_factory', None)
+
+        namespace['field{}'.format(i)] = field
+        namespace['factory{}'.format(i)] = func
+        arguments = []
+        for j, value in enumerate(args):
+            name = 'arg{}_{}'.format(i, j)
+            namespace[name] = value
+            arguments.append(name)
+        for key, value in sorted(keywords.items()):
+            name = 'arg{}_{}'.format(i, key)
+            namespace[name] = value
+            arguments.append('{}={}'.format(key, name))
+        arguments.append('validator_factory=get_object')
+        calls.append('factory{}({})'.format(i, ', '.join(arguments)))
+
+    source = ['def make_variables(get_object):']
+    source.extend(
+        '    variable{} = {}'.format(i, call) for i, call in enumerate(calls))
+    source.append('    return {')
+    source.extend(
+        '        field{0}: variable{0},'.format(i) for i in range(len(calls)))
+    source.append('    }}, ({})'.format(''.join(
+        'variable{}, '.format(i) for i in range(len(calls)))))
+    for i, call in enumerate(calls):
+        source.append('def make_variable{}(get_object):'.format(i))
+        source.append('    return {}'.format(call))
+
+    code = compile('\n'.join(source), '<txorm variables>', 'exec')
+    exec(code, namespace)
+    return namespace['make_variables'], dict(
+        (id(field), namespace['make_variable{}'.format(i)])
+        for i, field in enumerate(fields)
+    )
+
+
+class FieldConverter(object):
+    """The :class:`Variable` semantics of a field shared by all the objects
+    of a class
+
+    The conversions are done by a prototype variable of the field, while
+    validators, `allow_none` and defaults are applied here.
+
+    :param field: the field whose values are converted
+    """
+
+    __slots__ = (
+        'field', 'prototype', 'allow_none', 'validator',
+        'validator_attribute', 'value', 'value_factory'
+    )
+
+    def __init__(self, field):
+        keywords = getattr(field.variable_factory, 'keywords', None) or {}
+        self.field = field
+        self.prototype = prototype = field.variable_factory(
+            field=field, value=Undef, value_factory=Undef)
+        self.allow_none = prototype._allow_none
+        self.validator = prototype._validator
+        self.validator_attribute = prototype._validator_attribute
+        self.value = keywords.get('value', Undef)
+        self.value_factory = keywords.get('value_factory', Undef)
+
+    def default(self):
+        """Return the internal default value of the field, Undef if none
+        """
+
+        if self.value is not Undef:
+            value = self.value
+        elif self.value_factory is not Undef:
+            value = self.value_factory()
+        else:
+            return Undef
+
+        # as in Variable, default values are not validated
+        return self.parse_set(value, False)
+
+    def parse_get(self, value, default=None, to_db=False):
+        """Convert an internal value as :meth:`Variable.get` does
+        """
+
+        if value is Undef:
+            return default
+        elif value is None:
+            return None
+
+        return self.prototype.parse_get(value, to_db)
+
+    def parse_set(self, value, from_db=False, obj=None):
+        """Convert a value into its internal value as :meth:`Variable.set`
+
+        :param obj: the object passed to the validator, the validator is
+            only called for values that don't come from the database when
+            an object is given
+        """
+
+        if obj is not None and from_db is False and self.validator:
+            value = self.validator(obj, self.validator_attribute, value)
+
+        if value is None:
+            if self.allow_none is False:
+                raise raise_none_error(self.field)
+            return None
+
+        prototype = self.prototype
+        if from_db is True and prototype._cache is not None:
+            return prototype._cache.lookup(value, prototype._parse_from_db)
+
+        return prototype.parse_set(value, from_db)
+
+    def parse_column(self, values):
+        """Convert a column of database values into internal values
+
+        :param values: a sequence with the values of the field in many rows
+        :return: a list with the internal values
+        """
+
+        if self.allow_none is False:
+            for value in values:
+                if value is None:
+                    raise raise_none_error(self.field)
+
+        prototype = self.prototype
+        if prototype._cache is not None:
+            lookup = prototype._cache.lookup
+            parse = prototype._parse_from_db
+            return [
+                None if value is None else lookup(value, parse)
+                for value in values
+            ]
+
+        return prototype.parse_set_many(values, True)
+
+
 class ClassAlias(object):
     """Create a named alias for a TxORM class to use in queries.
 
@@ -19,12 +19,12 @@ from ._fraction import Fraction
 from ._datetime import DateTime
 from .timedelta import TimeDelta
 from .mysql_enum import MysqlEnum
-from .base import Property, SimpleProperty
+from .base import Property, SimpleProperty, FastProperty
 from .registry import PropertyRegistry, PropertyRegisterMeta
 
 
 __all__ = [
-    'Property', 'SimpleProperty',
+    'Property', 'SimpleProperty', 'FastProperty',
     'Int', 'Bool', 'Float', 'Decimal', 'RawStr', 'Unicode', 'DateTime', 'Date',
     'Time', 'TimeDelta', 'Enum', 'MysqlEnum', 'UUID', 'Fraction',
     'PropertyRegistry', 'PropertyRegisterMeta'
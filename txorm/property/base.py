@@ -10,7 +10,12 @@ from txorm import Undef
 from txorm.compiler import Field
 from txorm.compat import iteritems
 from txorm.variable import Variable
-from txorm.object_data import get_obj_data
+from txorm.variable.base import ValueCache, has_identity_get
+from txorm.object_data import ColumnarObjectData, get_cls_data, get_obj_data
+
+
+# default size of the value caches of the interned properties
+CACHE_SIZE = 4096
 
 
 class Property(object):
@@ -49,7 +54,7 @@ class Property(object):
             cls = obj_fields_data.cls_data.cls
 
         field = self._get_field(cls)
-        return obj_fields_data.variables[field].get()
+        return obj_fields_data.get_value(field)
 
     def __set__(self, obj, value):
         """Set the given value right variable type for this property field data
@@ -58,7 +63,7 @@ class Property(object):
         obj_fields_data = get_obj_data(obj)
         # don't get obj.__class__ because we don't trust if
         field = self._get_field(obj_fields_data.cls_data.cls)
-        obj_fields_data.variables[field].set(value)
+        obj_fields_data.set_value(field, value)
 
     def __delete__(self, obj):
         """Delete the wrapped variable value
@@ -67,7 +72,7 @@ class Property(object):
         obj_fields_data = get_obj_data(obj)
         # don't get obj.__class__ because we don't trust if
         field = self._get_field(obj_fields_data.cls_data.cls)
-        obj_fields_data.variables[field].delete()
+        obj_fields_data.delete_value(field)
 
     def _get_field(self, cls):
         """
@@ -102,6 +107,8 @@ class Property(object):
         self_id = id(self)
         for cls in used_cls.__mro__:
             for attr, prop in iteritems(cls.__dict__):
+                if isinstance(prop, FastProperty):
+                    prop = prop.prop
                 if id(prop) == self_id:
                     return attr
 
@@ -123,6 +130,10 @@ class PropertyField(Field):
         self.auto_increment = variable_kwargs.pop('auto_increment', False)
         self.array = variable_kwargs.pop('array', None)
 
+        cache_size = variable_kwargs.pop('cache_size', None)
+        if variable_kwargs.pop('intern', False) is True or cache_size:
+            variable_kwargs['cache'] = ValueCache(cache_size or CACHE_SIZE)
+
         Field.__init__(self, name, cls, primary, partial(
             variable_class, field=self,
             validator_attribute=attr, **variable_kwargs
@@ -138,6 +149,16 @@ class PropertyField(Field):
 
 class SimpleProperty(Property):
     """The siplest possible property
+
+    Besides the arguments of :class:`Property`, the keyword arguments are
+    passed to the variable class, among them:
+
+    :param default: the default value
+    :param value_factory: callable returning the default value
+    :param intern: if True values loaded from the database are shared by
+        all the objects, see :class:`ValueCache`
+    :param cache_size: like `intern`, with a table of the given size
+        instead of `CACHE_SIZE`
     """
 
     variable_class = None
@@ -148,3 +169,106 @@ class SimpleProperty(Property):
         super(SimpleProperty, self).__init__(
             name, primary, self.variable_class, kwargs
         )
+
+
+class FastProperty(object):
+    """Descriptor bound to the position of a field in the object data
+
+    :func:`install_fast_properties` replaces the properties of a class with
+    fast properties that resolve the field of the class only once. Values
+    are read straight from the variable at the position of the field (or
+    from the values of a :class:`ColumnarObjectData`) and the `parse_get`
+    call is skipped for variables that don't override it.
+
+    Objects that are not instances of the class the fast property was
+    created for (like aliases) go through the regular :class:`Property`.
+
+    :param prop: the :class:`Property` to replace
+    :param cls: the class where the fast property is installed
+    """
+
+    __slots__ = (
+        'prop', 'cls', 'cls_data', 'field', 'position', 'identity',
+        'positional'
+    )
+
+    def __init__(self, prop, cls):
+        self.prop = prop
+        self.cls = cls
+        self.cls_data = cls_data = get_cls_data(cls)
+        self.field = field = prop._get_field(cls)
+        self.position = cls_data.field_positions[id(field)]
+        self.identity = has_identity_get(type(field.variable_factory()))
+        # regular object data stores the variables in the order of the
+        # fields, lazy and columnar object data need their own accessors
+        self.positional = (
+            cls_data.lazy_variables is False and
+            cls_data.object_data_class is not ColumnarObjectData
+        )
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            if cls is self.cls:
+                return self.field
+            return self.prop.__get__(None, cls)
+
+        obj_data = obj.__dict__.get('__object_data__')
+        if obj_data is None:
+            obj_data = get_obj_data(obj)
+        if obj_data.cls_data is not self.cls_data:
+            return self.prop.__get__(obj, cls)
+
+        if self.positional is True:
+            variable = obj_data.positional[self.position]
+            if self.identity is True:
+                value = variable._value
+                return None if value is Undef else value
+            return variable.get()
+
+        if getattr(obj_data, '_variables', True) is None:
+            # columnar object data without any variable created yet
+            value = obj_data.values[self.position]
+            if self.identity is True:
+                return None if value is Undef else value
+            return obj_data.converters[self.position].parse_get(value)
+
+        return obj_data.get_value(self.field)
+
+    def __set__(self, obj, value):
+        obj_data = obj.__dict__.get('__object_data__')
+        if obj_data is None:
+            obj_data = get_obj_data(obj)
+        if obj_data.cls_data is not self.cls_data:
+            return self.prop.__set__(obj, value)
+
+        if self.positional is True:
+            obj_data.positional[self.position].set(value)
+            obj_data.dirty.add(self.field)
+        else:
+            obj_data.set_value(self.field, value)
+
+    def __delete__(self, obj):
+        obj_data = get_obj_data(obj)
+        if obj_data.cls_data is not self.cls_data:
+            return self.prop.__delete__(obj)
+
+        obj_data.delete_value(self.field)
+
+
+def install_fast_properties(cls):
+    """Replace the properties of the class with :class:`FastProperty`
+
+    :class:`PropertyRegisterMeta` calls it for the classes that set
+    `__txorm_fast_properties__` to True.
+    """
+
+    for attr in get_cls_data(cls).attributes:
+        for klass in cls.__mro__:
+            if attr in klass.__dict__:
+                prop = klass.__dict__[attr]
+                break
+
+        if isinstance(prop, FastProperty):
+            prop = prop.prop
+        if isinstance(prop, Property):
+            setattr(cls, attr, FastProperty(prop, cls))
@@ -7,11 +7,15 @@ import weakref
 from bisect import insort_left, bisect_left
 
 from txorm.object_data import get_cls_data
+from txorm.property.base import install_fast_properties
 from txorm.exceptions import PropertyPathError
 
 
 class PropertyRegisterMeta(type):
     """A metaclass that associates TxORM with `PropertyRegistry`.
+
+    Classes that set `__txorm_fast_properties__` to True get their
+    properties replaced with :class:`FastProperty` descriptors.
     """
 
     def __init__(cls, name, bases, dict):
@@ -20,6 +24,8 @@ class PropertyRegisterMeta(type):
         elif (hasattr(cls, '__database_table__')
                 or hasattr(cls, '__storm_table__')):  # Storm compatibility
             cls._txorm_property_registry.add_class(cls)
+            if getattr(cls, '__txorm_fast_properties__', False) is True:
+                install_fast_properties(cls)
 
 
 class PropertyRegistry(object):
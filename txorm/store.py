@@ -0,0 +1,230 @@
+# -*- test-case-name: txorm.test.test_store -*-
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""Unit of work on top of a database connection
+
+A :class:`Store` queues the objects added, changed and removed and saves
+all of them in a single transaction when it is flushed, using as few
+statements as possible:
+
+* new objects of the same class become multi-row INSERT statements
+* changes of objects of the same class that touch the same fields become
+  a single UPDATE statement executed with `executemany`
+* removed objects of the same class become `DELETE ... WHERE pk IN (...)`
+"""
+
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+from twisted.internet import defer
+
+from txorm.compiler.state import State
+from txorm.identity_map import IdentityMap
+from txorm.object_data import get_obj_data
+from txorm.compiler.comparable import And, Eq, In, Or
+from txorm.compiler.expressions import Delete, Insert
+
+
+class Store(object):
+    """Track the objects of a connection and save them all at once
+
+    Statements are executed in this order: inserts, updates and deletes.
+    Multi-row INSERT statements can't return generated keys so the primary
+    key of new objects must be set before flushing them to be tracked
+    after the flush.
+
+    :param connection: the :class:`Connection` to save the objects with
+    :param identity_map: the :class:`IdentityMap` of the loaded objects,
+        a new one by default
+    :param max_rows: maximum number of rows per INSERT or DELETE statement
+    """
+
+    def __init__(self, connection, identity_map=None, max_rows=1000):
+        self.connection = connection
+        self.identity_map = (
+            identity_map if identity_map is not None else IdentityMap())
+        self.max_rows = max_rows
+        self._new = OrderedDict()
+        self._removed = OrderedDict()
+
+    def add(self, obj):
+        """Queue a new object to be inserted in the next flush
+        """
+
+        obj_data = get_obj_data(obj)
+        if obj_data in self._removed:
+            del self._removed[obj_data]
+        elif obj not in self.identity_map:
+            self._new[obj_data] = obj
+
+        return obj
+
+    def remove(self, obj):
+        """Queue an object to be deleted in the next flush
+        """
+
+        obj_data = get_obj_data(obj)
+        if obj_data in self._new:
+            del self._new[obj_data]
+        else:
+            self._removed[obj_data] = obj
+
+    def load(self, cls, row):
+        """Return the object of a raw database row, see
+        :meth:`IdentityMap.load`
+        """
+
+        return self.identity_map.load(cls, row)
+
+    def get(self, cls, primary_values):
+        """Return the loaded object with the given primary key or None
+        """
+
+        return self.identity_map.get(cls, primary_values)
+
+    def flush(self):
+        """Save all the pending changes in a single transaction
+
+        Objects must not be changed until the flush is done.
+
+        :return: a Deferred that fires when the changes are saved, if it
+            fails nothing is saved and the changes are kept pending
+        """
+
+        new = list(self._new.values())
+        removed = list(self._removed.values())
+        dirty = []
+        for obj in self.identity_map:
+            obj_data = get_obj_data(obj)
+            if obj_data.dirty and obj_data not in self._removed:
+                dirty.append(obj)
+
+        operations = (
+            self._insert_operations(new) +
+            self._update_operations(dirty) +
+            self._delete_operations(removed)
+        )
+        if not operations:
+            return defer.succeed(None)
+
+        d = self.connection.execute_transact(_flush, operations)
+
+        def flushed(_):
+            for obj in new:
+                obj_data = get_obj_data(obj)
+                obj_data.checkpoint()
+                self._new.pop(obj_data, None)
+                if all(var.is_defined for var in obj_data.primary_vars):
+                    self.identity_map.add(obj)
+
+            for obj in dirty:
+                get_obj_data(obj).checkpoint()
+
+            for obj in removed:
+                obj_data = get_obj_data(obj)
+                self._removed.pop(obj_data, None)
+                self.identity_map.remove(obj, [
+                    variable.get()
+                    for variable in obj_data.get_primary_checkpoint()
+                ])
+
+        return d.addCallback(flushed)
+
+    def _insert_operations(self, objects):
+        """Group the new objects by class and defined fields into INSERTs
+        """
+
+        groups = OrderedDict()
+        for obj in objects:
+            obj_data = get_obj_data(obj)
+            variables = obj_data.variables
+            fields = tuple(
+                field for field in obj_data.cls_data.fields
+                if variables[field].is_defined
+            )
+            groups.setdefault((obj_data.cls_data, fields), []).append(
+                tuple(variables[field] for field in fields))
+
+        operations = []
+        for (cls_data, fields), rows in groups.items():
+            for chunk in _chunks(rows, self.max_rows):
+                statement, params = self._compile(Insert(
+                    fields, values=chunk, table=cls_data.table))
+                operations.append((statement, params, False))
+
+        return operations
+
+    def _update_operations(self, objects):
+        """Collapse the UPDATEs of the changed objects with the same SQL
+        """
+
+        groups = OrderedDict()
+        for obj in objects:
+            update = get_obj_data(obj).get_update()
+            if update is None:
+                continue
+
+            statement, params = self._compile(update)
+            groups.setdefault(statement, []).append(params)
+
+        return [
+            (statement, rows if len(rows) > 1 else rows[0], len(rows) > 1)
+            for statement, rows in groups.items()
+        ]
+
+    def _delete_operations(self, objects):
+        """Group the removed objects by class into DELETE ... IN
+
+        Rows are found by the primary key values at the last checkpoint
+        as in :meth:`ObjectData.get_update`
+        """
+
+        groups = OrderedDict()
+        for obj in objects:
+            obj_data = get_obj_data(obj)
+            groups.setdefault(obj_data.cls_data, []).append(
+                obj_data.get_primary_checkpoint())
+
+        operations = []
+        for cls_data, keys in groups.items():
+            primary_key = cls_data.primary_key
+            for chunk in _chunks(keys, self.max_rows):
+                if len(primary_key) == 1:
+                    where = In(primary_key[0], [key[0] for key in chunk])
+                else:
+                    where = Or(*[
+                        And(*[Eq(f, v) for f, v in zip(primary_key, key)])
+                        for key in chunk
+                    ])
+                statement, params = self._compile(
+                    Delete(where, table=cls_data.table))
+                operations.append((statement, params, False))
+
+        return operations
+
+    def _compile(self, expression):
+        state = State()
+        statement = self.connection.compile(expression, state)
+        params = tuple(self.connection.to_database(state.parameters))
+        return statement, params
+
+
+def _flush(transaction, operations):
+    """Execute the flush operations, called inside of an interaction
+    """
+
+    for statement, params, many in operations:
+        if many is True:
+            transaction.executemany(statement, params)
+        else:
+            transaction.execute(statement, params)
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+__all__ = ['Store']
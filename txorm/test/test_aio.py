@@ -0,0 +1,135 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM asyncio Database Backend Unit Tests (Python 3 only)
+"""
+
+from __future__ import unicode_literals
+
+import asyncio
+from decimal import Decimal
+
+from twisted.trial import unittest
+
+from txorm.compiler import Param
+from txorm.compiler.tables import Table
+from txorm.compiler.fields import Field
+from txorm.database.result import Result
+from txorm.database.database import create_database
+from txorm.database.aio import AsyncConnection, AsyncPool, AsyncSQLite
+from txorm.compiler.expressions import Select, Update
+from txorm.variable import IntVariable, UnicodeVariable, DecimalVariable
+
+
+table = Table('foo')
+id_field = Field('id', table, variable_factory=IntVariable)
+name_field = Field('name', table, variable_factory=UnicodeVariable)
+price_field = Field('price', table, variable_factory=DecimalVariable)
+fields = (id_field, name_field, price_field)
+
+
+class AsyncConnectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.database = create_database(
+            'aiosqlite:{}?pool_size=2'.format(self.mktemp()))
+        self.connection = self.database.connect()
+        self.wait(self.connection.execute(
+            'CREATE TABLE foo (id INTEGER, name TEXT, price TEXT)',
+            noresult=True
+        ))
+
+    def tearDown(self):
+        self.wait(self.connection.close())
+        self.loop.close()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_create_database(self):
+        self.assertIsInstance(self.database, AsyncSQLite)
+        self.assertIsInstance(self.connection, AsyncConnection)
+        self.assertEqual(self.database.pool_size, 2)
+        self.assertEqual(create_database('aiosqlite:').filename, ':memory:')
+
+    def test_execute(self):
+        self.wait(self.connection.execute(
+            "INSERT INTO foo VALUES (1, 'foo', '1.5')", noresult=True))
+        result = self.wait(self.connection.execute(
+            Select((id_field, price_field), id_field == 1)))
+        self.assertIsInstance(result, Result)
+        self.assertEqual(result.one().price, Decimal('1.5'))
+
+        result = self.wait(self.connection.execute(
+            'SELECT name FROM foo WHERE id = ?', (IntVariable(1),)))
+        self.assertEqual(result.one(), ('foo',))
+
+    def test_execute_transact(self):
+        async def transact(connection, value):
+            await connection.execute(
+                'INSERT INTO foo (id) VALUES (?)', (value,))
+            if value == 2:
+                raise ValueError(value)
+
+        self.wait(self.connection.execute_transact(transact, 1))
+        self.assertRaises(
+            ValueError, self.wait,
+            self.connection.execute_transact(transact, 2)
+        )
+        result = self.wait(self.connection.execute('SELECT id FROM foo'))
+        self.assertEqual(result.column(0), [1])
+
+    def test_bulk_insert_and_execute_many(self):
+        count = self.wait(self.connection.bulk_insert(
+            ((i, 'a', None) for i in range(25)), fields, max_rows=10))
+        self.assertEqual(count, 25)
+
+        rowcounts = self.wait(self.connection.execute_many(
+            Update({name_field: Param('name')}, id_field == Param('id')),
+            ({'id': i, 'name': 'b'} for i in range(5)), chunk_size=2
+        ))
+        self.assertEqual(rowcounts, [2, 2, 1])
+        result = self.wait(self.connection.execute(
+            'SELECT name, COUNT(*) FROM foo GROUP BY name'))
+        self.assertEqual(list(result.rows), [('a', 20), ('b', 5)])
+
+    def test_concurrent_queries_share_the_pool(self):
+        async def queries():
+            return await asyncio.gather(*[
+                self.connection.execute('SELECT ?', (i,)) for i in range(10)
+            ])
+
+        results = self.wait(queries())
+        self.assertEqual([r.one()[0] for r in results], list(range(10)))
+        self.assertTrue(len(self.connection._pool._idle) <= 2)
+
+    def test_connections_share_the_pool(self):
+        other = self.database.connect()
+        self.assertIdentical(other._pool, self.connection._pool)
+        self.assertIsInstance(other._pool, AsyncPool)
+
+        held = []
+        opened = []
+        raw_connect = self.database.raw_connect
+
+        async def counting_raw_connect():
+            opened.append(True)
+            return await raw_connect()
+
+        async def transact(connection):
+            held.append(connection)
+            await asyncio.sleep(0.01)
+            result = len(set(held))
+            held.remove(connection)
+            return result
+
+        async def queries():
+            return await asyncio.gather(*[
+                connection.execute_transact(transact)
+                for connection in (self.connection, other) * 4
+            ])
+
+        self.database.raw_connect = counting_raw_connect
+        self.assertTrue(max(self.wait(queries())) <= 2)
+        self.assertTrue(len(opened) <= 2)
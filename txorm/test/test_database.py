@@ -0,0 +1,490 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM Database Unit Tests
+"""
+
+from __future__ import unicode_literals
+
+from decimal import Decimal
+from functools import partial
+
+from twisted.trial import unittest
+from twisted.internet import defer, reactor, task
+from twisted.enterprise import adbapi
+
+from txorm import Undef
+from txorm.compiler import Param
+from txorm.database import Database
+from txorm.compiler.tables import Table
+from txorm.compiler.fields import Field
+from txorm.exceptions import NoneError, NotOneError
+from txorm.database.result import Result, Row
+from txorm.database.bulk import BulkInsert
+from txorm.database.stream import ResultStream
+from txorm.compiler.base import txorm_compile
+from txorm.compiler.expressions import Select, Update
+from txorm.variable import IntVariable, UnicodeVariable, DecimalVariable
+
+
+table = Table('foo')
+id_field = Field('id', table, variable_factory=IntVariable)
+name_field = Field('name', table, variable_factory=UnicodeVariable)
+price_field = Field('price', table, variable_factory=DecimalVariable)
+
+
+class ResultTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [(1, 'foo', '1.5'), (2, 'bar', None), (3, 'baz', '3')]
+        self.result = Result(
+            self.rows, (id_field, name_field, price_field))
+
+    def test_rows_are_not_copied(self):
+        self.assertIdentical(self.result.rows, self.rows)
+        self.assertEqual(len(self.result), 3)
+        self.assertEqual(self.result.count(), 3)
+
+    def test_iteration(self):
+        rows = list(self.result)
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(isinstance(rows[0], Row))
+        self.assertIdentical(rows[0].raw, self.rows[0])
+        self.assertEqual(rows[0], (1, 'foo', Decimal('1.5')))
+
+    def test_row_access(self):
+        row = self.result.first()
+        self.assertEqual(row[2], Decimal('1.5'))
+        self.assertEqual(row['price'], Decimal('1.5'))
+        self.assertEqual(row[price_field], Decimal('1.5'))
+        self.assertEqual(row.price, Decimal('1.5'))
+        self.assertEqual(row.name, 'foo')
+        self.assertEqual(self.result[1].price, None)
+        self.assertRaises(AttributeError, getattr, row, 'nope')
+        self.assertRaises(KeyError, row.__getitem__, 'nope')
+
+    def test_row_has_no_dict(self):
+        self.assertFalse(hasattr(self.result.first(), '__dict__'))
+
+    def test_lazy_conversion(self):
+        self.result.first().name
+        self.assertEqual(self.result._converters[0], Undef)
+        self.assertNotEqual(self.result._converters[1], Undef)
+        self.assertEqual(self.result._converters[2], Undef)
+
+    def test_column(self):
+        self.assertEqual(self.result.column('price'),
+                         [Decimal('1.5'), None, Decimal('3')])
+        self.assertEqual(self.result.column(id_field), [1, 2, 3])
+        column = self.result.column(0, 'l')
+        self.assertEqual(column.typecode, 'l')
+        self.assertEqual(list(column), [1, 2, 3])
+
+    def test_column_is_converted_at_once(self):
+        calls = []
+
+        class Variable(DecimalVariable):
+
+            def parse_set(self, value, from_db):
+                calls.append(value)
+                return super(Variable, self).parse_set(value, from_db)
+
+            def parse_set_many(self, values, from_db):
+                calls.append(list(values))
+                return super(Variable, self).parse_set_many(values, from_db)
+
+        field = Field('price', table, variable_factory=Variable)
+        result = Result(self.rows, (id_field, name_field, field))
+        self.assertEqual(
+            result.column(2), [Decimal('1.5'), None, Decimal('3')])
+        self.assertEqual(calls, [['1.5', None, '3']])
+        self.assertEqual(result.first().price, Decimal('1.5'))
+
+    def test_first_and_one(self):
+        self.assertEqual(Result([]).first(), None)
+        self.assertEqual(Result([]).one(), None)
+        self.assertEqual(Result([(1,)]).one(), (1,))
+        self.assertRaises(NotOneError, self.result.one)
+
+    def test_no_fields(self):
+        result = Result([(1, '2')])
+        self.assertEqual(result.first(), (1, '2'))
+        self.assertEqual(result.column(1), ['2'])
+
+
+class SQLiteDatabase(Database):
+
+    def __init__(self, path):
+        super(SQLiteDatabase, self).__init__()
+        self.path = path
+
+    def raw_connect(self):
+        return adbapi.ConnectionPool(
+            'sqlite3', self.path, check_same_thread=False,
+            cp_min=1, cp_max=3
+        )
+
+
+class SQLiteTestCase(unittest.TestCase):
+
+    @defer.inlineCallbacks
+    def setUp(self):
+        self.connection = SQLiteDatabase(self.mktemp()).connect()
+        self.pool = self.connection._raw_connection
+        yield self.pool.runOperation(
+            'CREATE TABLE foo (id INTEGER, name TEXT, price TEXT)')
+
+    def tearDown(self):
+        self.pool.close()
+
+
+class ConnectionTest(SQLiteTestCase):
+
+    @defer.inlineCallbacks
+    def test_execute(self):
+        yield self.pool.runOperation(
+            "INSERT INTO foo VALUES (1, 'foo', '1.5')")
+        result = yield self.connection.execute(
+            Select((id_field, price_field), id_field == 1))
+        self.assertEqual(result.one().price, Decimal('1.5'))
+
+    @defer.inlineCallbacks
+    def test_bulk_insert(self):
+        rows = ((i, 'name', Decimal(i)) for i in range(250))
+        count = yield self.connection.bulk_insert(
+            rows, (id_field, name_field, price_field),
+            max_rows=100, concurrency=2
+        )
+        self.assertEqual(count, 250)
+        result = yield self.pool.runQuery('SELECT COUNT(*), SUM(id) FROM foo')
+        self.assertEqual(result, [(250, sum(range(250)))])
+
+    @defer.inlineCallbacks
+    def test_bulk_insert_failure(self):
+        try:
+            yield self.connection.bulk_insert(
+                [(1, 'a', None), ('a', 'b', None)], (id_field, name_field,
+                                                     price_field))
+        except TypeError:
+            pass
+        else:
+            self.fail('TypeError not raised')
+
+    @defer.inlineCallbacks
+    def test_bulk_insert_none(self):
+        required = Field('name', table, variable_factory=partial(
+            UnicodeVariable, allow_none=False))
+        try:
+            yield self.connection.bulk_insert(
+                [(1, 'a'), (2, None)], (id_field, required))
+        except NoneError:
+            pass
+        else:
+            self.fail('NoneError not raised')
+
+        result = yield self.pool.runQuery('SELECT COUNT(*) FROM foo')
+        self.assertEqual(result, [(0,)])
+
+    @defer.inlineCallbacks
+    def test_execute_many(self):
+        yield self.connection.bulk_insert(
+            [(i, 'a', None) for i in range(10)], (id_field, name_field,
+                                                  price_field))
+        rowcounts = yield self.connection.execute_many(
+            Update({name_field: Param('name')}, id_field == Param('id')),
+            ({'id': i, 'name': 'b'} for i in range(7)), chunk_size=3
+        )
+        self.assertEqual(rowcounts, [3, 3, 1])
+
+        rowcounts = yield self.connection.execute_many(
+            'DELETE FROM foo WHERE id = ?', [(IntVariable(8),), (9,)])
+        self.assertEqual(rowcounts, [2])
+        result = yield self.pool.runQuery(
+            'SELECT name, COUNT(*) FROM foo GROUP BY name')
+        self.assertEqual(result, [('a', 1), ('b', 7)])
+
+    @defer.inlineCallbacks
+    def test_stream_fetch(self):
+        yield self.connection.bulk_insert(
+            [(i, 'a', None) for i in range(25)], (id_field, name_field,
+                                                  price_field))
+        stream = self.connection.stream(
+            Select(id_field, id_field > 4, order_by=id_field), batch_size=10)
+        started = stream.when_started()
+        self.assertFalse(started.called)
+        batches = []
+        while True:
+            batch = yield stream.fetch()
+            if batch is None:
+                break
+            batches.append(batch)
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10])
+        self.assertEqual(batches[0][0], (5,))
+        count = yield stream.when_done()
+        self.assertEqual(count, 20)
+        self.assertIdentical((yield started), stream)
+        self.assertIdentical((yield stream.when_started()), stream)
+
+    @defer.inlineCallbacks
+    def test_stream_push_and_stop(self):
+        yield self.connection.bulk_insert(
+            [(i, 'a', None) for i in range(25)], (id_field, name_field,
+                                                  price_field))
+
+        class Consumer(object):
+            batches = []
+
+            def registerProducer(self, producer, streaming):
+                self.producer = producer
+
+            def unregisterProducer(self):
+                self.producer = None
+
+            def write(self, rows):
+                self.batches.append(rows)
+                self.producer.stopProducing()
+
+        consumer = Consumer()
+        count = yield self.connection.stream(
+            'SELECT id FROM foo', batch_size=10).start(consumer)
+        self.assertEqual(count, 10)
+        self.assertEqual(len(consumer.batches), 1)
+        self.assertIdentical(consumer.producer, None)
+
+    @defer.inlineCallbacks
+    def test_stream_error(self):
+        stream = self.connection.stream('SELECT nope FROM foo')
+        try:
+            yield stream.fetch()
+        except Exception:
+            pass
+        else:
+            self.fail('error not raised')
+
+        yield self.assertFailure(stream.when_done(), Exception)
+
+    @defer.inlineCallbacks
+    def test_stream_aclose(self):
+        yield self.connection.bulk_insert(
+            [(i, 'a', None) for i in range(25)], (id_field, name_field,
+                                                  price_field))
+        stream = self.connection.stream('SELECT id FROM foo', batch_size=10)
+        entered = yield stream.__aenter__()
+        self.assertIdentical(entered, stream)
+        batch = yield stream.fetch()
+        self.assertEqual(len(batch), 10)
+
+        result = yield stream.__aexit__(None, None, None)
+        self.assertIdentical(result, None)
+        count = yield stream.when_done()
+        self.assertEqual(count, 10)
+        batch = yield stream.fetch()
+        self.assertIdentical(batch, None)
+
+    @defer.inlineCallbacks
+    def test_stream_stop_before_start(self):
+        stream = self.connection.stream('SELECT id FROM foo')
+        done = stream.when_done()
+        started = stream.when_started()
+        stream.stopProducing()
+        count = yield done
+        self.assertFalse(started.called)
+        self.assertEqual(count, 0)
+        batch = yield stream.fetch()
+        self.assertIdentical(batch, None)
+        yield stream.aclose()
+
+    @defer.inlineCallbacks
+    def test_stream_timeout(self):
+        yield self.connection.bulk_insert(
+            [(i, 'a', None) for i in range(25)], (id_field, name_field,
+                                                  price_field))
+        clock = task.Clock()
+        stream = ResultStream(
+            self.pool, 'SELECT id FROM foo', batch_size=10, timeout=5,
+            clock=clock
+        )
+        batch = yield stream.fetch()
+        self.assertEqual(len(batch), 10)
+
+        # let the delivery of the first batch end, the pool thread waits
+        yield task.deferLater(reactor, 0, lambda: None)
+        clock.advance(4)
+        self.assertFalse(stream._finished)
+        clock.advance(1)
+        yield self.assertFailure(stream.when_done(), defer.TimeoutError)
+        self.assertEqual(stream.count, 10)
+
+
+class BatchTest(SQLiteTestCase):
+
+    @defer.inlineCallbacks
+    def test_batch(self):
+        with self.connection.batch() as batch:
+            insert = batch.execute(
+                "INSERT INTO foo VALUES (1, 'foo', '1.5')")
+            select = batch.execute(Select(price_field, id_field == 1))
+            count = batch.execute('SELECT COUNT(*) FROM foo')
+            self.assertEqual(len(batch), 3)
+            self.assertFalse(select.called)
+
+        result = yield select
+        self.assertEqual(result.one().price, Decimal('1.5'))
+        result = yield count
+        self.assertEqual(result.one(), (1,))
+        result = yield insert
+        self.assertEqual(len(result), 0)
+
+    @defer.inlineCallbacks
+    def test_batch_failure(self):
+        batch = self.connection.batch()
+        insert = batch.execute("INSERT INTO foo VALUES (1, 'foo', '1.5')")
+        select = batch.execute('SELECT nope FROM foo')
+        yield self.assertFailure(batch.run(), Exception)
+        yield self.assertFailure(insert, Exception)
+        yield self.assertFailure(select, Exception)
+
+        result = yield self.pool.runQuery('SELECT COUNT(*) FROM foo')
+        self.assertEqual(result, [(0,)])
+
+    @defer.inlineCallbacks
+    def test_batch_failure_with(self):
+        with self.connection.batch() as batch:
+            insert = batch.execute(
+                "INSERT INTO foo VALUES (1, 'foo', '1.5')")
+            select = batch.execute('SELECT nope FROM foo')
+
+        # only the statements Deferreds report the error, trial fails the
+        # test if any other Deferred is left with an unhandled error
+        yield self.assertFailure(insert, Exception)
+        yield self.assertFailure(select, Exception)
+
+        result = yield self.pool.runQuery('SELECT COUNT(*) FROM foo')
+        self.assertEqual(result, [(0,)])
+
+    @defer.inlineCallbacks
+    def test_batch_cancel(self):
+        try:
+            with self.connection.batch() as batch:
+                select = batch.execute('SELECT 1')
+                raise ValueError()
+        except ValueError:
+            pass
+
+        yield self.assertFailure(select, defer.CancelledError)
+        result = yield batch.run()
+        self.assertEqual(result, [])
+
+    def test_multi_statement(self):
+        from txorm.database.batch import _run_batch
+
+        class Cursor(object):
+            description = ()
+            results = [[(1,)], [(2,)], [(3,)]]
+
+            def execute(self, statement, params=()):
+                self.executed = (statement, params)
+
+            def fetchall(self):
+                return self.results[0]
+
+            def nextset(self):
+                self.results.pop(0)
+
+        cursor = Cursor()
+        rows = _run_batch(
+            cursor, [('SELECT ?', (1,)), ('SELECT 2', ()), ('SELECT ?', (3,))],
+            True
+        )
+        self.assertEqual(rows, [[(1,)], [(2,)], [(3,)]])
+        self.assertEqual(
+            cursor.executed, ('SELECT ?; SELECT 2; SELECT ?', (1, 3)))
+
+
+class BulkInsertTest(unittest.TestCase):
+
+    def test_header(self):
+        bulk = BulkInsert(txorm_compile, (id_field, name_field))
+        self.assertEqual(bulk.header, 'INSERT INTO foo (id, name) VALUES')
+        self.assertEqual(
+            bulk.statement(2),
+            'INSERT INTO foo (id, name) VALUES (?, ?), (?, ?)'
+        )
+        self.assertIdentical(bulk.statement(2), bulk.statement(2))
+
+    def test_chunks_by_rows(self):
+        bulk = BulkInsert(txorm_compile, (id_field,), max_rows=2)
+        chunks = list(bulk.chunks([(i,) for i in range(5)]))
+        self.assertEqual([chunk[2] for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0][1], (0, 1))
+
+    def test_chunks_by_params(self):
+        bulk = BulkInsert(
+            txorm_compile, (id_field, name_field), max_params=5)
+        chunks = list(bulk.chunks([(i, 'a') for i in range(5)]))
+        self.assertEqual([chunk[2] for chunk in chunks], [2, 2, 1])
+        self.assertRaises(
+            ValueError, BulkInsert, txorm_compile, (id_field, name_field),
+            max_params=1
+        )
+
+    def test_chunks_by_bytes(self):
+        bulk = BulkInsert(txorm_compile, (name_field,), max_bytes=50)
+        chunks = list(bulk.chunks([('x' * 10,)] * 4))
+        self.assertEqual([chunk[2] for chunk in chunks], [1, 1, 1, 1])
+
+    def test_conversion(self):
+        bulk = BulkInsert(txorm_compile, (id_field, price_field))
+        self.assertEqual(bulk.convert((IntVariable(1), Decimal('2.5'))),
+                         [1, '2.5'])
+        self.assertRaises(ValueError, bulk.convert, (1,))
+
+    def test_conversion_many(self):
+        bulk = BulkInsert(txorm_compile, (id_field, price_field))
+        rows = [
+            (1, Decimal('2.5')), (IntVariable(2), None), [3, 4]]
+        self.assertEqual(
+            bulk.convert_many(rows), [bulk.convert(row) for row in rows])
+        self.assertEqual(bulk.convert_many([(1, 2), (3, 4)]), [
+            [1, '2'], [3, '4']])
+        self.assertRaises(ValueError, bulk.convert_many, [(1, 2), (1,)])
+        self.assertRaises(TypeError, bulk.convert_many, [('1', 2)])
+
+    def test_conversion_none(self):
+        required = Field('name', table, variable_factory=partial(
+            UnicodeVariable, allow_none=False))
+        bulk = BulkInsert(txorm_compile, (id_field, required))
+        self.assertEqual(bulk.convert((1, 'x')), [1, 'x'])
+        self.assertEqual(bulk.convert((None, 'x')), [None, 'x'])
+        self.assertRaises(NoneError, bulk.convert, (1, None))
+        self.assertRaises(
+            NoneError, bulk.convert_many, [(1, 'x'), (2, None)])
+        self.assertRaises(NoneError, list, bulk.chunks([(1, None)]))
+
+    def test_run_waits_for_the_running_chunks(self):
+        interactions = []
+
+        def fail_one():
+            # one chunk fails while the other one is still running
+            interactions[0].errback(ValueError('boom'))
+            reactor.callLater(0.1, interactions[1].callback, 1)
+
+        class Pool(object):
+
+            def runInteraction(self, function, statement, params, count):
+                interactions.append(defer.Deferred())
+                if len(interactions) == 2:
+                    reactor.callLater(0, fail_one)
+                return interactions[-1]
+
+        def failed(failure):
+            failure.trap(ValueError)
+            self.assertTrue(all(d.called for d in interactions))
+            self.assertEqual(len(interactions), 2)
+            self.assertEqual(failure.value.inserted_rows, 1)
+
+        bulk = BulkInsert(txorm_compile, (id_field,), max_rows=1)
+        d = bulk.run(Pool(), [(i,) for i in range(5)], concurrency=2)
+        d.addCallbacks(lambda _: self.fail('ValueError not raised'), failed)
+        return d
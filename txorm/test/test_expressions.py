@@ -7,6 +7,9 @@
 
 from __future__ import unicode_literals
 
+import operator
+from functools import reduce
+from timeit import default_timer
 from datetime import datetime, date, time, timedelta
 
 from twisted.trial import unittest
@@ -127,6 +130,49 @@ class ExpressionsTest(unittest.TestCase):
         expression = Or(elem1, elem2, elem3)
         self.assertEqual(expression.expressions, (elem1, elem2, elem3))
 
+    def test_compound_operator_flatten(self):
+        expression = And(And(elem1, elem2), elem3, And(elem4, elem5))
+        self.assertEqual(
+            expression.expressions, (elem1, elem2, elem3, elem4, elem5))
+
+        expression = Func1() & elem1 & elem2 & elem3
+        self.assertEqual(len(expression.expressions), 4)
+
+        expression = Add(Add(elem1, elem2), elem3)
+        self.assertEqual(expression.expressions, (elem1, elem2, elem3))
+
+    def test_compound_operator_flatten_different_operators(self):
+        inner = Or(elem2, elem3)
+        expression = And(elem1, inner, Mul(elem4, elem5))
+        self.assertEqual(expression.expressions[1], inner)
+        self.assertEqual(len(expression.expressions), 3)
+
+    def test_compound_operator_of(self):
+        expression = Or.of(elem for elem in (elem1, elem2, elem3))
+        self.assertEqual(type(expression), Or)
+        self.assertEqual(expression.expressions, (elem1, elem2, elem3))
+
+        expression = And.of([And(elem1, elem2), elem3])
+        self.assertEqual(expression.expressions, (elem1, elem2, elem3))
+        self.assertEqual(And.of([]).expressions, ())
+
+    def test_compound_operator_flatten_shared(self):
+        inner = And(elem1, elem2)
+        expression1 = And(inner, elem3)
+        expression2 = And(inner, elem4)
+        self.assertEqual(expression2.expressions, (elem1, elem2, elem4))
+        self.assertEqual(expression1.expressions, (elem1, elem2, elem3))
+        self.assertEqual(inner.expressions, (elem1, elem2))
+
+    def test_compound_operator_flatten_long_chain(self):
+        # merging every level on its own is quadratic, 40000 conditions
+        # took more than ten seconds then
+        conditions = [Eq(Field(), i) for i in range(40000)]
+        started = default_timer()
+        expression = reduce(operator.and_, conditions)
+        self.assertEqual(expression.expressions, tuple(conditions))
+        self.assertTrue(default_timer() - started < 2)
+
     def test_field_default(self):
         expression = Field()
         self.assertEqual(expression.name, Undef)
@@ -500,6 +546,38 @@ class CompileTest(unittest.TestCase):
         statement = compile_child(C())
         self.assertEqual(statement, 'child')
 
+    def test_resolved_handlers_invalidation(self):
+        class C(object):
+            pass
+
+        class D(C):
+            pass
+
+        compile_parent = Compile()
+        compile_child = compile_parent.create_child()
+        self.assertRaises(CompileError, compile_child, D())
+        self.assertEqual(compile_child._resolved[D], (None, 1000))
+
+        @compile_parent.when(C)
+        def compile_in_parent(compile, state, expression):
+            return 'parent'
+
+        self.assertEqual(compile_child(D()), 'parent')
+        self.assertEqual(compile_child._resolved[D],
+                         (compile_in_parent, 1000))
+
+        compile_parent.set_precedence(5, D)
+        self.assertEqual(compile_child._resolved, {})
+        compile_child(D())
+        self.assertEqual(compile_child._resolved[D], (compile_in_parent, 5))
+
+        @compile_child.when(D)
+        def compile_in_child(compile, state, expression):
+            return 'child'
+
+        self.assertEqual(compile_child(D()), 'child')
+        self.assertEqual(compile_parent(D()), 'parent')
+
     def test_precedence(self):
         expression = And(
             e1, Or(e2, e3), Add(e4, Mul(e5, Sub(e6, Div(e7, Div(e8, e9)))))
@@ -1289,6 +1367,19 @@ class CompileTest(unittest.TestCase):
         self.assertEqual(statement, 'func1() OR ?')
         assert_variables(self, state.parameters, [Variable('value')])
 
+    def test_compile_flattened_and_or(self):
+        expression = And(Or(And(elem1, elem2), elem3), elem4)
+        expression = expression & Or(elem5, elem6)
+        statement = txorm_compile(expression)
+        self.assertEqual(
+            statement,
+            '(elem1 AND elem2 OR elem3) AND elem4 AND (elem5 OR elem6)'
+        )
+        self.assertEqual(
+            txorm_compile(Or.of([elem1, Or(elem2, elem3), And(elem4)])),
+            'elem1 OR elem2 OR elem3 OR elem4'
+        )
+
     def test_compile_and_with_strings(self):
         expression = And('elem1', 'elem2')
         state = State()
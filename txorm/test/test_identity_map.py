@@ -0,0 +1,194 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM Identity Map Unit Tests
+"""
+
+from __future__ import unicode_literals
+
+import gc
+from decimal import Decimal as decimal
+from datetime import datetime
+
+from twisted.trial import unittest
+
+from txorm.exceptions import NoneError
+from txorm.property import DateTime, Decimal, Int, Unicode
+from txorm.object_data import get_cls_data, get_obj_data
+from txorm.identity_map import IdentityMap, build_object, build_objects
+
+
+class IdentityMapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.map = IdentityMap()
+        self.cls_data = get_cls_data(Dummy)
+
+    def test_load(self):
+        obj = self.map.load(Dummy, (1, 'foo'))
+        self.assertIsInstance(obj, Dummy)
+        self.assertEqual((obj.id, obj.name), (1, 'foo'))
+        self.assertEqual((self.map.hits, self.map.misses), (0, 1))
+
+        built = []
+
+        def build(cls_data, row):
+            built.append(row)
+            return build_object(cls_data, row)
+
+        self.assertIdentical(self.map.load(Dummy, (1, 'bar'), build), obj)
+        self.assertEqual(obj.name, 'foo')
+        self.assertEqual(built, [])
+        self.assertEqual((self.map.hits, self.map.misses), (1, 1))
+
+    def test_build_object_does_not_call_init(self):
+        obj = build_object(self.cls_data, (1, 'foo'))
+        self.assertFalse(hasattr(obj, 'initialized'))
+        self.assertEqual(obj.id, 1)
+
+    def test_add_and_get(self):
+        obj = Dummy()
+        obj.id = 1
+        self.assertIdentical(self.map.add(obj), obj)
+        self.assertIn(obj, self.map)
+        self.assertIdentical(self.map.get(Dummy, (1,)), obj)
+        self.assertIdentical(self.map.get(self.cls_data, (1,)), obj)
+        self.assertEqual(self.map.get(Dummy, (2,)), None)
+        self.assertEqual((self.map.hits, self.map.misses), (2, 1))
+
+        other = Dummy()
+        other.id = 1
+        self.assertIdentical(self.map.add(other), obj)
+
+    def test_remove_and_clear(self):
+        obj = self.map.load(Dummy, (1, 'foo'))
+        self.map.remove(obj)
+        self.assertNotIn(obj, self.map)
+        self.assertEqual(len(self.map), 0)
+
+        obj = self.map.load(Dummy, (1, 'foo'))
+        self.map.clear()
+        self.assertNotIdentical(self.map.load(Dummy, (1, 'foo')), obj)
+
+    def test_weak_references(self):
+        self.map.load(Dummy, (1, 'foo'))
+        gc.collect()
+        self.assertEqual(len(self.map), 0)
+        self.assertEqual(self.map.get(Dummy, (1,)), None)
+
+    def test_lru_layer(self):
+        self.map = IdentityMap(size=2)
+        for i in range(3):
+            self.map.load(Dummy, (i, 'foo'))
+
+        gc.collect()
+        self.assertEqual(len(self.map), 2)
+        self.assertEqual(self.map.get(Dummy, (0,)), None)
+        self.assertNotEqual(self.map.get(Dummy, (2,)), None)
+
+    def test_lru_ttl(self):
+        now = [0]
+        self.map = IdentityMap(size=10, ttl=60, clock=lambda: now[0])
+        self.map.load(Dummy, (1, 'foo'))
+        now[0] = 30
+        self.map.load(Dummy, (2, 'foo'))
+        now[0] = 70
+        self.map.get(Dummy, (2,))
+
+        gc.collect()
+        self.assertEqual(self.map.get(Dummy, (1,)), None)
+        self.assertNotEqual(self.map.get(Dummy, (2,)), None)
+
+    def test_lru_ttl_without_touch(self):
+        now = [0]
+        self.map = IdentityMap(size=10, ttl=60, clock=lambda: now[0])
+        self.map.load(Dummy, (1, 'foo'))
+        self.map.load(Dummy, (2, 'foo'))
+        gc.collect()
+        self.assertEqual(len(self.map), 2)
+
+        now[0] = 60
+        self.assertEqual(len(self.map), 0)
+        self.assertEqual(self.map.get(Dummy, (1,)), None)
+
+        self.map.load(Dummy, (3, 'foo'))
+        now[0] = 150
+        self.map.expire()
+        self.assertEqual(self.map._strong, {})
+        gc.collect()
+        self.assertEqual(self.map.get(Dummy, (3,)), None)
+
+    def test_compound_primary_key(self):
+        obj = self.map.load(Compound, (1, 2, 'foo'))
+        self.assertEqual(get_obj_data(obj).primary_vars[0].get(), 1)
+        self.assertIdentical(self.map.get(Compound, (1, 2)), obj)
+
+
+class BuildObjectsTest(unittest.TestCase):
+
+    rows = [
+        (decimal('1.5'), '2014-01-02 03:04:05', 1, 'foo'),
+        ('2.25', datetime(2014, 1, 2), 2, None),
+    ]
+
+    def test_build_objects(self):
+        for flag in ('', '__txorm_columnar__', '__txorm_lazy_variables__'):
+            attributes = {
+                '__database_table__': 'report', 'id': Int(primary=True),
+                'name': Unicode(), 'created': DateTime(),
+                'amount': Decimal(), '__init__': None
+            }
+            if flag:
+                attributes[flag] = True
+            Report = type(str('Report'), (object,), attributes)
+
+            first, second = build_objects(Report, self.rows)
+            self.assertEqual(
+                (first.id, first.name, first.created, first.amount),
+                (1, 'foo', datetime(2014, 1, 2, 3, 4, 5), decimal('1.5'))
+            )
+            self.assertEqual(
+                (second.id, second.name, second.amount),
+                (2, None, decimal('2.25'))
+            )
+            obj_data = get_obj_data(second)
+            self.assertIsInstance(
+                obj_data, get_cls_data(Report).object_data_class)
+            self.assertFalse(obj_data.variables[Report.id].has_changed())
+
+            second.name = 'bar'
+            self.assertEqual(obj_data.get_changes(), (Report.name,))
+
+    def test_build_objects_does_not_call_init(self):
+        objects = build_objects(Dummy, [(1, 'foo'), (2, 'bar')])
+        self.assertEqual([obj.id for obj in objects], [1, 2])
+        self.assertFalse(hasattr(objects[0], 'initialized'))
+        self.assertEqual(build_objects(Dummy, []), [])
+
+    def test_build_objects_errors(self):
+        self.assertRaises(ValueError, build_objects, Dummy, [(1, 'foo'), (2,)])
+        self.assertRaises(TypeError, build_objects, Dummy, [('1', 'foo')])
+        self.assertRaises(NoneError, build_objects, Strict, [(None, 'foo')])
+
+
+class Dummy(object):
+    __database_table__ = 'dummy'
+    id = Int(primary=True)
+    name = Unicode()
+
+    def __init__(self):
+        self.initialized = True
+
+
+class Compound(object):
+    __database_table__ = 'compound'
+    __table_primary__ = ('a', 'b')
+    b = Int()
+    a = Int()
+    name = Unicode()
+
+
+class Strict(object):
+    __database_table__ = 'strict'
+    id = Int(primary=True, allow_none=False)
+    name = Unicode()
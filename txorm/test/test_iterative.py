@@ -0,0 +1,119 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM Iterative Compile Engine Unit Tests
+"""
+
+from __future__ import unicode_literals
+
+import sys
+
+from twisted.trial import unittest
+
+from txorm.compiler.state import State
+from txorm.compiler.tables import Table
+from txorm.compiler.fields import Field
+from txorm.exceptions import CompileError
+from txorm.compiler.iterative import Nested
+from txorm.compiler.expressions import Select
+from txorm.compiler.base import txorm_compile
+from txorm.compiler.tables import Join, LeftJoin
+from txorm.compiler.comparable import And, Or, Eq, Gt
+from txorm.variable import IntVariable
+
+from txorm.test.test_expressions import CompileTest
+
+
+class IterativeCompileTest(CompileTest):
+    """Run the whole compiler test suite with the iterative engine
+    """
+
+    def setUp(self):
+        txorm_compile.set_iterative()
+
+    def tearDown(self):
+        txorm_compile.set_iterative(False)
+
+
+class IterativeEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.compile = txorm_compile.create_child()
+        self.compile.set_iterative()
+        self.table = Table('foo')
+        self.id = Field('id', self.table)
+        self.name = Field('name', self.table)
+
+    def test_selectable_per_instance(self):
+        self.assertFalse(txorm_compile.iterative)
+        self.assertTrue(self.compile.iterative)
+        self.assertFalse(txorm_compile.create_child().iterative)
+
+    def test_same_statement_than_recursive(self):
+        expression = Select(
+            [self.id, self.name],
+            Or(And(Eq(self.id, 1), Gt(self.name, 'a')), Eq(self.name, None)),
+            tables=LeftJoin(self.table, Table('bar'), Eq(self.id, 2))
+        )
+        state1, state2 = State(), State()
+        statement = txorm_compile(expression, state1)
+        self.assertEqual(self.compile(expression, state2), statement)
+        self.assertEqual([p.get() for p in state1.parameters],
+                         [p.get() for p in state2.parameters])
+
+    def test_deep_and_or_tree(self):
+        depth = sys.getrecursionlimit() * 2
+        expression = Eq(self.id, IntVariable(0))
+        for i in range(1, depth):
+            operator = And if i % 2 else Or
+            expression = operator(expression, Eq(self.id, IntVariable(i)))
+
+        state = State()
+        statement = self.compile(expression, state)
+        self.assertEqual(len(state.parameters), depth)
+        self.assertEqual(statement.count('('), depth // 2 - 1)
+        self.assertTrue(statement.startswith(
+            '(' * (depth // 2 - 1) + 'foo.id = ? AND foo.id = ? OR foo.id'))
+
+    def test_deep_join_tree(self):
+        depth = sys.getrecursionlimit() * 2
+        tables = self.table
+        for i in range(depth):
+            tables = Join(tables, Table('t{}'.format(i)))
+
+        statement = self.compile(Select(self.id, tables=tables))
+        self.assertEqual(statement.count(' JOIN '), depth)
+        self.assertTrue(statement.endswith('JOIN t{}'.format(depth - 1)))
+
+    def test_recursive_handler_shadows_iterative(self):
+        @self.compile.when(Eq)
+        def compile_eq(compile, eq, state):
+            return 'custom'
+
+        self.assertEqual(self.compile(And(Eq(1, 2), Eq(3, 4))),
+                         'custom AND custom')
+
+    def test_when_iterative(self):
+        @self.compile.when_iterative(Gt)
+        def step_gt(compile, gt, state):
+            expression1 = yield Nested(gt.expressions[0])
+            expression2 = yield Nested(gt.expressions[1])
+            yield '{} >> {}'.format(expression1, expression2)
+
+        self.assertEqual(self.compile(Gt(self.id, self.name), State()),
+                         'foo.id >> foo.name')
+        self.assertEqual(txorm_compile(Gt(self.id, self.name), State()),
+                         'foo.id > foo.name')
+
+    def test_statement_cache(self):
+        self.compile.set_statement_cache()
+        state = State()
+        self.compile(And(Eq(self.id, IntVariable(1)), Gt(self.name, 'a')))
+        statement = self.compile(
+            And(Eq(self.id, IntVariable(2)), Gt(self.name, 'a')), state)
+        self.assertEqual(statement, 'foo.id = ? AND foo.name > ?')
+        self.assertEqual(self.compile.statement_cache.hits, 1)
+        self.assertEqual([p.get() for p in state.parameters], [2, 'a'])
+
+    def test_unknown_type(self):
+        self.assertRaises(CompileError, self.compile, object())
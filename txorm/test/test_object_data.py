@@ -13,9 +13,14 @@ from twisted.trial import unittest
 from txorm.variable import Variable
 from txorm.property import Property
 from txorm.compiler import txorm_compile
+from txorm.compiler.state import State
 from txorm.exceptions import ClassDataError
 from txorm.compiler.expressions import Select
+from txorm.exceptions import NoneError
+from txorm.identity_map import build_object, build_objects
+from txorm.property import Enum, Int, Unicode
 from txorm.object_data import ClassData, ObjectData, ClassAlias
+from txorm.object_data import ColumnarObjectData, LazyVariables
 from txorm.object_data import get_obj_data, get_cls_data, set_obj_data
 
 
@@ -109,6 +114,196 @@ class FieldDataTest(unittest.TestCase):
         del obj
         self.assertEqual(obj_data.get_object(), None)
 
+    def test_get_changes(self):
+        self.variable1.set(1, from_db=True)
+        self.variable2.set(2, from_db=True)
+        self.assertEqual(self.obj_data.get_changes(), ())
+
+        self.obj.prop1 = 1
+        self.obj.prop2 = 3
+        self.assertEqual(self.obj_data.dirty, set([Dummy.prop1, Dummy.prop2]))
+        self.assertEqual(self.obj_data.get_changes(), (Dummy.prop2,))
+
+        self.obj_data.checkpoint()
+        self.assertEqual(self.obj_data.dirty, set())
+        self.assertEqual(self.obj_data.get_changes(), ())
+
+        del self.obj.prop2
+        self.assertEqual(self.obj_data.get_changes(), (Dummy.prop2,))
+
+    def test_get_update(self):
+        self.variable1.set(1, from_db=True)
+        self.variable2.set(2, from_db=True)
+        self.assertEqual(self.obj_data.get_update(), None)
+
+        self.obj.prop2 = 3
+        state = State()
+        statement = txorm_compile(self.obj_data.get_update(), state)
+        self.assertEqual(
+            statement, 'UPDATE "table" SET field2=? WHERE "table".field1 = ?')
+        self.assertEqual([v.get() for v in state.parameters], [3, 1])
+
+    def test_get_update_primary_key_changed(self):
+        self.variable1.set(1, from_db=True)
+        self.obj.prop1 = 5
+        state = State()
+        statement = txorm_compile(self.obj_data.get_update(), state)
+        self.assertEqual(
+            statement, 'UPDATE "table" SET field1=? WHERE "table".field1 = ?')
+        self.assertEqual([v.get() for v in state.parameters], [5, 1])
+
+
+class MakeVariablesTest(unittest.TestCase):
+
+    def test_make_variables(self):
+
+        class Dummy(object):
+            __database_table__ = 'dummy'
+            id = Int(primary=True, default=1)
+            kind = Enum(map={'one': 1})
+
+        cls_data = get_cls_data(Dummy)
+        variables, positional = cls_data.make_variables(
+            get_obj_data(Dummy()).get_object)
+        self.assertEqual(set(variables), set(cls_data.fields))
+        self.assertEqual(
+            positional, tuple(variables[f] for f in cls_data.fields))
+        self.assertIdentical(variables[Dummy.id].field, Dummy.id)
+        self.assertEqual(variables[Dummy.id].get(), 1)
+        variables[Dummy.kind].set('one')
+        self.assertEqual(variables[Dummy.kind].get(to_db=True), 1)
+
+    def test_lazy_variables(self):
+
+        class Dummy(object):
+            __database_table__ = 'dummy'
+            __txorm_lazy_variables__ = True
+            id = Int(primary=True)
+            name = Unicode(default='foo')
+
+        obj = Dummy()
+        variables = get_obj_data(obj).variables
+        self.assertIsInstance(variables, LazyVariables)
+        self.assertEqual(list(variables), [Dummy.id])
+
+        self.assertEqual(obj.name, 'foo')
+        self.assertIn(Dummy.name, variables)
+        obj.id = 1
+        self.assertEqual(obj.id, 1)
+        self.assertEqual(get_obj_data(obj).get_changes(), (Dummy.id,))
+        self.assertRaises(KeyError, variables.__getitem__, Columnar.id)
+
+    def test_lazy_variables_hydration(self):
+
+        class Dummy(object):
+            __database_table__ = 'dummy'
+            __txorm_lazy_variables__ = True
+            id = Int(primary=True)
+            name = Unicode()
+            title = Unicode()
+            kind = Int()
+
+        def row(**values):
+            return tuple(values[field.name] for field in cls_data.fields)
+
+        cls_data = get_cls_data(Dummy)
+        built = [build_object(
+            cls_data, row(id=1, name='foo', title='bar', kind=2))]
+        built.extend(build_objects(
+            Dummy, [row(id=3, name='baz', title=None, kind=4)]))
+        for obj in built:
+            obj_data = get_obj_data(obj)
+            self.assertEqual(list(obj_data.variables), [Dummy.id])
+            self.assertEqual(len(obj_data.variables), 1)
+
+        obj = built[0]
+        self.assertEqual((obj.id, obj.name, obj.kind), (1, 'foo', 2))
+        variable = get_obj_data(obj).variables[Dummy.name]
+        self.assertEqual(variable.get_checkpoint(), 'foo')
+        self.assertFalse(variable.has_changed())
+        self.assertEqual(len(get_obj_data(obj).variables), 3)
+
+        obj.title = 'qux'
+        self.assertEqual(get_obj_data(obj).get_changes(), (Dummy.title,))
+        self.assertEqual(built[1].title, None)
+
+
+class ColumnarObjectDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.obj = Columnar()
+        self.obj_data = get_obj_data(self.obj)
+        self.obj_data.set_value(Columnar.id, 1, from_db=True)
+        self.obj_data.set_value(Columnar.name, 'foo', from_db=True)
+
+    def test_object_data_class(self):
+        self.assertIsInstance(self.obj_data, ColumnarObjectData)
+        self.assertIdentical(
+            get_cls_data(Dummy).object_data_class, ObjectData)
+
+    def test_values(self):
+        self.assertEqual(self.obj_data.values, [1, 'foo', 10])
+        self.assertEqual((self.obj.id, self.obj.name), (1, 'foo'))
+        self.assertEqual(self.obj_data._variables, None)
+
+    def test_converters_are_shared(self):
+        other = get_obj_data(Columnar())
+        self.assertIdentical(other.converters, self.obj_data.converters)
+
+    def test_defaults(self):
+        obj = Columnar()
+        self.assertEqual((obj.id, obj.name, obj.value), (None, None, 10))
+        self.assertEqual(get_obj_data(obj).get_changes(), ())
+
+    def test_set_and_delete(self):
+        self.obj.name = 'bar'
+        self.assertEqual(self.obj.name, 'bar')
+        self.assertEqual(self.obj_data.get_changes(), (Columnar.name,))
+
+        self.obj.name = 'foo'
+        self.assertEqual(self.obj_data.get_changes(), ())
+
+        del self.obj.name
+        self.assertEqual(self.obj.name, None)
+        self.assertEqual(self.obj_data.get_changes(), (Columnar.name,))
+
+        self.obj_data.checkpoint()
+        self.assertEqual(self.obj_data.dirty, 0)
+        self.assertEqual(self.obj_data.get_changes(), ())
+
+    def test_validator_and_allow_none(self):
+        self.obj.value = 5
+        self.assertEqual(self.obj.value, 50)
+        self.assertEqual(self.obj.validated, [(self.obj, 'value', 5)])
+        self.assertRaises(NoneError, setattr, self.obj, 'id', None)
+        self.assertEqual(self.obj.id, 1)
+
+    def test_lazy_variables(self):
+        self.obj.name = 'bar'
+        variable = self.obj_data.variables[Columnar.name]
+        self.assertEqual(variable.get(), 'bar')
+        self.assertEqual(variable.get_checkpoint(), 'foo')
+        self.assertTrue(variable.has_changed())
+        self.assertIdentical(
+            self.obj_data.variables[Columnar.name], variable)
+        self.assertEqual(len(self.obj_data.variables), 3)
+
+        variable.set('baz')
+        self.assertEqual(self.obj.name, 'baz')
+        self.obj.name = 'foo'
+        self.assertEqual(variable.get(), 'foo')
+        self.assertEqual(self.obj_data.get_changes(), ())
+
+    def test_get_update(self):
+        self.obj.id = 2
+        self.obj.name = 'bar'
+        state = State()
+        statement = txorm_compile(self.obj_data.get_update(), state)
+        self.assertEqual(
+            statement, 'UPDATE columnar SET id=?, name=? '
+            'WHERE columnar.id = ?')
+        self.assertEqual([v.get() for v in state.parameters], [2, 'bar', 1])
+
 
 class ClassDataTest(unittest.TestCase):
 
@@ -369,3 +564,22 @@ class Dummy(object):
     __database_table__ = 'table'
     prop1 = Property('field1', primary=True)
     prop2 = Property('field2')
+
+
+def validate(obj, attribute, value):
+    obj.validated.append((obj, attribute, value))
+    return value * 10
+
+
+class Columnar(object):
+    """Dummy class with columnar object data for testing purposes
+    """
+
+    __database_table__ = 'columnar'
+    __txorm_columnar__ = True
+    id = Int(primary=True, allow_none=False)
+    name = Unicode()
+    value = Int(default=10, validator=validate)
+
+    def __init__(self):
+        self.validated = []
@@ -0,0 +1,116 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM Compiler Output Buffer Mode Unit Tests
+"""
+
+from __future__ import unicode_literals
+
+from twisted.trial import unittest
+
+from txorm.compiler.state import State
+from txorm.compiler.tables import Table
+from txorm.compiler.fields import Field
+from txorm.compiler.base import txorm_compile
+from txorm.compiler.comparable import And, Eq, Gt, Func
+from txorm.compiler.expressions import Select, Insert, Expression
+from txorm.variable import IntVariable
+
+from txorm.test.test_expressions import CompileTest
+
+
+class BufferedCompileTest(CompileTest):
+    """Run the whole compiler test suite in output buffer mode
+    """
+
+    def setUp(self):
+        txorm_compile.set_buffered()
+
+    def tearDown(self):
+        txorm_compile.set_buffered(False)
+
+
+class Custom(Expression):
+    __slots__ = ('expression',)
+
+    def __init__(self, expression):
+        self.expression = expression
+
+
+class OutputBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.compile = txorm_compile.create_child()
+        self.compile.set_buffered()
+        self.table = Table('foo')
+        self.id = Field('id', self.table)
+        self.name = Field('name', self.table)
+
+    def test_selectable_per_instance(self):
+        self.assertFalse(txorm_compile.buffered)
+        self.assertTrue(self.compile.buffered)
+
+    def test_buffer_is_released(self):
+        state = State()
+        statement = self.compile(
+            Select(self.id, And(Gt(self.id, 1), Eq(self.name, None))), state)
+        self.assertEqual(
+            statement,
+            'SELECT foo.id FROM foo WHERE foo.id > ? AND foo.name IS NULL'
+        )
+        self.assertIdentical(state.buffer, None)
+        self.assertEqual(state._stack, [])
+
+    def test_bulk_insert(self):
+        rows = [(IntVariable(i), 'name{}'.format(i)) for i in range(1000)]
+        expression = Insert((self.id, self.name), values=rows)
+        state1, state2 = State(), State()
+        statement = txorm_compile(expression, state1)
+        self.assertEqual(self.compile(expression, state2), statement)
+        self.assertEqual(statement.count('(?, ?)'), 1000)
+        self.assertEqual(len(state2.parameters), 2000)
+        self.assertEqual([p.get() for p in state1.parameters],
+                         [p.get() for p in state2.parameters])
+
+    def test_string_handlers_are_appended(self):
+        @self.compile.when(Custom)
+        def compile_custom(compile, custom, state):
+            return 'CUSTOM({})'.format(compile(custom.expression, state))
+
+        statement = self.compile(
+            Select(Custom(Func('f', self.id)), Gt(Custom(self.id), 1)))
+        self.assertEqual(
+            statement, 'SELECT CUSTOM(f(foo.id)) FROM foo '
+            'WHERE CUSTOM(foo.id) > ?'
+        )
+
+    def test_string_handler_shadows_writer(self):
+        @self.compile.when(Gt)
+        def compile_gt(compile, gt, state):
+            return 'custom'
+
+        self.assertEqual(self.compile(And(Gt(1, 2), Gt(3, 4))),
+                         'custom AND custom')
+
+    def test_when_writer(self):
+        @self.compile.when_writer(Custom)
+        def write_custom(compile, custom, state):
+            state.buffer.append('CUSTOM ')
+            compile.write(custom.expression, state)
+
+        self.assertEqual(
+            self.compile(Custom(Custom(self.id))), 'CUSTOM CUSTOM foo.id')
+        self.assertEqual(
+            self.compile(Eq(Custom(self.id), Custom(self.name))),
+            'CUSTOM foo.id = CUSTOM foo.name'
+        )
+
+    def test_statement_cache(self):
+        self.compile.set_statement_cache()
+        self.compile(Select(self.id, self.id == IntVariable(1)))
+        state = State()
+        statement = self.compile(
+            Select(self.id, self.id == IntVariable(2)), state)
+        self.assertEqual(statement, 'SELECT foo.id FROM foo WHERE foo.id = ?')
+        self.assertEqual(self.compile.statement_cache.hits, 1)
+        self.assertEqual(state.parameters[0].get(), 2)
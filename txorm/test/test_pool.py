@@ -0,0 +1,168 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM Connection Pool Unit Tests
+"""
+
+from __future__ import unicode_literals
+
+from twisted.trial import unittest
+from twisted.internet import defer
+
+from txorm.database import Database
+from txorm.database.pool import ConnectionPool, PoolMetrics
+from txorm.exceptions import PoolClosedError, PoolTimeoutError
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def create_pool(self, **kwargs):
+        pool = ConnectionPool(
+            'sqlite3', self.mktemp(), check_same_thread=False, **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    @defer.inlineCallbacks
+    def test_warmup(self):
+        pool = self.create_pool(pool_min=3, pool_max=5)
+        yield pool.start()
+        self.assertEqual(pool.size, 3)
+        self.assertEqual(len(pool._idle), 3)
+        self.assertEqual(pool.metrics.created, 3)
+
+    def test_invalid_sizes(self):
+        self.assertRaises(
+            ValueError, ConnectionPool, 'sqlite3', ':memory:',
+            pool_min=3, pool_max=2
+        )
+
+    @defer.inlineCallbacks
+    def test_run_query(self):
+        pool = self.create_pool()
+        yield pool.runOperation('CREATE TABLE foo (id INTEGER)')
+        yield pool.runOperation('INSERT INTO foo VALUES (?)', (1,))
+        result = yield pool.runQuery('SELECT id FROM foo')
+        self.assertEqual(result, [(1,)])
+        metrics = pool.metrics.snapshot()
+        self.assertEqual(metrics['checkouts'], 3)
+        self.assertEqual(metrics['in_use'], 0)
+        self.assertEqual(sum(count for _, count in metrics['latency']), 3)
+
+    @defer.inlineCallbacks
+    def test_interaction_rollback(self):
+        pool = self.create_pool()
+        yield pool.runOperation('CREATE TABLE foo (id INTEGER)')
+
+        def interaction(transaction):
+            transaction.execute('INSERT INTO foo VALUES (1)')
+            raise ValueError()
+
+        yield self.assertFailure(pool.runInteraction(interaction), ValueError)
+        result = yield pool.runQuery('SELECT id FROM foo')
+        self.assertEqual(result, [])
+        self.assertEqual(pool.metrics.in_use, 0)
+
+    @defer.inlineCallbacks
+    def test_wait_queue(self):
+        pool = self.create_pool(pool_max=1)
+        connection = yield pool.checkout()
+        waiting = pool.checkout()
+        self.assertFalse(waiting.called)
+        self.assertEqual(pool.metrics.waiting, 1)
+
+        pool.checkin(connection)
+        other = yield waiting
+        self.assertIdentical(other, connection)
+        self.assertEqual(pool.metrics.waiting, 0)
+        self.assertEqual(pool.metrics.in_use, 1)
+        self.assertEqual(pool.metrics.created, 1)
+        pool.checkin(other)
+
+    @defer.inlineCallbacks
+    def test_wait_timeout(self):
+        pool = self.create_pool(pool_max=1, pool_wait_timeout=0.01)
+        connection = yield pool.checkout()
+        yield self.assertFailure(pool.checkout(), PoolTimeoutError)
+        self.assertEqual(pool.metrics.timeouts, 1)
+        self.assertEqual(pool.metrics.waiting, 0)
+        pool.checkin(connection)
+
+    @defer.inlineCallbacks
+    def test_max_lifetime(self):
+        pool = self.create_pool(pool_max_lifetime=3600)
+        connection = yield pool.checkout()
+        connection.created -= 3600
+        pool.checkin(connection)
+        self.assertEqual(pool._idle, [])
+        self.assertEqual(pool.metrics.destroyed, 1)
+
+        other = yield pool.checkout()
+        self.assertNotIdentical(other, connection)
+        pool.checkin(other)
+
+    @defer.inlineCallbacks
+    def test_idle_timeout(self):
+        pool = self.create_pool(pool_min=1, pool_idle_timeout=60)
+        connections = yield defer.gatherResults(
+            [pool.checkout() for _ in range(3)])
+        for connection in connections:
+            pool.checkin(connection)
+        for connection in connections[:2]:
+            connection.last_used -= 60
+
+        pool._reap()
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(pool._idle, [connections[2]])
+        self.assertEqual(pool.metrics.destroyed, 2)
+
+    @defer.inlineCallbacks
+    def test_ping_replaces_broken_connections(self):
+        pool = self.create_pool(pool_ping=True)
+        connection = yield pool.checkout()
+        connection.raw.close()
+        pool.checkin(connection)
+
+        result = yield pool.runQuery('SELECT 1')
+        self.assertEqual(result, [(1,)])
+        self.assertEqual(pool.metrics.destroyed, 1)
+        self.assertEqual(pool.metrics.created, 2)
+
+    @defer.inlineCallbacks
+    def test_close(self):
+        pool = self.create_pool(pool_max=1)
+        connection = yield pool.checkout()
+        waiting = pool.checkout()
+        pool.close()
+        yield self.assertFailure(waiting, PoolClosedError)
+        yield self.assertFailure(pool.checkout(), PoolClosedError)
+
+        pool.checkin(connection)
+        self.assertEqual(pool.size, 0)
+
+    @defer.inlineCallbacks
+    def test_shared_by_connections(self):
+        pool = self.create_pool()
+
+        class PooledDatabase(Database):
+
+            def raw_connect(self):
+                return pool
+
+        database = PooledDatabase()
+        connection = database.connect()
+        self.assertIdentical(database.connect()._raw_connection, pool)
+        yield connection.execute('CREATE TABLE foo (id INTEGER)')
+        result = yield connection.execute('SELECT COUNT(*) FROM foo')
+        self.assertEqual(result.one(), (0,))
+
+
+class PoolMetricsTest(unittest.TestCase):
+
+    def test_latency_histogram(self):
+        metrics = PoolMetrics(buckets=(1, 10))
+        for seconds in (0.0005, 0.001, 0.005, 1):
+            metrics.observe(seconds)
+
+        self.assertEqual(metrics.checkouts, 4)
+        self.assertEqual(
+            metrics.snapshot()['latency'], [(1, 2), (10, 1), (None, 1)])
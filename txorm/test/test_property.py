@@ -23,7 +23,8 @@ from txorm.property.base import SimpleProperty, Property
 from txorm.exceptions import NoneError, PropertyPathError
 from txorm.property import (
     Int, Bool, Float, Decimal, RawStr, Unicode, DateTime, Date, Time,
-    TimeDelta, Enum, MysqlEnum, UUID, Fraction, PropertyRegistry
+    TimeDelta, Enum, MysqlEnum, UUID, Fraction, PropertyRegistry,
+    PropertyRegisterMeta, FastProperty
 )
 from txorm.variable import (
     Variable, BoolVariable, IntVariable, FloatVariable, DecimalVariable,
@@ -760,6 +761,122 @@ class PropertyKindsTest(unittest.TestCase):
             self.assertEquals(validator_args, [None, 'prop', value])
 
 
+class InternedPropertyTest(unittest.TestCase):
+
+    def setUp(self):
+
+        class Class(object):
+            __database_table__ = 'mytable'
+            id = Int(primary=True)
+            status = Unicode(intern=True)
+            day = Date(cache_size=2)
+            name = Unicode()
+
+        self.Class = Class
+
+    def load(self, status, day, name='name'):
+        obj = self.Class()
+        variables = get_obj_data(obj).variables
+        variables[self.Class.status].set(u('').join(status), from_db=True)
+        variables[self.Class.day].set(day, from_db=True)
+        variables[self.Class.name].set(u('').join(name), from_db=True)
+        return obj
+
+    def test_intern(self):
+        first = self.load('open', '2014-01-02')
+        second = self.load('open', '2014-01-02')
+        self.assertEqual(first.status, 'open')
+        self.assertIdentical(first.status, second.status)
+        self.assertIdentical(first.day, second.day)
+        self.assertNotIdentical(first.name, second.name)
+
+    def test_cache_size(self):
+        for day in ('2014-01-01', '2014-01-02', '2014-01-03'):
+            self.load('open', day)
+
+        cache = get_obj_data(self.Class()).variables[self.Class.day]._cache
+        self.assertEqual(cache.size, 2)
+        self.assertEqual(len(cache), 2)
+
+
+class FastPropertyTest(unittest.TestCase):
+
+    def make_class(self, cls_name='Class', bases=(object,), **attributes):
+        attributes.setdefault('__database_table__', 'mytable')
+        attributes.setdefault('__txorm_fast_properties__', True)
+        return PropertyRegisterMeta(str(cls_name), bases, attributes)
+
+    def setUp(self):
+        self.Base = self.make_class('Base')
+        self.Class = self.make_class(
+            bases=(self.Base,), id=Int(primary=True), name=Unicode(),
+            kind=Enum(map={'one': 1}), born=Date()
+        )
+
+    def test_installed(self):
+        self.assertIsInstance(self.Class.__dict__['id'], FastProperty)
+        self.assertIsInstance(self.Class.id, Field)
+        self.assertIdentical(self.Class.id, self.Class.__dict__['id'].field)
+        self.assertIdentical(self.Class.id.table, self.Class)
+        self.assertTrue(self.Class.__dict__['name'].identity)
+        self.assertFalse(self.Class.__dict__['kind'].identity)
+
+    def test_not_installed(self):
+        Class = self.make_class(
+            bases=(self.Base,), __txorm_fast_properties__=False,
+            id=Int(primary=True)
+        )
+        self.assertIsInstance(Class.__dict__['id'], Int)
+
+    def test_get_set_delete(self):
+        obj = self.Class()
+        self.assertEqual((obj.id, obj.name, obj.kind), (None, None, None))
+
+        obj.id = 1
+        obj.name = 'foo'
+        obj.kind = 'one'
+        obj.born = date(2014, 1, 1)
+        self.assertEqual(
+            (obj.id, obj.name, obj.kind, obj.born),
+            (1, 'foo', 'one', date(2014, 1, 1))
+        )
+        obj_data = get_obj_data(obj)
+        self.assertEqual(obj_data.variables[self.Class.kind].get(), 'one')
+        self.assertEqual(len(obj_data.dirty), 4)
+
+        del obj.name
+        self.assertEqual(obj.name, None)
+        self.assertFalse(obj_data.variables[self.Class.name].is_defined)
+        self.assertRaises(TypeError, setattr, obj, 'id', 'foo')
+
+    def test_subclass(self):
+        SubClass = self.make_class(
+            'SubClass', (self.Class,), __database_table__='subtable')
+        self.assertIsInstance(SubClass.__dict__['id'], FastProperty)
+        self.assertIdentical(SubClass.id.table, SubClass)
+        self.assertNotIdentical(SubClass.id, self.Class.id)
+
+        obj = SubClass()
+        obj.id = 1
+        self.assertEqual(obj.id, 1)
+        self.assertIdentical(
+            get_obj_data(obj).variables[SubClass.id].get(), 1)
+
+    def test_columnar_and_lazy(self):
+        for flag in ('__txorm_columnar__', '__txorm_lazy_variables__'):
+            Class = self.make_class(
+                bases=(self.Base,), id=Int(primary=True),
+                kind=Enum(map={'one': 1}), **{flag: True}
+            )
+            obj = Class()
+            self.assertEqual((obj.id, obj.kind), (None, None))
+            obj.id = 1
+            obj.kind = 'one'
+            self.assertEqual((obj.id, obj.kind), (1, 'one'))
+            self.assertEqual(
+                get_obj_data(obj).get_changes(), (Class.id, Class.kind))
+
+
 class TxORMPropertyRegistryTest(unittest.TestCase):
 
     def setUp(self):
@@ -0,0 +1,236 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM Read/Write Routing Unit Tests
+"""
+
+from __future__ import unicode_literals
+
+from twisted.trial import unittest
+from twisted.internet import defer, task
+
+from txorm.compiler import Param
+from txorm.compiler.tables import Table
+from txorm.compiler.fields import Field
+from txorm.compiler.template import Template
+from txorm.database.stream import ResultStream
+from txorm.database.database import Database, create_database
+from txorm.compiler.expressions import Select, Insert, Update, Delete, Union
+from txorm.database.routing import (
+    RoutingDatabase, RoutingConnection, RoundRobinBalancer,
+    LeastOutstandingBalancer, LatencyWeightedBalancer, Replica
+)
+
+table = Table('foo')
+id_field = Field('id', table)
+
+
+class FakeConnection(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.executed = []
+        self.pending = []
+
+    def execute(self, statement, params=None, noresult=False, **kwargs):
+        self.executed.append(statement)
+        d = defer.Deferred()
+        self.pending.append(d)
+        return d
+
+    def execute_transact(self, transact_chain, *args, **kwargs):
+        self.executed.append(transact_chain)
+        return defer.succeed(None)
+
+    def execute_many(self, statement, param_rows, chunk_size=1000):
+        self.executed.append(statement)
+        return defer.succeed([])
+
+    def stream(self, statement, params=None, batch_size=1000, timeout=None):
+        self.executed.append(statement)
+        return ResultStream(self, statement, params, batch_size)
+
+    def runInteraction(self, interaction, *args):
+        d = defer.Deferred()
+        self.pending.append(d)
+        return d
+
+
+class FakeDatabase(Database):
+
+    def __init__(self, name):
+        super(FakeDatabase, self).__init__()
+        self.name = name
+
+    def connect(self):
+        return FakeConnection(self.name)
+
+
+class RoutingConnectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = task.Clock()
+        self.database = RoutingDatabase(
+            FakeDatabase('primary'),
+            [FakeDatabase('replica1'), FakeDatabase('replica2')],
+            sticky_for=5, clock=self.clock
+        )
+        self.connection = self.database.connect()
+        self.primary = self.connection.primary
+        self.replica1, self.replica2 = [
+            replica.connection for replica in self.connection.replicas]
+
+    def test_connect(self):
+        self.assertIsInstance(self.connection, RoutingConnection)
+        self.assertEqual(self.primary.name, 'primary')
+        self.assertEqual(self.replica1.name, 'replica1')
+
+    def test_reads_go_to_replicas(self):
+        select = Select(id_field)
+        for statement in (select, Union(select, select), Template(select)):
+            self.connection.execute(statement)
+
+        self.assertEqual(len(self.replica1.executed), 2)
+        self.assertEqual(len(self.replica2.executed), 1)
+        self.assertEqual(self.primary.executed, [])
+
+    def test_writes_go_to_primary(self):
+        statements = [
+            Insert({id_field: 1}), Update({id_field: 1}), Delete(),
+            Template(Update({id_field: Param('id')})), 'SELECT 1'
+        ]
+        for statement in statements:
+            self.connection.execute(statement)
+        self.connection.execute_transact(lambda transaction: None)
+        self.connection.execute_many('DELETE FROM foo', [()])
+
+        self.assertEqual(len(self.primary.executed), 7)
+        self.assertEqual(self.replica1.executed, [])
+        self.assertEqual(self.replica2.executed, [])
+
+    def test_read_your_writes(self):
+        self.connection.execute(Update({id_field: 1}), session='user')
+        self.connection.execute(Select(id_field), session='user')
+        self.connection.execute(Select(id_field), session='other')
+        self.assertEqual(len(self.primary.executed), 2)
+        self.assertEqual(len(self.replica1.executed), 1)
+
+        self.clock.advance(5)
+        self.connection.execute(Select(id_field), session='user')
+        self.assertEqual(len(self.primary.executed), 2)
+        self.assertEqual(len(self.replica2.executed), 1)
+        self.assertEqual(self.connection._writes, {})
+
+    def test_read_your_writes_across_connections(self):
+        self.connection.execute(Update({id_field: 1}), session='user')
+        connection = self.database.connect()
+        connection.execute(Select(id_field), session='user')
+        self.assertEqual(len(connection.primary.executed), 1)
+        self.assertEqual(connection.replicas[0].connection.executed, [])
+
+        self.clock.advance(5)
+        connection.execute(Select(id_field), session='user')
+        self.assertEqual(len(connection.primary.executed), 1)
+        self.assertEqual(self.database._writes, {})
+
+    def test_transact_session(self):
+        self.connection.execute_transact(lambda t: None, session='user')
+        self.connection.execute(Select(id_field), session='user')
+        self.assertEqual(len(self.primary.executed), 2)
+
+    def test_replica_tracking(self):
+        self.connection.execute(Select(id_field))
+        replica = self.connection.replicas[0]
+        self.assertEqual(replica.outstanding, 1)
+
+        self.clock.advance(0.5)
+        self.replica1.pending[0].callback([])
+        self.assertEqual(replica.outstanding, 0)
+        self.assertEqual(replica.latency, 0.5)
+
+    def test_stream_tracking(self):
+        self.connection.balancer = LeastOutstandingBalancer()
+        replica = self.connection.replicas[0]
+        stream = self.connection.stream(Select(id_field))
+        self.assertEqual(replica.outstanding, 0)
+
+        stream.fetch()
+        self.assertEqual(replica.outstanding, 1)
+        self.connection.execute(Select(id_field))
+        self.assertEqual(len(self.replica1.executed), 1)
+        self.assertEqual(len(self.replica2.executed), 1)
+
+        self.clock.advance(2)
+        self.replica1.pending[0].callback(None)
+        self.assertEqual(replica.outstanding, 0)
+        self.assertEqual(replica.latency, 2)
+
+    def test_stream_tracking_failure(self):
+        replica = self.connection.replicas[0]
+        stream = self.connection.stream(Select(id_field))
+        stream.fetch().addErrback(lambda failure: None)
+        self.assertEqual(replica.outstanding, 1)
+
+        self.replica1.pending[0].errback(ValueError('boom'))
+        self.assertEqual(replica.outstanding, 0)
+
+        stream = self.connection.stream(Select(id_field))
+        stream.aclose()
+        self.assertEqual(self.connection.replicas[1].outstanding, 0)
+
+    def test_no_replicas(self):
+        connection = RoutingDatabase(
+            FakeDatabase('primary'), clock=self.clock).connect()
+        connection.execute(Select(id_field))
+        self.assertEqual(len(connection.primary.executed), 1)
+
+    def test_create_database(self):
+        database = create_database(
+            FakeDatabase('primary'), replicas=[FakeDatabase('replica')],
+            balancer=LeastOutstandingBalancer()
+        )
+        self.assertIsInstance(database, RoutingDatabase)
+        self.assertIsInstance(database.balancer, LeastOutstandingBalancer)
+        self.assertEqual(database.replicas[0].name, 'replica')
+
+
+class BalancerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.replicas = [Replica(name) for name in ('a', 'b', 'c')]
+
+    def choose(self, balancer, times):
+        return [balancer.choose(self.replicas).connection
+                for _ in range(times)]
+
+    def test_round_robin(self):
+        self.assertEqual(
+            self.choose(RoundRobinBalancer(), 4), ['a', 'b', 'c', 'a'])
+
+    def test_least_outstanding(self):
+        self.replicas[0].outstanding = 2
+        self.replicas[1].outstanding = 1
+        self.assertEqual(
+            self.choose(LeastOutstandingBalancer(), 3), ['c', 'c', 'c'])
+
+        self.replicas[2].outstanding = 1
+        self.assertEqual(
+            self.choose(LeastOutstandingBalancer(), 3), ['b', 'b', 'c'])
+
+    def test_latency_weighted(self):
+        class Random(object):
+            value = 0.0
+
+            def random(self):
+                return self.value
+
+        rand = Random()
+        balancer = LatencyWeightedBalancer(rand)
+        self.assertEqual(self.choose(balancer, 1), ['a'])
+
+        for replica, latency in zip(self.replicas, (1.0, 0.5, 0.25)):
+            replica.latency = latency
+        # weights are 1, 2 and 4
+        for value, name in ((0.1, 'a'), (0.2, 'b'), (0.5, 'c'), (0.99, 'c')):
+            rand.value = value
+            self.assertEqual(self.choose(balancer, 1), [name])
@@ -0,0 +1,218 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM Statement Cache Unit Tests
+"""
+
+from __future__ import unicode_literals
+
+from twisted.trial import unittest
+
+from txorm.compiler.state import State
+from txorm.compiler.tables import Table
+from txorm.compiler.fields import Field
+from txorm.compiler.comparable import And, Eq, Gt, In
+from txorm.compiler.cache import StatementCache, fingerprint
+from txorm.compiler.expressions import Select, Insert, Update, Union
+from txorm.compiler.base import txorm_compile, txorm_compile_python
+from txorm.variable import IntVariable, UnicodeVariable, Variable
+
+
+class StatementCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.compile = txorm_compile.create_child()
+        self.compile.set_statement_cache(10)
+        self.cache = self.compile.statement_cache
+        self.table = Table('foo')
+        self.id = Field('id', self.table)
+        self.name = Field('name', self.table)
+
+    def compile_select(self, value, name):
+        state = State()
+        statement = self.compile(Select(
+            [self.id, self.name], And(
+                Gt(self.id, IntVariable(value)),
+                Eq(self.name, UnicodeVariable(name))
+            )
+        ), state)
+        return statement, state.parameters
+
+    def test_disabled_by_default(self):
+        compile = txorm_compile.create_child()
+        self.assertIdentical(compile.statement_cache, None)
+
+    def test_set_statement_cache(self):
+        self.assertTrue(isinstance(self.cache, StatementCache))
+        self.assertEqual(self.cache.size, 10)
+        self.compile.set_statement_cache(None)
+        self.assertIdentical(self.compile.statement_cache, None)
+
+    def test_hit_reuses_statement(self):
+        statement1, parameters1 = self.compile_select(1, 'a')
+        statement2, parameters2 = self.compile_select(2, 'b')
+        self.assertEqual(
+            statement1,
+            'SELECT foo.id, foo.name FROM foo '
+            'WHERE foo.id > ? AND foo.name = ?'
+        )
+        self.assertEqual(statement1, statement2)
+        self.assertEqual([p.get() for p in parameters1], [1, 'a'])
+        self.assertEqual([p.get() for p in parameters2], [2, 'b'])
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_hit_uses_new_variables(self):
+        variable = IntVariable(3)
+        state = State()
+        self.compile(Select(self.id, Eq(self.id, IntVariable(1))), State())
+        self.compile(Select(self.id, Eq(self.id, variable)), state)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertIdentical(state.parameters[0], variable)
+
+    def test_literals_are_placeholders(self):
+        state1, state2 = State(), State()
+        statement1 = self.compile(Insert({self.id: 1, self.name: 'a'}), state1)
+        statement2 = self.compile(Insert({self.id: 2, self.name: 'a'}), state2)
+        self.assertEqual(statement1, statement2)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(type(state2.parameters[0]), IntVariable)
+        self.assertEqual([p.get() for p in state2.parameters], [2, 'a'])
+
+    def test_sql_strings_are_part_of_the_key(self):
+        statement1 = self.compile(Select(self.id, where='id = 1'))
+        statement2 = self.compile(Select(self.id, where='id = 2'))
+        self.assertEqual(statement1, 'SELECT foo.id FROM foo WHERE id = 1')
+        self.assertEqual(statement2, 'SELECT foo.id FROM foo WHERE id = 2')
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 2)
+
+        statement3 = self.compile(Select(self.id, where='id = 1'))
+        self.assertEqual(statement3, statement1)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_string_literals_are_placeholders(self):
+        for value in ('a', 'b', 'c'):
+            state = State()
+            statement = self.compile(
+                Select(self.id, Eq(self.name, value)), state)
+            self.assertEqual(
+                statement, 'SELECT foo.id FROM foo WHERE foo.name = ?')
+            self.assertEqual([p.get() for p in state.parameters], [value])
+
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_shared_strings(self):
+        value = 'id = 1'
+        state = State()
+        statement = self.compile(
+            Select(self.id, Eq(self.name, value), having=value), state)
+        self.assertEqual(
+            statement,
+            'SELECT foo.id FROM foo WHERE foo.name = ? HAVING id = 1')
+        self.assertEqual([p.get() for p in state.parameters], [value])
+
+        other = 'id = 2'
+        statement = self.compile(
+            Select(self.id, Eq(self.name, other), having=other))
+        self.assertEqual(
+            statement,
+            'SELECT foo.id FROM foo WHERE foo.name = ? HAVING id = 2')
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_attributes_are_part_of_the_key(self):
+        statement1 = self.compile(Select(self.id, limit=1))
+        statement2 = self.compile(Select(self.id, limit=2))
+        self.assertEqual(statement1, 'SELECT foo.id FROM foo LIMIT 1')
+        self.assertEqual(statement2, 'SELECT foo.id FROM foo LIMIT 2')
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_in_list_length_is_part_of_the_key(self):
+        state = State()
+        self.compile(Select(self.id, In(self.id, [1, 2])))
+        statement = self.compile(
+            Select(self.id, In(self.id, [1, 2, 3])), state)
+        self.assertEqual(
+            statement, 'SELECT foo.id FROM foo WHERE foo.id IN (?, ?, ?)')
+        self.assertEqual(len(state.parameters), 3)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_shared_leaves(self):
+        variable = IntVariable(1)
+        key1 = fingerprint(Update({self.id: variable}, Eq(self.id, variable)))
+        key2 = fingerprint(
+            Update({self.id: IntVariable(1)}, Eq(self.id, IntVariable(1))))
+        self.assertNotEqual(key1[0], key2[0])
+
+        state = State()
+        other = IntVariable(5)
+        self.compile(Update({self.id: variable}, Eq(self.id, variable)))
+        self.compile(Update({self.id: other}, Eq(self.id, other)), state)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(state.parameters, [other, other])
+
+    def test_eviction(self):
+        self.compile.set_statement_cache(2)
+        cache = self.compile.statement_cache
+        for limit in range(3):
+            self.compile(Select(self.id, limit=limit))
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+
+        # limit=0 was the least recently used one
+        self.compile(Select(self.id, limit=2))
+        self.compile(Select(self.id, limit=0))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.evictions, 2)
+
+    def test_invalidation_on_precedence(self):
+        self.compile_select(1, 'a')
+        self.compile.set_precedence(10, And)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidation_on_parent_changes(self):
+        parent = txorm_compile.create_child()
+        child = parent.create_child()
+        child.set_statement_cache()
+        child(Select(self.id))
+        self.assertEqual(len(child.statement_cache), 1)
+
+        parent.add_reserved_words(['id'])
+        self.assertEqual(len(child.statement_cache), 0)
+        self.assertEqual(
+            child(Select(Field('id', self.table))), 'SELECT foo."id" FROM foo')
+
+    def test_invalidation_on_when(self):
+        self.compile(Select(self.id))
+
+        @self.compile.when(Field)
+        def compile_field(compile, field, state):
+            return 'field'
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.compile(Select(self.id, tables=self.table)),
+                         'SELECT field FROM foo')
+
+    def test_set_expressions_are_not_cached(self):
+        statement = self.compile(Union(Select(self.id), Select(self.name)))
+        self.assertTrue(statement.startswith('(SELECT foo.id AS "_'))
+        self.assertEqual(self.cache.misses, 0)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_used_state_is_not_cached(self):
+        state = State()
+        state.parameters.append(Variable(1))
+        self.compile(Select(self.id, Eq(self.id, 1)), state)
+        self.assertEqual(self.cache.misses, 0)
+        self.assertEqual(len(state.parameters), 2)
+
+    def test_inlined_literals_are_not_cached(self):
+        compile = txorm_compile_python.create_child()
+        compile.set_statement_cache()
+        self.assertEqual(compile(Gt(self.id, [1])), 'get_field(_0) > 1')
+        self.assertEqual(compile(Gt(self.id, [2])), 'get_field(_0) > 2')
+        self.assertEqual(compile.statement_cache.hits, 0)
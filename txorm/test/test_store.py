@@ -0,0 +1,193 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM Store Unit Tests
+"""
+
+from __future__ import unicode_literals
+
+from twisted.trial import unittest
+from twisted.internet import defer
+from twisted.enterprise import adbapi
+
+from txorm.store import Store
+from txorm.database import Database
+from txorm.property import Int, Unicode
+
+
+class Foo(object):
+    __database_table__ = 'foo'
+    id = Int(primary=True)
+    name = Unicode()
+    age = Int()
+
+
+class Bar(object):
+    __database_table__ = 'bar'
+    __table_primary__ = ('a', 'b')
+    a = Int()
+    b = Int()
+    name = Unicode()
+
+
+class RecordingDatabase(Database):
+
+    def __init__(self, path):
+        super(RecordingDatabase, self).__init__()
+        self.path = path
+        self.statements = []
+
+    def raw_connect(self):
+        statements = self.statements
+
+        class Cursor(adbapi.Transaction):
+
+            def execute(self, statement, *args):
+                statements.append((statement, 1))
+                return self._cursor.execute(statement, *args)
+
+            def executemany(self, statement, rows):
+                statements.append((statement, len(rows)))
+                return self._cursor.executemany(statement, rows)
+
+        pool = adbapi.ConnectionPool(
+            'sqlite3', self.path, check_same_thread=False, cp_min=1, cp_max=1)
+        pool.transactionFactory = Cursor
+        return pool
+
+
+class StoreTest(unittest.TestCase):
+
+    @defer.inlineCallbacks
+    def setUp(self):
+        self.database = RecordingDatabase(self.mktemp())
+        self.connection = self.database.connect()
+        self.pool = self.connection._raw_connection
+        self.store = Store(self.connection, max_rows=2)
+        yield self.pool.runOperation(
+            'CREATE TABLE foo (id INTEGER PRIMARY KEY, name TEXT, age INT)')
+        yield self.pool.runOperation(
+            'CREATE TABLE bar (a INT, b INT, name TEXT)')
+        del self.database.statements[:]
+
+    def tearDown(self):
+        self.pool.close()
+
+    def create(self, cls, **kwargs):
+        obj = cls()
+        for name, value in kwargs.items():
+            setattr(obj, name, value)
+        return self.store.add(obj)
+
+    def rows(self, table):
+        return self.pool.runQuery('SELECT * FROM {} ORDER BY 1, 2'.format(
+            table))
+
+    @defer.inlineCallbacks
+    def test_flush_nothing(self):
+        yield self.store.flush()
+        self.assertEqual(self.database.statements, [])
+
+    @defer.inlineCallbacks
+    def test_insert(self):
+        objs = [self.create(Foo, id=i, name='foo', age=i) for i in range(3)]
+        objs.append(self.create(Foo, id=3, name='bar'))
+        objs.append(self.create(Bar, a=1, b=2, name='bar'))
+        yield self.store.flush()
+
+        self.assertEqual(self.database.statements, [
+            ('INSERT INTO foo (age, id, name) VALUES (?, ?, ?), (?, ?, ?)', 1),
+            ('INSERT INTO foo (age, id, name) VALUES (?, ?, ?)', 1),
+            ('INSERT INTO foo (id, name) VALUES (?, ?)', 1),
+            ('INSERT INTO bar (a, b, name) VALUES (?, ?, ?)', 1),
+        ])
+        rows = yield self.rows('foo')
+        self.assertEqual(rows, [
+            (0, 'foo', 0), (1, 'foo', 1), (2, 'foo', 2), (3, 'bar', None)])
+        for obj in objs:
+            self.assertIn(obj, self.store.identity_map)
+
+        del self.database.statements[:]
+        yield self.store.flush()
+        self.assertEqual(self.database.statements, [])
+
+    @defer.inlineCallbacks
+    def test_update(self):
+        objs = [self.create(Foo, id=i, name='foo', age=i) for i in range(4)]
+        yield self.store.flush()
+        del self.database.statements[:]
+
+        objs[0].name = 'bar'
+        objs[1].name = 'bar'
+        objs[2].age = 20
+        objs[3].age = 3
+        yield self.store.flush()
+
+        self.assertEqual(self.database.statements, [
+            ('UPDATE foo SET name=? WHERE foo.id = ?', 2),
+            ('UPDATE foo SET age=? WHERE foo.id = ?', 1),
+        ])
+        rows = yield self.rows('foo')
+        self.assertEqual(rows, [
+            (0, 'bar', 0), (1, 'bar', 1), (2, 'foo', 20), (3, 'foo', 3)])
+
+    @defer.inlineCallbacks
+    def test_delete(self):
+        foos = [self.create(Foo, id=i, name='foo') for i in range(4)]
+        bars = [self.create(Bar, a=1, b=i) for i in range(2)]
+        yield self.store.flush()
+        del self.database.statements[:]
+
+        for obj in foos[:3] + bars:
+            self.store.remove(obj)
+        foos[0].name = 'changed'
+        yield self.store.flush()
+
+        self.assertEqual(self.database.statements, [
+            ('DELETE FROM foo WHERE foo.id IN (?, ?)', 1),
+            ('DELETE FROM foo WHERE foo.id IN (?)', 1),
+            ('DELETE FROM bar WHERE bar.a = ? AND bar.b = ? OR '
+             'bar.a = ? AND bar.b = ?', 1),
+        ])
+        rows = yield self.rows('foo')
+        self.assertEqual(rows, [(3, 'foo', None)])
+        rows = yield self.rows('bar')
+        self.assertEqual(rows, [])
+        self.assertEqual(len(self.store.identity_map), 1)
+
+    @defer.inlineCallbacks
+    def test_delete_changed_primary_key(self):
+        foos = [self.create(Foo, id=i, name='foo') for i in range(2)]
+        bar = self.create(Bar, a=1, b=2)
+        yield self.store.flush()
+
+        foos[0].id = 1
+        bar.b = 3
+        self.store.remove(foos[0])
+        self.store.remove(bar)
+        yield self.store.flush()
+
+        rows = yield self.rows('foo')
+        self.assertEqual(rows, [(1, 'foo', None)])
+        rows = yield self.rows('bar')
+        self.assertEqual(rows, [])
+        self.assertEqual(len(self.store.identity_map), 1)
+        self.assertIdentical(self.store.get(Foo, (1,)), foos[1])
+        self.assertIdentical(self.store.get(Foo, (0,)), None)
+
+    @defer.inlineCallbacks
+    def test_add_and_remove_before_flush(self):
+        obj = self.create(Foo, id=1)
+        self.store.remove(obj)
+        yield self.store.flush()
+        self.assertEqual(self.database.statements, [])
+
+    @defer.inlineCallbacks
+    def test_flush_in_one_transaction(self):
+        self.create(Foo, id=1, name='foo')
+        self.create(Foo, id=1, name='duplicated')
+        yield self.assertFailure(self.store.flush(), Exception)
+
+        rows = yield self.rows('foo')
+        self.assertEqual(rows, [])
+        self.assertEqual(len(self.store._new), 2)
@@ -0,0 +1,180 @@
+# Copyright (c) 2014 Oscar Campos <oscar.campos@member.fsf.org>
+# See LICENSE for details
+
+"""TxORM Query Templates Unit Tests
+"""
+
+from __future__ import unicode_literals
+
+from decimal import Decimal
+
+from twisted.trial import unittest
+
+from txorm.compiler import Template, Param
+from txorm.compiler.tables import Table
+from txorm.compiler.fields import Field
+from txorm.compiler.comparable import Eq, In
+from txorm.compiler.expressions import Select, Insert, Update, Delete
+from txorm.variable import (
+    Variable, IntVariable, UnicodeVariable, DecimalVariable
+)
+
+
+class TemplateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.table = Table('foo')
+        self.id = Field('id', self.table, variable_factory=IntVariable)
+        self.name = Field(
+            'name', self.table, variable_factory=UnicodeVariable)
+        self.price = Field(
+            'price', self.table, variable_factory=DecimalVariable)
+
+    def test_param(self):
+        param = Param('name')
+        self.assertEqual(param.name, 'name')
+        self.assertEqual(param.many, False)
+
+    def test_comparison_binds_variable_factory(self):
+        expression = self.name == Param('name')
+        self.assertTrue(expression.expressions[1].variable_factory
+                        is UnicodeVariable)
+
+    def test_select(self):
+        template = Template(Select(
+            self.id, (self.name == Param('name')) & (self.id > Param('id'))
+        ))
+        statement, params = template.bind(name='foo', id=3)
+        self.assertEqual(
+            statement,
+            'SELECT foo.id FROM foo WHERE foo.name = ? AND foo.id > ?'
+        )
+        self.assertEqual(
+            [(type(p), p.get()) for p in params],
+            [(UnicodeVariable, 'foo'), (IntVariable, 3)]
+        )
+
+    def test_bind_reuses_statement(self):
+        template = Template(Select(self.id, self.id == Param('id')))
+        statement1, params1 = template.bind(id=1)
+        statement2, params2 = template.bind(id=2)
+        self.assertIdentical(statement1, statement2)
+        self.assertEqual(params2[0].get(), 2)
+
+    def test_constant_values(self):
+        template = Template(Select(
+            self.id, (self.name == 'bar') & (self.id == Param('id'))))
+        statement, params = template.bind(id=1)
+        self.assertEqual([p.get() for p in params], ['bar', 1])
+
+    def test_insert(self):
+        template = Template(Insert(
+            {self.name: Param('name'), self.price: Param('price')}))
+        statement, params = template.bind(name='foo', price=Decimal('1.5'))
+        self.assertEqual(
+            statement, 'INSERT INTO foo (name, price) VALUES (?, ?)')
+        self.assertEqual(type(params[1]), DecimalVariable)
+        self.assertEqual(params[1].get(to_db=True), '1.5')
+
+    def test_insert_values(self):
+        template = Template(Insert(
+            (self.id, self.name), values=[(Param('id1'), Param('name1')),
+                                          (Param('id2'), Param('name2'))]
+        ))
+        statement, params = template.bind(
+            id1=1, name1='foo', id2=2, name2='bar')
+        self.assertEqual(
+            statement, 'INSERT INTO foo (id, name) VALUES (?, ?), (?, ?)')
+        self.assertEqual(
+            [type(p) for p in params],
+            [IntVariable, UnicodeVariable, IntVariable, UnicodeVariable]
+        )
+
+    def test_update(self):
+        template = Template(Update(
+            {self.name: Param('name')}, self.id == Param('id')))
+        statement, params = template.bind(name='foo', id=1)
+        self.assertEqual(statement, 'UPDATE foo SET name=? WHERE foo.id = ?')
+        self.assertEqual(
+            [(type(p), p.get()) for p in params],
+            [(UnicodeVariable, 'foo'), (IntVariable, 1)]
+        )
+
+    def test_delete(self):
+        template = Template(Delete(self.id == Param('id')))
+        statement, params = template.bind(id=1)
+        self.assertEqual(statement, 'DELETE FROM foo WHERE foo.id = ?')
+        self.assertEqual(params[0].get(), 1)
+
+    def test_in(self):
+        template = Template(Select(
+            self.name, self.id.is_in(Param('ids')) & (self.name != Param('n'))
+        ))
+        statement, params = template.bind(ids=[1, 2, 3], n='foo')
+        self.assertEqual(
+            statement, 'SELECT foo.name FROM foo '
+            'WHERE foo.id IN (?, ?, ?) AND foo.name != ?'
+        )
+        self.assertEqual([p.get() for p in params], [1, 2, 3, 'foo'])
+        self.assertEqual(type(params[0]), IntVariable)
+
+        statement, params = template.bind(ids=[4], n='bar')
+        self.assertEqual(
+            statement, 'SELECT foo.name FROM foo '
+            'WHERE foo.id IN (?) AND foo.name != ?'
+        )
+
+    def test_in_empty(self):
+        template = Template(Select(self.name, self.id.is_in(Param('ids'))))
+        statement, params = template.bind(ids=[])
+        self.assertEqual(
+            statement, 'SELECT foo.name FROM foo WHERE foo.id IN (NULL)')
+        self.assertEqual(params, ())
+
+    def test_in_explicit_many(self):
+        template = Template(Select(
+            self.name, In(self.id, Param('ids', IntVariable, many=True))))
+        statement, params = template.bind(ids=(1, 2))
+        self.assertEqual(
+            statement, 'SELECT foo.name FROM foo WHERE foo.id IN (?, ?)')
+
+    def test_unbound_param(self):
+        template = Template(Select(self.name, Eq(self.id, Param('id'))))
+        statement, params = template.bind(id=1)
+        self.assertEqual(type(params[0]), Variable)
+
+    def test_missing_param(self):
+        template = Template(Select(self.id, self.id == Param('id')))
+        self.assertRaises(TypeError, template.bind)
+        self.assertRaises(TypeError, template.bind, name='foo')
+
+    def test_unexpected_param(self):
+        template = Template(Select(self.id, self.id == Param('id')))
+        self.assertRaises(TypeError, template.bind, id=1, name='foo')
+
+    def test_conversion_errors(self):
+        template = Template(Select(self.id, self.id == Param('id')))
+        self.assertRaises(TypeError, template.bind, id='foo')
+
+    def test_bind_many(self):
+        template = Template(Update(
+            {self.price: Param('price')}, self.id == Param('id')))
+        rows = list(template.bind_many([
+            {'price': Decimal('1.5'), 'id': 1},
+            {'price': Decimal('2'), 'id': 2}
+        ]))
+        self.assertEqual(rows, [('1.5', 1), ('2', 2)])
+
+    def test_bind_many_constant_values(self):
+        template = Template(Select(
+            self.id, (self.name == 'bar') & (self.id == Param('id'))))
+        self.assertEqual(list(template.bind_many([{'id': 1}, {'id': 2}])),
+                         [('bar', 1), ('bar', 2)])
+
+    def test_bind_many_errors(self):
+        template = Template(Select(self.id, self.id == Param('id')))
+        self.assertRaises(TypeError, list, template.bind_many([{}]))
+        self.assertRaises(TypeError, list, template.bind_many([{'id': 'a'}]))
+
+        template = Template(Select(self.id, self.id.is_in(Param('ids'))))
+        self.assertRaises(ValueError, list, template.bind_many([]))
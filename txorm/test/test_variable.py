@@ -13,7 +13,12 @@ from datetime import datetime, date, time, timedelta
 from twisted.trial import unittest
 
 from txorm.variable import *
-from txorm.compat import _PY3, b, u
+from txorm.variable._datetime import (
+    parse_datetimes, parse_dates, parse_times, _parse_date_string
+)
+from txorm.variable.base import ValueCache
+from txorm.variable.timedelta import parse_intervals
+from txorm.compat import _PY3, b, text_type, u
 from txorm.exceptions import NoneError
 from txorm.compiler.fields import Field
 from txorm.utils.tz import tzutc, tzoffset
@@ -183,6 +188,52 @@ class VariableTest(unittest.TestCase):
         self.assertEqual(args, [])
         self.assertEqual(variable.get(), ('g', ('s', marker)))
 
+    def test_slots(self):
+        variables = (
+            IntVariable(), BoolVariable(), FloatVariable(), RawStrVariable(),
+            DecimalVariable(), UnicodeVariable(), FractionVariable(),
+            DateTimeVariable(), DateVariable(), TimeVariable(),
+            TimeDeltaVariable(), UUIDVariable(), MysqlEnumVariable(set()),
+            EnumVariable({}, {})
+        )
+        for variable in variables:
+            self.assertFalse(hasattr(variable, '__dict__'))
+            self.assertFalse(variable.is_defined)
+            self.assertEqual(variable.field, None)
+
+    def test_has_changed(self):
+        variable = IntVariable()
+        self.assertFalse(variable.has_changed())
+        variable.set(1)
+        self.assertTrue(variable.has_changed())
+        variable.checkpoint()
+        self.assertFalse(variable.has_changed())
+        variable.set(1)
+        self.assertFalse(variable.has_changed())
+        variable.set(None)
+        self.assertTrue(variable.has_changed())
+        variable.set(1)
+        variable.delete()
+        self.assertTrue(variable.has_changed())
+
+    def test_set_from_db_checkpoints(self):
+        variable = IntVariable()
+        variable.set(1, from_db=True)
+        self.assertFalse(variable.has_changed())
+        variable.set(2)
+        self.assertTrue(variable.has_changed())
+        self.assertEqual(variable.get_checkpoint(), 1)
+
+    def test_get_checkpoint(self):
+        variable = DummyVariable()
+        self.assertEqual(variable.get_checkpoint(marker), marker)
+        variable.set(marker)
+        variable.checkpoint()
+        variable.set(None)
+        self.assertEqual(variable.get_checkpoint(to_db=True),
+                         ('g', ('s', marker)))
+        self.assertEqual(variable.gets[-1], (('s', marker), True))
+
 
 class BoolVariableTest(unittest.TestCase):
 
@@ -706,3 +757,189 @@ class ParseIntervalTest(unittest.TestCase):
             )
         else:
             self.fail('ValueError not raised')
+
+
+class ParseColumnsTest(unittest.TestCase):
+
+    def test_parse_datetimes(self):
+        values = [
+            u('2014-01-02 03:04:05'), u('2014-01-02 03:04:05.5'),
+            u('2014-1-2 3:04'), None, datetime(2014, 1, 2)
+        ]
+        self.assertEqual(parse_datetimes(values), [
+            datetime(2014, 1, 2, 3, 4, 5),
+            datetime(2014, 1, 2, 3, 4, 5, 500000),
+            datetime(2014, 1, 2, 3, 4), None, datetime(2014, 1, 2)
+        ])
+        self.assertRaises(
+            ValueError, parse_datetimes, [u('2014-01-02T03:04:05')])
+        self.assertRaises(
+            ValueError, parse_datetimes, [u('2014-01-02 03:04:05+01:00')])
+        self.assertRaises(TypeError, parse_datetimes, [marker])
+
+    def test_parse_dates(self):
+        values = [
+            u('2014-01-02'), u('2014-1-2'), u('2014-01-02 03:04:05'), None,
+            datetime(2014, 1, 2, 3), date(2014, 1, 2)
+        ]
+        self.assertEqual(parse_dates(values), [date(2014, 1, 2)] * 3 + [
+            None, date(2014, 1, 2), date(2014, 1, 2)])
+        self.assertRaises(ValueError, parse_dates, [u('20140102')])
+        self.assertRaises(TypeError, parse_dates, [marker])
+
+    def test_parse_dates_cached(self):
+        if not hasattr(_parse_date_string, 'cache_info'):
+            raise unittest.SkipTest('functools.lru_cache is not available')
+
+        parse_dates([u('1999-12-31')])
+        hits = _parse_date_string.cache_info().hits
+        parse_dates([u('1999-12-31')] * 3)
+        self.assertEqual(_parse_date_string.cache_info().hits, hits + 3)
+
+    def test_parse_times(self):
+        values = [u('03:04:05'), u('03:04:05.25'), u('3:04'), None]
+        self.assertEqual(parse_times(values), [
+            time(3, 4, 5), time(3, 4, 5, 250000), time(3, 4), None])
+
+    def test_parse_intervals(self):
+        values = [
+            u('12:00:00'), u('2 days'), u('3 days 01:00:00'),
+            u('1 day, 0:00:00'), u('-1 days +01:00:00'), u('1h'), None,
+            timedelta(1)
+        ]
+        self.assertEqual(parse_intervals(values), [
+            timedelta(hours=12), timedelta(2), timedelta(3, 3600),
+            timedelta(1), timedelta(-1, 3600), timedelta(hours=1), None,
+            timedelta(1)
+        ])
+        self.assertRaises(ValueError, parse_intervals, [u('1 month')])
+        self.assertRaises(TypeError, parse_intervals, [marker])
+
+
+class ParseManyTest(unittest.TestCase):
+
+    def check(self, variable, values, from_db, to_db=True):
+        """Check the many versions against the value by value parsers
+        """
+
+        internal = [
+            None if value is None else variable.parse_set(value, from_db)
+            for value in values
+        ]
+        self.assertEqual(variable.parse_set_many(values, from_db), internal)
+        self.assertEqual(variable.parse_get_many(internal, to_db), [
+            None if value is None else variable.parse_get(value, to_db)
+            for value in internal
+        ])
+
+    def test_generic(self):
+        variable = FractionVariable()
+        self.check(variable, [Fraction(1, 3), None], False)
+        self.check(variable, [u('0.5'), None], True)
+
+    def test_numbers(self):
+        for variable in (IntVariable(), FloatVariable(), BoolVariable()):
+            self.check(variable, [1, 0, None, 2], True)
+            self.check(variable, [1, 2.5, Decimal('3.5'), True], False)
+            self.assertRaises(
+                TypeError, variable.parse_set_many, [1, u('2')], True)
+
+    def test_decimal(self):
+        variable = DecimalVariable()
+        self.check(variable, [Decimal('1.50'), None], False)
+        self.check(variable, [u('1.50'), 2, None], True)
+        self.check(variable, [u('1.50'), Decimal('2')], True, to_db=False)
+        self.assertRaises(
+            TypeError, variable.parse_set_many, [u('1.50')], False)
+
+    def test_strings(self):
+        self.check(UnicodeVariable(), [u('a'), None, u('b')], True)
+        self.check(RawStrVariable(), [b('a'), None], True)
+        self.assertRaises(
+            TypeError, UnicodeVariable().parse_set_many, [b('a')], True)
+
+    def test_dates(self):
+        self.check(DateTimeVariable(), [
+            u('2014-01-02 03:04:05'), None, datetime(2014, 1, 2)], True)
+        self.check(DateTimeVariable(tzinfo=tzutc()), [
+            u('2014-01-02 03:04:05'),
+            datetime(2014, 1, 2, tzinfo=tzoffset('1h', 3600))], True)
+        self.check(DateVariable(), [
+            u('2014-01-02'), None, datetime(2014, 1, 2, 3)], True)
+        self.check(DateVariable(), [date(2014, 1, 2)], False)
+        self.check(TimeVariable(), [u('03:04:05'), None], True)
+        self.check(TimeDeltaVariable(), [u('1 day 01:00:00'), None], True)
+
+    def test_uuid(self):
+        value = uuid.UUID('0609f76b-878f-4546-baf5-c1b135e8de72')
+        self.check(UUIDVariable(), [value, None], False)
+        self.check(UUIDVariable(), [text_type(value), None], True)
+        self.check(UUIDVariable(), [value], False, to_db=False)
+
+    def test_enum(self):
+        variable = EnumVariable({1: 'foo', 2: 'bar'}, {'foo': 1, 'bar': 2})
+        self.check(variable, [1, None, 2], True, to_db=False)
+        self.check(variable, ['foo', 'bar'], False)
+        self.assertRaises(ValueError, variable.parse_set_many, ['baz'], False)
+        self.assertRaises(ValueError, variable.parse_get_many, [3], False)
+
+    def test_enum_mapped_to_none(self):
+        variable = EnumVariable({1: 'foo', 2: None}, {'foo': 1, 'bar': None})
+        self.assertRaises(ValueError, variable.parse_set, 'bar', False)
+        self.assertRaises(
+            ValueError, variable.parse_set_many, ['foo', 'bar'], False)
+        self.assertRaises(ValueError, variable.parse_get, 2, False)
+        self.assertRaises(
+            ValueError, variable.parse_get_many, [1, None, 2], False)
+
+
+class ValueCacheTest(unittest.TestCase):
+
+    def test_shared_instances(self):
+        cache = ValueCache()
+        variables = [
+            UnicodeVariable(cache=cache), UnicodeVariable(cache=cache)]
+        for variable in variables:
+            variable.set(u('').join([u('act'), u('ive')]), from_db=True)
+
+        self.assertEqual(variables[0].get(), u('active'))
+        self.assertIdentical(variables[0].get(), variables[1].get())
+        self.assertEqual(len(cache), 1)
+
+        variables[0].set(u('').join([u('act'), u('ive')]))
+        self.assertNotIdentical(variables[0].get(), variables[1].get())
+
+    def test_parsed_once(self):
+        parsed = []
+
+        def parse(raw):
+            parsed.append(raw)
+            return date(2014, 1, 2)
+
+        cache = ValueCache()
+        for i in range(3):
+            cache.lookup(u('2014-01-02'), parse)
+        self.assertEqual(parsed, [u('2014-01-02')])
+
+    def test_bounded(self):
+        cache = ValueCache(size=2)
+        for i in range(4):
+            cache.lookup(i, int)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(list(cache._table), [(int, 2), (int, 3)])
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_not_interchangeable(self):
+        cache = ValueCache()
+        variable = DecimalVariable(cache=cache)
+        variable.set(Decimal('1.0'), from_db=True)
+        variable.set(Decimal('1.00'), from_db=True)
+        self.assertEqual(str(variable.get()), '1.00')
+
+        variable = FloatVariable(cache=cache)
+        variable.set(-0.0, from_db=True)
+        variable.set(0.0, from_db=True)
+        self.assertEqual(str(variable.get()), '0.0')
+        self.assertEqual(len(cache), 2)
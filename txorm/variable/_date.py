@@ -7,9 +7,7 @@ from __future__ import unicode_literals
 from datetime import datetime, date
 
 from .base import Variable
-from txorm.compat import text_type, binary_type
-
-from ._datetime import _parse_date
+from ._datetime import parse_date, parse_dates
 
 
 class DateVariable(Variable):
@@ -24,17 +22,15 @@ class DateVariable(Variable):
         if from_db is True:
             if value is None:
                 return value
-            if isinstance(value, datetime):
-                return value.date()
-            if isinstance(value, date):
-                return value
-            if not isinstance(value, (text_type, binary_type)):
-                raise TypeError('Expexted date, found {}'.format(repr(value)))
-            if ' ' in value:
-                value, time_str = value.split(' ')
-            return date(*_parse_date(value))
+            return parse_date(value)
 
         if not isinstance(value, date):
             raise TypeError('Expected date, found {}'.format(repr(value)))
 
         return value
+
+    def parse_set_many(self, values, from_db):
+        if from_db is True:
+            return parse_dates(values)
+
+        return super(DateVariable, self).parse_set_many(values, from_db)
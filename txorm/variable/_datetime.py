@@ -4,16 +4,24 @@
 
 from __future__ import unicode_literals
 
-from datetime import datetime
+from datetime import date, datetime, time
+
+try:
+    from functools import lru_cache
+except ImportError:  # pragma: no cover
+    lru_cache = None
 
 from .base import Variable
 from txorm.compat import text_type, binary_type, integer_types
 
+# number of parsed dates remembered, dates columns have few different values
+DATE_CACHE_SIZE = 4096
+
 
 class DateTimeVariable(Variable):
     """DateTime variable representation
     """
-    __slots__ = ('_tzinfo')
+    __slots__ = ('_tzinfo',)
 
     def __init__(self, *args, **kwargs):
         self._tzinfo = kwargs.pop('tzinfo', None)
@@ -21,20 +29,7 @@ class DateTimeVariable(Variable):
 
     def parse_set(self, value, from_db):
         if from_db is True:
-            if isinstance(value, datetime):
-                pass
-            elif isinstance(value, (text_type, binary_type)):
-                if ' ' not in value:
-                    raise ValueError('Unknown date/time format: {}'.format(
-                        repr(value)
-                    ))
-
-                _date, _time = value.split(' ')
-                value = datetime(*(_parse_date(_date) + _parse_time(_time)))
-            else:
-                raise TypeError('Expected datetime, found {}: {}'.format(
-                    type(value), repr(value)
-                ))
+            value = parse_datetime(value)
             if self._tzinfo is not None:
                 if value.tzinfo is None:
                     value = value.replace(tzinfo=self._tzinfo)
@@ -53,6 +48,185 @@ class DateTimeVariable(Variable):
 
         return value
 
+    def parse_set_many(self, values, from_db):
+        if from_db is not True:
+            return super(DateTimeVariable, self).parse_set_many(
+                values, from_db)
+
+        values = parse_datetimes(values)
+        tzinfo = self._tzinfo
+        if tzinfo is not None:
+            values = [
+                value if value is None
+                else value.replace(tzinfo=tzinfo) if value.tzinfo is None
+                else value.astimezone(tzinfo) for value in values
+            ]
+
+        return values
+
+
+def parse_datetime(value):
+    """Convert a datetime value from the database into a datetime
+
+    Strings in the `YYYY-MM-DD HH:MM:SS[.ffffff]` format are parsed by
+    `datetime.fromisoformat` when available, any other string goes
+    through the generic parser.
+
+    :raise ValueError: if the string has an unknown format
+    :raise TypeError: if the value is not a datetime or a string
+    """
+
+    if isinstance(value, datetime):
+        return value
+
+    if isinstance(value, text_type) and _is_iso_datetime(value):
+        try:
+            result = _fromisoformat(value)
+        except ValueError:
+            pass
+        else:
+            if result.tzinfo is None:
+                return result
+
+    if isinstance(value, (text_type, binary_type)):
+        if ' ' not in value:
+            raise ValueError('Unknown date/time format: {}'.format(
+                repr(value)
+            ))
+
+        _date, _time = value.split(' ')
+        return datetime(*(_parse_date(_date) + _parse_time(_time)))
+
+    raise TypeError('Expected datetime, found {}: {}'.format(
+        type(value), repr(value)
+    ))
+
+
+def parse_datetimes(values):
+    """Convert a column of datetime values from the database, see
+    :func:`parse_datetime`, None values are kept
+    """
+
+    return [None if value is None else parse_datetime(value)
+            for value in values]
+
+
+def parse_date(value):
+    """Convert a date value from the database into a date
+
+    The result of the last parsed strings is cached (see
+    `DATE_CACHE_SIZE`), the time of datetime strings is ignored.
+
+    :raise ValueError: if the string has an unknown format
+    :raise TypeError: if the value is not a date or a string
+    """
+
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, (text_type, binary_type)):
+        raise TypeError('Expexted date, found {}'.format(repr(value)))
+
+    return _parse_date_string(value)
+
+
+def parse_dates(values):
+    """Convert a column of date values from the database, see
+    :func:`parse_date`, None values are kept
+    """
+
+    return [None if value is None else parse_date(value) for value in values]
+
+
+def parse_time(value):
+    """Convert a time value from the database into a time
+
+    :raise ValueError: if the string has an unknown format
+    :raise TypeError: if the value is not a time or a string
+    """
+
+    if isinstance(value, time):
+        return value
+    if not isinstance(value, (text_type, binary_type)):
+        raise TypeError('Expected time, found {}'.format(repr(value)))
+    if ' ' in value:
+        _, value = value.split(' ')
+
+    if isinstance(value, text_type) and _is_iso_time(value):
+        try:
+            return _time_fromisoformat(value)
+        except ValueError:
+            pass
+
+    return time(*_parse_time(value))
+
+
+def parse_times(values):
+    """Convert a column of time values from the database, see
+    :func:`parse_time`, None values are kept
+    """
+
+    return [None if value is None else parse_time(value) for value in values]
+
+
+def _is_iso_datetime(value):
+    """Check if the string is in the `YYYY-MM-DD HH:MM:SS[.ffffff]` format
+    that `datetime.fromisoformat` parses exactly as :func:`_parse_date` and
+    :func:`_parse_time` do, other formats are left to them
+    """
+
+    length = len(value)
+    return (
+        (length == 19 or 21 <= length <= 26 and value[19] == '.') and
+        value[4] == '-' and value[7] == '-' and value[10] == ' ' and
+        value[13] == ':' and value[16] == ':'
+    )
+
+
+def _is_iso_time(value):
+    """Check if the string is in the `HH:MM:SS[.ffffff]` format
+    """
+
+    length = len(value)
+    return (
+        (length == 8 or 10 <= length <= 15 and value[8] == '.') and
+        value[2] == ':' and value[5] == ':'
+    )
+
+
+def _parse_date_string(value):
+    if ' ' in value:
+        value, _ = value.split(' ')
+
+    if (isinstance(value, text_type) and len(value) == 10 and
+            value[4] == '-' and value[7] == '-'):
+        try:
+            return _date_fromisoformat(value)
+        except ValueError:
+            pass
+
+    return date(*_parse_date(value))
+
+
+if hasattr(datetime, 'fromisoformat'):
+    _fromisoformat = datetime.fromisoformat
+    _date_fromisoformat = date.fromisoformat
+    _time_fromisoformat = time.fromisoformat
+else:  # pragma: no cover
+    def _fromisoformat(value):
+        _date, _time = value.split(' ')
+        return datetime(*(_parse_date(_date) + _parse_time(_time)))
+
+    def _date_fromisoformat(value):
+        return date(*_parse_date(value))
+
+    def _time_fromisoformat(value):
+        return time(*_parse_time(value))
+
+if lru_cache is not None:
+    _parse_date_string = lru_cache(DATE_CACHE_SIZE)(_parse_date_string)
+
 
 def _parse_time(time_str):
     # TODO Add support for timezones.
@@ -7,7 +7,13 @@ from __future__ import unicode_literals
 from decimal import Decimal
 
 from .base import Variable
-from txorm.compat import is_basestring, integer_types, u
+from txorm.compat import is_basestring, integer_types, text_type, u
+
+# types of the values of a column that need no conversion at all
+_DECIMALS = frozenset((Decimal, type(None)))
+# types of the values of a column that are passed to Decimal as they are
+_NUMBERS = frozenset(integer_types + (type(None),))
+_DB_NUMBERS = _NUMBERS | frozenset((text_type,))
 
 
 class DecimalVariable(Variable):
@@ -33,3 +39,22 @@ class DecimalVariable(Variable):
             return u(value)
 
         return value
+
+    def parse_set_many(self, values, from_db):
+        types = set(map(type, values))
+        if types <= _DECIMALS:
+            return list(values)
+        if types <= (_DB_NUMBERS if from_db is True else _NUMBERS):
+            return [
+                None if value is None else Decimal(value) for value in values]
+
+        return super(DecimalVariable, self).parse_set_many(values, from_db)
+
+    def parse_get_many(self, values, to_db):
+        if to_db is True:
+            return [
+                None if value is None else text_type(value)
+                for value in values
+            ]
+
+        return list(values)
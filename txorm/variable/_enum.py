@@ -37,3 +37,40 @@ class EnumVariable(Variable):
             raise ValueError('Invalid enum value: {}'.format(repr(value)))
 
         return value_
+
+    def parse_set_many(self, values, from_db):
+        if from_db is True:
+            return list(values)
+
+        return self._map_many(
+            self._set_map, values,
+            super(EnumVariable, self).parse_set_many, from_db
+        )
+
+    def parse_get_many(self, values, to_db):
+        if to_db is True:
+            return list(values)
+
+        return self._map_many(
+            self._get_map, values,
+            super(EnumVariable, self).parse_get_many, to_db
+        )
+
+    @staticmethod
+    def _map_many(map_, values, fallback, flag):
+        """Map many values at once, invalid values are the ones missing in
+        the map or mapped to None, exactly as in `parse_set` and `parse_get`
+        """
+
+        values = list(values)
+        try:
+            mapped = [
+                None if value is None else map_[value] for value in values]
+        except (KeyError, TypeError):
+            mapped = None
+
+        if mapped is None or mapped.count(None) != values.count(None):
+            # convert them one by one to report the invalid value
+            return fallback(values, flag)
+
+        return mapped
@@ -7,8 +7,7 @@ from __future__ import unicode_literals
 from datetime import datetime, time
 
 from .base import Variable
-from ._datetime import _parse_time
-from txorm.compat import text_type, binary_type
+from ._datetime import parse_time, parse_times
 
 
 class TimeVariable(Variable):
@@ -20,16 +19,16 @@ class TimeVariable(Variable):
         if from_db is True:
             if value is None:
                 return value
-            if isinstance(value, time):
-                return value
-            if not isinstance(value, (text_type, binary_type)):
-                raise TypeError('Expected time, found {}'.format(repr(value)))
-            if ' ' in value:
-                date_str, value = value.split(' ')
-            return time(*_parse_time(value))
+            return parse_time(value)
         else:
             if isinstance(value, datetime):
                 return value.time()
             if not isinstance(value, time):
                 raise TypeError('Expected time, found {}'.format(repr(value)))
             return value
+
+    def parse_set_many(self, values, from_db):
+        if from_db is True:
+            return parse_times(values)
+
+        return super(TimeVariable, self).parse_set_many(values, from_db)
@@ -10,6 +10,10 @@ from .base import Variable
 from txorm.compat import _PY3
 from txorm.compat import binary_type, text_type
 
+# types of the values of a column that need no conversion at all
+_UUIDS = frozenset((uuid.UUID, type(None)))
+_STRINGS = frozenset((text_type, type(None)))
+
 
 class UUIDVariable(Variable):
     """UUID variable representation
@@ -35,3 +39,24 @@ class UUIDVariable(Variable):
             return text_type(value)
 
         return value
+
+    def parse_set_many(self, values, from_db):
+        types = set(map(type, values))
+        if types <= _UUIDS:
+            return list(values)
+        if from_db is True and types <= _STRINGS:
+            return [
+                None if value is None else uuid.UUID(value)
+                for value in values
+            ]
+
+        return super(UUIDVariable, self).parse_set_many(values, from_db)
+
+    def parse_get_many(self, values, to_db):
+        if to_db is True:
+            return [
+                None if value is None else text_type(value)
+                for value in values
+            ]
+
+        return list(values)
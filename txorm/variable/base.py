@@ -4,9 +4,14 @@
 
 from __future__ import unicode_literals
 
+from uuid import UUID
+from datetime import date
+from decimal import Decimal
+from collections import OrderedDict
+
 from txorm import Undef
-from txorm.compat import _PY3
 from txorm.exceptions import NoneError
+from txorm.compat import _PY3, binary_type, integer_types, text_type
 
 if _PY3 is True:
     buffer = memoryview
@@ -27,6 +32,86 @@ def raise_none_error(field):
         raise NoneError("None isn't acceptable as a value for %s" % name)
 
 
+# raw value types whose equal values are interchangeable
+_CACHEABLE_TYPES = frozenset((binary_type, bool, date, UUID) + integer_types)
+
+
+class ValueCache(object):
+    """Bounded table of shared instances of the values of a field
+
+    Values loaded from the database are looked up by their raw database
+    value, rows with the same raw value get the same (immutable) instance
+    parsed just once. When the table is full the oldest entries are
+    evicted.
+
+    Only raw values whose equal values are interchangeable are cached
+    (strings, integers, dates, UUIDs), decimals are looked up by their
+    digits and exponent. Floats (signed zeros) and datetimes (timezones)
+    are parsed every time.
+
+    :param size: maximum number of values in the table
+    """
+
+    __slots__ = ('size', '_table')
+
+    def __init__(self, size=4096):
+        self.size = size
+        self._table = OrderedDict()
+
+    def __len__(self):
+        return len(self._table)
+
+    def lookup(self, raw, parse):
+        """Return the shared instance of the raw database value
+
+        :param raw: the raw value from the database
+        :param parse: callable converting a raw value into the value
+        """
+
+        kind = type(raw)
+        if kind is text_type:
+            key = raw
+        elif kind is Decimal:
+            key = (kind, raw.as_tuple())
+        elif kind in _CACHEABLE_TYPES:
+            key = (kind, raw)
+        else:
+            return parse(raw)
+
+        table = self._table
+        try:
+            return table[key]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable
+            return parse(raw)
+
+        value = table[key] = parse(raw)
+        while len(table) > self.size:
+            try:
+                table.popitem(last=False)
+            except KeyError:  # emptied by another thread
+                break
+
+        return value
+
+    def clear(self):
+        """Forget all the values
+        """
+
+        self._table.clear()
+
+
+def has_identity_get(variable_class):
+    """Return True if the variable class doesn't override `parse_get`, so
+    its internal values are returned as they are
+    """
+
+    method = variable_class.parse_get
+    return getattr(method, '__func__', method) is getattr(
+        Variable.parse_get, '__func__', Variable.parse_get)
+
+
 class Variable(object):
     """Representation of a database value in Python.
 
@@ -49,20 +134,31 @@ class Variable(object):
         is not acceptable an error should be raised, the value is returned
         otherwise
     :param field: the field that this variable represents
+    :param cache: a :class:`ValueCache` shared by the variables of a field
+        to get the same instance for values loaded from the database
     """
 
-    _value = Undef
-    _allow_none = True
-    _validator = None
-
-    field = None
+    __slots__ = (
+        '_value', '_checkpoint_state', '_allow_none', '_validator',
+        '_validator_factory', '_validator_attribute', '_cache', 'field'
+    )
 
     def __init__(self, value=Undef, value_factory=Undef,
                  from_db=False, allow_none=True, field=None, validator=None,
-                 validator_factory=None, validator_attribute=None):
-
-        if allow_none is not True:
-            self._allow_none = False
+                 validator_factory=None, validator_attribute=None,
+                 cache=None):
+
+        # slots have no class level defaults so every one of them is set
+        # here, the validator is set after the initial value as it is not
+        # validated
+        self._value = Undef
+        self._checkpoint_state = Undef
+        self._allow_none = allow_none is True
+        self._validator = None
+        self._validator_factory = None
+        self._validator_attribute = None
+        self._cache = cache
+        self.field = field
 
         if value is not Undef:
             self.set(value, from_db)
@@ -74,8 +170,6 @@ class Variable(object):
             self._validator_factory = validator_factory
             self._validator_attribute = validator_attribute
 
-        self.field = field
-
     @property
     def is_defined(self):
         """Returns `True` if the internal value is defined, `False` otherwise
@@ -106,7 +200,8 @@ class Variable(object):
         or we load from the database.
 
         If the value comes from the database we do nothing but if it comes
-        from the Python code and a validator is set, we call it.
+        from the Python code and a validator is set, we call it. Values that
+        come from the database are checkpointed, see :meth:`checkpoint`.
 
         :param value: the value to set
         :param from_db: indicate if the value comes from the database
@@ -123,10 +218,14 @@ class Variable(object):
             if self._allow_none is False:
                 raise raise_none_error(self.field)
             new_value = None
+        elif from_db is True and self._cache is not None:
+            new_value = self._cache.lookup(value, self._parse_from_db)
         else:
             new_value = self.parse_set(value, from_db)
 
         self._value = new_value
+        if from_db is True:
+            self._checkpoint_state = new_value
 
     def delete(self):
         """Delete the internal value
@@ -135,6 +234,39 @@ class Variable(object):
         if self._value is not Undef:
             self._value = Undef
 
+    def checkpoint(self):
+        """Remember the current value to detect later changes
+        """
+
+        self._checkpoint_state = self._value
+
+    def has_changed(self):
+        """Returns `True` if the value changed since the last checkpoint
+        """
+
+        value = self._value
+        state = self._checkpoint_state
+        return value is not state and (
+            value is Undef or state is Undef or value != state)
+
+    def get_checkpoint(self, default=None, to_db=False):
+        """Get the value of this variable at the last checkpoint
+
+        :param default: returned if there was no value at the checkpoint
+        :param to_db: indicate if the value is destined to the database
+        """
+
+        state = self._checkpoint_state
+        if state is Undef:
+            return default
+        elif state is None:
+            return None
+
+        return self.parse_get(state, to_db)
+
+    def _parse_from_db(self, value):
+        return self.parse_set(value, True)
+
     def parse_get(self, value, to_db):
         """Convert the internal value to an external value
 
@@ -156,3 +288,38 @@ class Variable(object):
         """
 
         return value
+
+    def parse_get_many(self, values, to_db):
+        """Convert many internal values to external values at once
+
+        The default implementation calls :meth:`parse_get` for every value,
+        subclasses override it to convert whole columns faster.
+
+        :param values: a sequence of internal values, None values are kept
+        :param to_db: indicate if the values are destined to the database
+        :return: a list with the converted values
+        """
+
+        parse_get = self.parse_get
+        return [
+            None if value is None else parse_get(value, to_db)
+            for value in values
+        ]
+
+    def parse_set_many(self, values, from_db):
+        """Convert many external values to internal values at once
+
+        The default implementation calls :meth:`parse_set` for every value,
+        subclasses override it to convert whole columns faster. Neither
+        validators nor `allow_none` are applied.
+
+        :param values: a sequence of values, None values are kept
+        :param from_db: indicate if the values come from the database
+        :return: a list with the converted values
+        """
+
+        parse_set = self.parse_set
+        return [
+            None if value is None else parse_set(value, from_db)
+            for value in values
+        ]
@@ -7,6 +7,11 @@ from __future__ import unicode_literals
 from decimal import Decimal
 
 from .base import Variable
+from txorm.compat import integer_types
+
+# types of the values of a column that need no conversion at all
+_BOOLS = frozenset((bool, type(None)))
+_NUMBERS = _BOOLS | frozenset(integer_types + (float, Decimal))
 
 
 class BoolVariable(Variable):
@@ -21,3 +26,12 @@ class BoolVariable(Variable):
             ))
 
         return bool(value)
+
+    def parse_set_many(self, values, from_db):
+        types = set(map(type, values))
+        if types <= _BOOLS:
+            return list(values)
+        if types <= _NUMBERS:
+            return [None if value is None else bool(value) for value in values]
+
+        return super(BoolVariable, self).parse_set_many(values, from_db)
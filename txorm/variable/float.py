@@ -7,6 +7,11 @@ from __future__ import unicode_literals
 from decimal import Decimal
 
 from .base import Variable
+from txorm.compat import integer_types
+
+# types of the values of a column that need no conversion at all
+_FLOATS = frozenset((float, type(None)))
+_NUMBERS = _FLOATS | frozenset(integer_types + (Decimal,))
 
 
 class FloatVariable(Variable):
@@ -21,3 +26,13 @@ class FloatVariable(Variable):
             ))
 
         return float(value)
+
+    def parse_set_many(self, values, from_db):
+        types = set(map(type, values))
+        if types <= _FLOATS:
+            return list(values)
+        if types <= _NUMBERS:
+            return [
+                None if value is None else float(value) for value in values]
+
+        return super(FloatVariable, self).parse_set_many(values, from_db)
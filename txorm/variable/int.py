@@ -7,6 +7,11 @@ from __future__ import unicode_literals
 from decimal import Decimal
 
 from .base import Variable
+from txorm.compat import integer_types
+
+# types of the values of a column that need no conversion at all
+_INTEGERS = frozenset(integer_types + (type(None),))
+_NUMBERS = _INTEGERS | frozenset((float, Decimal))
 
 
 class IntVariable(Variable):
@@ -21,3 +26,12 @@ class IntVariable(Variable):
             ))
 
         return int(value)
+
+    def parse_set_many(self, values, from_db):
+        types = set(map(type, values))
+        if types <= _INTEGERS:
+            return list(values)
+        if types <= _NUMBERS:
+            return [None if value is None else int(value) for value in values]
+
+        return super(IntVariable, self).parse_set_many(values, from_db)
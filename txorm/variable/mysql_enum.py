@@ -12,7 +12,7 @@ class MysqlEnumVariable(Variable):
     """Reprsentation of a native MySQL enum
     """
 
-    __slots__ = ('_set')
+    __slots__ = ('_set',)
 
     def __init__(self, _set, *args, **kwargs):
         self._set = _set
@@ -12,6 +12,9 @@ from txorm.compat import binary_type, b
 if _PY3 is True:
     buffer = memoryview
 
+# types of the values of a column that need no conversion at all
+_STRINGS = frozenset((binary_type, type(None)))
+
 
 class RawStrVariable(Variable):
     """Raw/Bytes string representation
@@ -27,3 +30,9 @@ class RawStrVariable(Variable):
             ))
 
         return value
+
+    def parse_set_many(self, values, from_db):
+        if set(map(type, values)) <= _STRINGS:
+            return list(values)
+
+        return super(RawStrVariable, self).parse_set_many(values, from_db)
@@ -24,11 +24,7 @@ class TimeDeltaVariable(Variable):
                 return value
             if isinstance(value, timedelta):
                 return value
-            if not isinstance(value, (binary_type, text_type)):
-                raise TypeError('Expected timedelta, found {}'.format(
-                    repr(value))
-                )
-            return _parse_interval(value)
+            return parse_interval(value)
         else:
             if not isinstance(value, timedelta):
                 raise TypeError('Expected timedelta, found {}'.format(
@@ -37,6 +33,12 @@ class TimeDeltaVariable(Variable):
 
             return value
 
+    def parse_set_many(self, values, from_db):
+        if from_db is True:
+            return parse_intervals(values)
+
+        return super(TimeDeltaVariable, self).parse_set_many(values, from_db)
+
 
 def _parse_interval_table():
     table = {}
@@ -62,6 +64,56 @@ _parse_interval_re = re.compile(
 )
 
 
+def parse_interval(interval):
+    """Convert an interval string from the database into a timedelta
+
+    The `HH:MM:SS[.ffffff]` and `N day[s][ HH:MM:SS[.ffffff]]` formats
+    returned by most databases are parsed without the generic regular
+    expression parser.
+
+    :raise ValueError: if the string has an unknown format
+    :raise TypeError: if the value is not a string
+    """
+
+    if not isinstance(interval, (binary_type, text_type)):
+        raise TypeError('Expected timedelta, found {}'.format(
+            repr(interval))
+        )
+
+    tokens = interval.split()
+    try:
+        if len(tokens) == 1 and ':' in tokens[0]:
+            h, m, s, ms = _parse_time(tokens[0])
+            return timedelta(hours=h, minutes=m, seconds=s, microseconds=ms)
+
+        if (2 <= len(tokens) <= 3 and tokens[1] in ('day', 'days') and
+                ':' not in tokens[0]):
+            result = timedelta(float(tokens[0]))
+            if len(tokens) == 3 and ':' in tokens[2]:
+                h, m, s, ms = _parse_time(tokens[2])
+                result += timedelta(
+                    hours=h, minutes=m, seconds=s, microseconds=ms)
+                return result
+            elif len(tokens) == 2:
+                return result
+    except ValueError:
+        # let the generic parser report it
+        pass
+
+    return _parse_interval(interval)
+
+
+def parse_intervals(values):
+    """Convert a column of interval values from the database, see
+    :func:`parse_interval`, None and timedelta values are kept
+    """
+
+    return [
+        value if value is None or isinstance(value, timedelta)
+        else parse_interval(value) for value in values
+    ]
+
+
 def _parse_interval(interval):
     result = timedelta(0)
     value = None
@@ -7,6 +7,9 @@ from __future__ import unicode_literals
 from .base import Variable
 from txorm.compat import text_type
 
+# types of the values of a column that need no conversion at all
+_STRINGS = frozenset((text_type, type(None)))
+
 
 class UnicodeVariable(Variable):
     """Unicode variable representation
@@ -20,3 +23,9 @@ class UnicodeVariable(Variable):
             ))
 
         return value
+
+    def parse_set_many(self, values, from_db):
+        if set(map(type, values)) <= _STRINGS:
+            return list(values)
+
+        return super(UnicodeVariable, self).parse_set_many(values, from_db)